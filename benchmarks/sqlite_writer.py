@@ -0,0 +1,107 @@
+"""Compare row-at-a-time inserts with the buffered SQLite writer.
+
+Usage::
+
+    python -m benchmarks.sqlite_writer --rows 200000
+
+Both variants write the same synthetic bankroll and results rows of one
+run to a fresh database file and report rows per second.  The rows go into
+the ``{name}_data`` tables behind the ``temp_*`` views (see
+:mod:`blackjack.schema`), tagged with their ``sim``, with their
+``(sim, trial, ...)`` keys in place.  The buffered writer is also timed with
+those keys dropped, to show what maintaining them costs.
+"""
+from __future__ import annotations
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings
+from blackjack.schema import DATA_TABLES, data_table
+from blackjack.storage import BufferedWriter, configure_connection
+
+SIM = 1
+BANKROLL_SQL = f"INSERT INTO {data_table('bankroll')} (trial, hand, bankroll, sim) VALUES (?, ?, ?, {SIM})"
+RESULTS_SQL = f"INSERT INTO {data_table('results')} VALUES ({', '.join('?' * 14)})"
+
+
+def make_rows(count: int):
+    bankroll = []
+    results = []
+    for i in range(count):
+        bankroll.append((1, i + 1, 1000.0 + i % 7))
+        results.append(
+            (SIM, 1, 6, 0.75, "3:2", "S17", 1, 0, 1, 1, 1.0, 1000.0, 1001.0,
+             "Player Hand: 9T|s, Dealer Hand: 7|T_s")
+        )
+    return bankroll, results
+
+
+def create_db(path: Path, keys: bool = True) -> sqlite3.Connection:
+    # Build the schema through the simulator, then reopen with default pragmas.
+    sim = Simulator(SimulationSettings(database=str(path), sqlite_synchronous="FULL"))
+    sim.conn.execute("PRAGMA journal_mode=DELETE")
+    if not keys:
+        for name in DATA_TABLES:
+            sim.conn.execute(f"DROP INDEX IF EXISTS {data_table(name)}_key")
+        sim.conn.commit()
+    sim.close()
+    return sqlite3.connect(path)
+
+
+def per_row(path: Path, bankroll, results) -> float:
+    conn = create_db(path)
+    start = time.perf_counter()
+    cur = conn.cursor()
+    for b, r in zip(bankroll, results):
+        cur.execute(BANKROLL_SQL, b)
+        cur.execute(RESULTS_SQL, r)
+        if b[1] % 100 == 0:  # the old simulator committed once per trial
+            conn.commit()
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def buffered(path: Path, bankroll, results, chunk_size: int, keys: bool = True) -> float:
+    conn = create_db(path, keys)
+    configure_connection(conn)
+    start = time.perf_counter()
+    writer = BufferedWriter(conn, chunk_size=chunk_size)
+    writer.set_statement("temp_bankroll", BANKROLL_SQL)
+    writer.set_statement("temp_results", RESULTS_SQL)
+    for b, r in zip(bankroll, results):
+        writer.add("temp_bankroll", b)
+        writer.add("temp_results", r)
+    writer.flush()
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    bankroll, results = make_rows(args.rows)
+    total = 2 * args.rows
+    with tempfile.TemporaryDirectory() as tmp:
+        before = per_row(Path(tmp) / "before.db", bankroll, results)
+        after = buffered(Path(tmp) / "after.db", bankroll, results, args.chunk_size)
+        keyless = buffered(Path(tmp) / "keyless.db", bankroll, results, args.chunk_size, keys=False)
+    print(f"per-row execute : {total / before:12,.0f} rows/s ({before:.2f}s)")
+    print(f"buffered writer : {total / after:12,.0f} rows/s ({after:.2f}s)")
+    print(f"speed-up        : {before / after:.1f}x")
+    print(f"without keys    : {total / keyless:12,.0f} rows/s ({keyless:.2f}s)")
+    print(f"key maintenance : {after / keyless - 1:+.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare decisions per second of the dict and compiled strategy lookups.
+
+Usage::
+
+    python -m benchmarks.strategy_decide --decisions 500000
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from blackjack.cards import CARDS, RANKS
+from blackjack.hand import Hand
+from blackjack.settings import DEFAULT_STRATEGY_FILE
+from blackjack.strategy import BasicStrategy
+
+
+def make_cases(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        hand = Hand(cards=[rng.choice(CARDS), rng.choice(CARDS)])
+        options = {
+            "can_double": rng.random() < 0.8,
+            "can_split": rng.random() < 0.9,
+            "can_surrender": rng.random() < 0.5,
+        }
+        cases.append((hand, rng.choice(RANKS), options))
+    return cases
+
+
+def rate(strategy: BasicStrategy, cases) -> float:
+    decide = strategy.decide
+    start = time.perf_counter()
+    for hand, up, options in cases:
+        decide(hand, up, options)
+    return len(cases) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decisions", type=int, default=200_000)
+    args = parser.parse_args()
+
+    compiled = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    plain = BasicStrategy(hard=compiled.hard, soft=compiled.soft, pair=compiled.pair)
+    cases = make_cases(args.decisions)
+    before = rate(plain, cases)
+    after = rate(compiled, cases)
+    print(f"dict lookup     : {before:12,.0f} decisions/s")
+    print(f"compiled table  : {after:12,.0f} decisions/s")
+    print(f"speed-up        : {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Measure ``Simulator.run`` throughput over a fixed set of scenarios.
+
+Usage::
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --tolerance 0.1
+
+Each scenario is a seeded run, repeated ``--repeat`` times; the fastest
+repetition is reported as hands per second.  Scenarios vary the strategy
+(basic, split-heavy, surrender-heavy), ``num_decks``, ``hands_per_game``,
+the number of trials and the database target.  ``--scale`` multiplies the
+hands played by every scenario.
+
+With ``--compare`` the results are checked against a JSON file written by
+an earlier ``--output``; scenarios slower than the baseline by more than the
+tolerance are reported and the command exits with status 1.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Dict, List
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+
+from blackjack.settings import DEFAULT_STRATEGY_FILE, SimulationSettings
+from blackjack.simulator import Simulator, _package_version
+from blackjack.strategy import DEALER_UP_CARDS
+
+
+def _split_everything(table: dict) -> dict:
+    pair = {rank: {up: "split" for up in DEALER_UP_CARDS} for rank in
+            ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")}
+    return {**table, "pair": pair}
+
+
+def _surrender_stiffs(table: dict) -> dict:
+    hard = dict(table["hard"])
+    for total in ("12", "13", "14", "15", "16"):
+        hard[total] = {up: "surrender" for up in DEALER_UP_CARDS}
+    return {**table, "hard": hard}
+
+
+@dataclass
+class Scenario:
+    name: str
+    overrides: Dict[str, object] = field(default_factory=dict)
+    # Rewrites the default strategy JSON; ``None`` uses it unchanged.
+    strategy: Callable[[dict], dict] | None = None
+    file_database: bool = False
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("basic-6d", {"trials": 20, "hands_per_game": 1000}),
+    Scenario("basic-1d", {"trials": 20, "hands_per_game": 1000, "num_decks": 1}),
+    Scenario("basic-8d", {"trials": 20, "hands_per_game": 1000, "num_decks": 8}),
+    Scenario("long-trials", {"trials": 2, "hands_per_game": 10000}),
+    Scenario("many-trials", {"trials": 400, "hands_per_game": 50}),
+    Scenario("file-database", {"trials": 20, "hands_per_game": 1000}, file_database=True),
+    Scenario("summaries-only", {"trials": 20, "hands_per_game": 1000, "record_every": 0}),
+    Scenario(
+        "split-heavy",
+        {"trials": 20, "hands_per_game": 1000, "resplit_aces": True, "double_after_split": True},
+        strategy=_split_everything,
+    ),
+    Scenario("surrender-heavy", {"trials": 20, "hands_per_game": 1000}, strategy=_surrender_stiffs),
+    Scenario("vectorized", {"trials": 2000, "hands_per_game": 100, "engine": "vectorized"}),
+]
+
+
+def run_scenario(scenario: Scenario, workdir: Path, scale: float, repeat: int) -> Dict[str, float]:
+    strategy_file = str(DEFAULT_STRATEGY_FILE)
+    if scenario.strategy is not None:
+        table = json.loads(Path(strategy_file).read_text(encoding="utf8"))
+        path = workdir / f"{scenario.name}.json"
+        path.write_text(json.dumps(scenario.strategy(table)), encoding="utf8")
+        strategy_file = str(path)
+    settings = replace(
+        SimulationSettings(bankroll=10**9, seed=1, strategy_file=strategy_file, database=":memory:"),
+        **scenario.overrides,
+    )
+    settings.hands_per_game = max(1, round(settings.hands_per_game * scale))
+    best = None
+    hands = 0
+    for i in range(repeat):
+        if scenario.file_database:
+            settings.database = str(workdir / f"{scenario.name}-{i}.db")
+        sim = Simulator(settings)
+        start = time.perf_counter()
+        sim.run()
+        elapsed = time.perf_counter() - start
+        hands = sim.hands_played
+        sim.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return {"hands": hands, "seconds": best, "hands_per_second": hands / best}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Describe every scenario slower than *baseline* by more than *tolerance*."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = result["hands_per_second"] / before["hands_per_second"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {ratio - 1:+.1%} ({before['hands_per_second']:,.0f} -> "
+                               f"{result['hands_per_second']:,.0f} hands/s)")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for hands per trial")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed slowdown (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in scenarios:
+            try:
+                result = run_scenario(scenario, Path(tmp), args.scale, args.repeat)
+            except ImportError as exc:
+                print(f"{scenario.name:<16}skipped: {exc}")
+                continue
+            results[scenario.name] = result
+            print(f"{scenario.name:<16}{result['hands']:>10} hands{result['hands_per_second']:>14,.0f} hands/s")
+
+    report = {
+        "version": _package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf8"))
+        if baseline.get("scale") != args.scale:
+            print(f"warning: baseline was run with --scale {baseline.get('scale')}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,15 @@ from pathlib import Path
 from .gui import SimulatorGUI
 from .settings import SimulationSettings, DEFAULT_STRATEGY_FILE
 from .simulator import Simulator
+from .analysis import ExactAnalyzer
+from .layout import migrate_layouts
+from .queries import compare_runs, format_reports
+from .sweep import Sweep, load_grid
+from .counting import TAG_SYSTEMS
+from .rng import RNG_KINDS
 
 
-def parse_args() -> SimulationSettings:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Blackjack simulator")
     parser.add_argument("--trials", type=int, default=100)
     parser.add_argument("--hands", type=int, default=100)
@@ -22,7 +28,91 @@ def parse_args() -> SimulationSettings:
     parser.add_argument("--database", type=str, default="simulation.db")
     parser.add_argument("--seed", type=int, default=None, help="Random seed")
     parser.add_argument("--test-mode", action="store_true", help="Run without persisting results")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--engine",
+        choices=["reference", "vectorized"],
+        default="reference",
+        help="Simulation engine; 'vectorized' needs NumPy and plays flat bets only",
+    )
+    parser.add_argument(
+        "--rng",
+        choices=RNG_KINDS,
+        default="python",
+        help="Shuffle generator; 'pcg64' and 'philox' need NumPy",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for trials (0 = all CPUs)"
+    )
+    parser.add_argument(
+        "--write-chunk-size", type=int, default=5000, help="Rows buffered per table before writing"
+    )
+    parser.add_argument(
+        "--synchronous",
+        choices=["OFF", "NORMAL", "FULL", "EXTRA"],
+        default="NORMAL",
+        help="SQLite synchronous level",
+    )
+    parser.add_argument(
+        "--count",
+        choices=sorted(TAG_SYSTEMS),
+        default="",
+        help="Count cards with this tag system and bet on a true-count ramp",
+    )
+    parser.add_argument(
+        "--bet-spread", type=float, default=SimulationSettings.bet_spread, help="Largest bet in units when counting"
+    )
+    parser.add_argument(
+        "--no-index-plays", action="store_true", help="Count for betting only, without deviations"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each simulation phase, print a breakdown and store it in the perf table",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=0.0,
+        help="Seconds between resumable checkpoints (0 = commit once at the end)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted run checkpointed in --database with its original settings",
+    )
+    parser.add_argument(
+        "--record-every",
+        type=int,
+        default=1,
+        help="Store every Nth round in the bankroll/results tables (0 = summaries only)",
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="Print the exact EV of the rules and strategy instead of simulating",
+    )
+    parser.add_argument(
+        "--sweep",
+        metavar="GRID",
+        help="JSON object (or file) mapping settings to lists of values; runs every combination",
+    )
+    parser.add_argument(
+        "--sweep-name", help="Name used to resume an interrupted sweep (default: derived from the grid)"
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Print a summary of every saved run in the database and exit",
+    )
+    parser.add_argument(
+        "--migrate-layouts",
+        action="store_true",
+        help="Re-encode text round layouts in the database as compact blobs and exit",
+    )
+    return parser
+
+
+def settings_from_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> SimulationSettings:
     if not Path(args.strategy).is_file():
         parser.error(f"Strategy file '{args.strategy}' not found.")
     settings = SimulationSettings(
@@ -40,20 +130,69 @@ def parse_args() -> SimulationSettings:
         database=args.database,
         seed=args.seed,
         test_mode=args.test_mode,
+        engine=args.engine,
+        rng=args.rng,
+        workers=args.workers,
+        write_chunk_size=args.write_chunk_size,
+        sqlite_synchronous=args.synchronous,
+        record_every=args.record_every,
+        checkpoint_interval=args.checkpoint_interval,
+        profile=args.profile,
+        count_system=args.count,
+        bet_spread=args.bet_spread,
+        index_plays=not args.no_index_plays,
     )
     return settings
 
 
+def parse_args() -> SimulationSettings:
+    parser = build_parser()
+    return settings_from_args(parser, parser.parse_args())
+
+
 def run_gui():
     gui = SimulatorGUI()
     gui.run()
 
 
 def run_cli():
-    settings = parse_args()
+    parser = build_parser()
+    args = parser.parse_args()
+    settings = settings_from_args(parser, args)
+    if args.analyze:
+        ev = ExactAnalyzer(settings).expected_value()
+        print(f"Expected value per round: {ev:+.4%} of the initial wager")
+        return
+    if args.sweep:
+        try:
+            sweep = Sweep(settings, load_grid(args.sweep), name=args.sweep_name)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"Sweep {sweep.name}: {len(sweep.cells)} cells, {len(sweep.completed())} already done")
+        for cell, sim_number in sorted(sweep.run().items()):
+            print(f"sim {sim_number}: {sweep.params(cell)}")
+        sweep.close()
+        return
     sim = Simulator(settings)
-    sim.run()
-    if not settings.test_mode:
+    if args.migrate_layouts:
+        print(f"Re-encoded {migrate_layouts(sim.conn)} rounds.")
+        sim.close()
+        return
+    if args.report:
+        print(format_reports(compare_runs(sim.conn)))
+        sim.close()
+        return
+    if args.resume:
+        if not sim.resume():
+            sim.close()
+            parser.error(f"No checkpoint to resume in '{settings.database}'")
+    else:
+        sim.run()
+    for name, value in sim.stats.summary().items():
+        print(f"{name}: {value:g}")
+    if sim.perf is not None:
+        print(sim.perf.report(sim.elapsed, sim.hands_played))
+    if not sim.settings.test_mode:
         sim.save_results()
     else:
         print("Test mode enabled: results kept in temporary tables only.")
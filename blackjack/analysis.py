@@ -0,0 +1,308 @@
+"""Combinatorial analysis of a rule set and strategy.
+
+:class:`ExactAnalyzer` computes dealer final-total distributions and player
+expected values by recursing over the cards remaining in the shoe instead of
+simulating.  The rules match :mod:`blackjack.engine`: the dealer has no hole
+card check, so a dealer blackjack takes every wager on the table (including
+doubles and splits), surrender is decided before the dealer's hand is known
+and returns half the bet, and a two-card 21 after a split is paid as a
+blackjack.
+
+Dealer probabilities are computed exactly for a given shoe composition and
+memoized in a bounded LRU cache keyed by the cards removed from the shoe,
+as are the EVs of hands played on.  Split hands are evaluated by playing one
+post-split hand and doubling its value, without resplits; this is the usual
+simplification and is within a few hundredths of a percent of the engine.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .settings import SimulationSettings
+from .strategy import BasicStrategy, TABLE_TOTALS, UP_INDEX
+
+# Ranks by value index: aces first, then 2-9, then every ten-valued card.
+VALUE_RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10"]
+_VALUE_INDEX = {rank: i for i, rank in enumerate(VALUE_RANKS)}
+_VALUE_INDEX.update({"J": 9, "Q": 9, "K": 9})
+_HARD = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+_UP_COLUMN = [UP_INDEX[rank] for rank in VALUE_RANKS]
+
+DEALER_OUTCOMES = ("17", "18", "19", "20", "21", "bust", "blackjack")
+_BUST, _BLACKJACK = 5, 6
+
+# Multisets of cards are packed into one integer, ``_BITS`` bits per value.
+_BITS = 6
+_MASK = (1 << _BITS) - 1
+
+DEFAULT_CACHE_SIZE = 100_000
+
+
+def _key(counts: Sequence[int]) -> int:
+    return sum(n << (_BITS * i) for i, n in enumerate(counts))
+
+
+def _count(key: int, value: int) -> int:
+    return (key >> (_BITS * value)) & _MASK
+
+
+def _value_index(rank: str) -> int:
+    try:
+        return _VALUE_INDEX[rank]
+    except KeyError:
+        raise ValueError(f"Unknown rank '{rank}'") from None
+
+
+class ExactAnalyzer:
+    """Exact dealer probabilities and player EVs for ``settings``.
+
+    Only ``num_decks``, ``hit_soft_17``, ``blackjack_payout``,
+    ``double_after_split`` and ``allow_surrender`` are used; resplits are not
+    modelled, so ``resplit_aces`` has no effect.
+    EVs are expressed in units of the initial wager.
+
+    By default the dealer's shoe is conditioned on the three cards of the
+    initial deal (both player cards and the up-card), while the player's own
+    draws always use the exact remaining composition.  ``exact_dealer=True``
+    also removes every card the player draws from the dealer's shoe; that is
+    fully composition dependent but needs a dealer recursion per player hand
+    and takes about a minute per deck count.
+    """
+
+    def __init__(
+        self,
+        settings: SimulationSettings,
+        strategy: Optional[BasicStrategy] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        exact_dealer: bool = False,
+    ):
+        if settings.num_decks < 1:
+            raise ValueError("num_decks must be at least 1")
+        if strategy is None:
+            strategy = BasicStrategy.from_json(
+                settings.strategy_file, allow_surrender=settings.allow_surrender
+            )
+        self.settings = settings
+        self.exact_dealer = exact_dealer
+        self.table, pairs = strategy.lookup_tables()
+        # Split flags by value index; ten-valued pairs use the "10" row.
+        self.pairs = [pairs[v * 10:(v + 1) * 10] for v in range(10)]
+        self.shoe = [4 * settings.num_decks] * 9 + [16 * settings.num_decks]
+        self.shoe_total = 52 * settings.num_decks
+        self._dealer = lru_cache(maxsize=cache_size)(self._dealer_probs)
+        self._play = lru_cache(maxsize=cache_size)(self._play_on)
+
+    # -- dealer -------------------------------------------------------------
+
+    def _dealer_probs(self, removed: int, up: int) -> Tuple[float, ...]:
+        """Dealer outcome probabilities with *removed* cards out of the shoe."""
+        shoe = [self.shoe[v] - _count(removed, v) for v in range(10)]
+        total = sum(shoe)
+        h17 = self.settings.hit_soft_17
+        memo: Dict[int, List[float]] = {}
+
+        def stands(hard: int, aces: int) -> int:
+            """Outcome index the dealer finishes on, or -1 to keep drawing."""
+            if hard > 21:
+                return _BUST
+            if aces and hard <= 11:
+                if hard > 7 or (hard == 7 and not h17):
+                    return hard - 7
+                return -1
+            return hard - 17 if hard >= 17 else -1
+
+        def rec(hard: int, aces: int, drawn: int, left: int) -> List[float]:
+            # Terminal children are settled inline; only hands that keep
+            # drawing recurse, memoized on the multiset drawn so far.
+            out = memo.get(drawn)
+            if out is not None:
+                return out
+            out = [0.0] * 7
+            for v in range(10):
+                n = shoe[v] - ((drawn >> (_BITS * v)) & _MASK)
+                if n <= 0:
+                    continue
+                p = n / left
+                h = hard + _HARD[v]
+                a = aces + (v == 0)
+                outcome = stands(h, a)
+                if outcome >= 0:
+                    out[outcome] += p
+                else:
+                    sub = rec(h, a, drawn + (1 << (_BITS * v)), left - 1)
+                    for i in range(7):
+                        out[i] += p * sub[i]
+            memo[drawn] = out
+            return out
+
+        probs = rec(_HARD[up], int(up == 0), 0, total)
+        if up in (0, 9):
+            # A two-card 21 is a blackjack, not a plain 21.
+            hole = 9 if up == 0 else 0
+            bj = shoe[hole] / total
+            probs = list(probs)
+            probs[4] -= bj
+            probs[_BLACKJACK] += bj
+        return tuple(probs)
+
+    def dealer_distribution(self, up: str, removed: Sequence[str] = ()) -> Dict[str, float]:
+        """Final dealer outcome probabilities for up-card *up*.
+
+        *removed* lists cards known to be out of the shoe besides the up-card,
+        e.g. the player's hand.
+        """
+        counts = [0] * 10
+        for rank in (*removed, up):
+            counts[_value_index(rank)] += 1
+        if any(counts[v] > self.shoe[v] for v in range(10)):
+            raise ValueError("More cards removed than the shoe holds")
+        probs = self._dealer(_key(counts), _value_index(up))
+        return dict(zip(DEALER_OUTCOMES, probs))
+
+    # -- player -------------------------------------------------------------
+
+    def _action(self, hard: int, aces: int, up: int, can_double: bool, can_surrender: bool = False) -> str:
+        soft = aces > 0 and hard <= 11
+        best = hard + 10 if soft else hard
+        index = ((soft * TABLE_TOTALS + best) * 10 + _UP_COLUMN[up]) * 4
+        return self.table[index + can_double + 2 * can_surrender]
+
+    def _stand(self, hard: int, aces: int, dealer_key: int, up: int, natural: bool = False) -> float:
+        """EV of standing on a hand against the dealer's shoe *dealer_key*."""
+        if hard > 21:
+            return -1.0
+        probs = self._dealer(dealer_key, up)
+        if natural:
+            return self.settings.blackjack_payout * (1.0 - probs[_BLACKJACK])
+        best = hard + 10 if aces and hard <= 11 else hard
+        ev = probs[_BUST] - probs[_BLACKJACK]
+        for i in range(5):
+            dealer = 17 + i
+            if dealer < best:
+                ev += probs[i]
+            elif dealer > best:
+                ev -= probs[i]
+        return ev
+
+    def _draws(self, removed: int, dealer_key: int):
+        """Yield ``(value, probability, removed, dealer_key)`` for the next card."""
+        left = self.shoe_total - sum(_count(removed, v) for v in range(10))
+        for v in range(10):
+            n = self.shoe[v] - _count(removed, v)
+            if n > 0:
+                bit = 1 << (_BITS * v)
+                yield v, n / left, removed + bit, dealer_key + bit if self.exact_dealer else dealer_key
+
+    def _play_on(self, hard: int, aces: int, removed: int, dealer_key: int, up: int) -> float:
+        """EV of a hand of three or more cards played on by the strategy.
+
+        Memoized as :meth:`_play` on every argument: the removed cards can
+        include a split partner, so the hand itself is part of the key, and
+        different up-cards can leave the same cards removed.
+        """
+        if hard > 21:
+            return -1.0
+        if self._action(hard, aces, up, False) == "hit":
+            return self._hit(hard, aces, removed, dealer_key, up)
+        return self._stand(hard, aces, dealer_key, up)
+
+    def _hit(self, hard: int, aces: int, removed: int, dealer_key: int, up: int) -> float:
+        return sum(
+            p * self._play(hard + _HARD[v], aces + (v == 0), after, dk, up)
+            for v, p, after, dk in self._draws(removed, dealer_key)
+        )
+
+    def _double(self, hard: int, aces: int, removed: int, dealer_key: int, up: int) -> float:
+        return 2 * sum(
+            p * self._stand(hard + _HARD[v], aces + (v == 0), dk, up)
+            for v, p, _, dk in self._draws(removed, dealer_key)
+        )
+
+    def _two_card(self, a: int, b: int, removed: int, dealer_key: int, up: int, split: bool) -> Dict[str, float]:
+        """EVs of the actions available on a two-card hand."""
+        hard = _HARD[a] + _HARD[b]
+        aces = (a == 0) + (b == 0)
+        natural = hard == 11 and aces == 1
+        evs = {"stand": self._stand(hard, aces, dealer_key, up, natural)}
+        if natural:
+            return evs
+        evs["hit"] = self._hit(hard, aces, removed, dealer_key, up)
+        if not split or self.settings.double_after_split:
+            evs["double"] = self._double(hard, aces, removed, dealer_key, up)
+        return evs
+
+    def _split(self, rank: int, removed: int, up: int) -> float:
+        """EV of splitting a pair of *rank*, counting both hands."""
+        ev = 0.0
+        for v, p, after, dk in self._draws(removed, removed):
+            if rank == 0:
+                # Split aces receive one card and stand.
+                hard = 1 + _HARD[v]
+                aces = 1 + (v == 0)
+                ev += p * self._stand(hard, aces, dk, up, hard == 11 and aces == 1)
+                continue
+            evs = self._two_card(rank, v, after, dk, up, split=True)
+            ev += p * self._follow(evs, rank, v, up, can_surrender=False)
+        return 2 * ev
+
+    def _follow(self, evs: Dict[str, float], a: int, b: int, up: int, can_surrender: bool) -> float:
+        """EV of the action the strategy picks given the action EVs *evs*."""
+        if "hit" not in evs:
+            return evs["stand"]
+        hard = _HARD[a] + _HARD[b]
+        aces = (a == 0) + (b == 0)
+        action = self._action(hard, aces, up, "double" in evs, can_surrender)
+        if action == "surrender":
+            return -0.5
+        return evs.get(action, evs["stand"])
+
+    def action_evs(self, cards: Sequence[str], up: str) -> Dict[str, float]:
+        """EV of every action available on the initial two-card hand *cards*.
+
+        After the first action the hand follows the strategy.  The result
+        also includes ``"strategy"``, the EV of the action the strategy picks.
+        """
+        if len(cards) != 2:
+            raise ValueError("action_evs expects the two initial cards")
+        a, b = (_value_index(c) for c in cards)
+        u = _value_index(up)
+        counts = [0] * 10
+        for v in (a, b, u):
+            counts[v] += 1
+        removed = _key(counts)
+        evs = self._two_card(a, b, removed, removed, u, split=False)
+        if "hit" in evs and self.settings.allow_surrender:
+            evs["surrender"] = -0.5
+        split = a == b and self.pairs[a][_UP_COLUMN[u]]
+        if a == b:
+            # Both pair cards stay out of the shoe: one starts each hand.
+            evs["split"] = self._split(a, removed, u)
+        if split:
+            evs["strategy"] = evs["split"]
+        else:
+            evs["strategy"] = self._follow(evs, a, b, u, self.settings.allow_surrender)
+        return evs
+
+    def expected_value(self) -> float:
+        """EV per round of following the strategy, in initial wagers."""
+        ev = 0.0
+        total = self.shoe_total
+        for a in range(10):
+            pa = self.shoe[a] / total
+            for u in range(10):
+                pu = (self.shoe[u] - (u == a)) / (total - 1)
+                for b in range(a, 10):
+                    nb = self.shoe[b] - (b == a) - (b == u)
+                    if nb <= 0:
+                        continue
+                    pb = nb / (total - 2)
+                    # (a, b) and (b, a) reach the same hand.
+                    weight = pa * pu * pb
+                    if b != a:
+                        pb_first = self.shoe[b] / total
+                        pu_b = (self.shoe[u] - (u == b)) / (total - 1)
+                        pa_second = (self.shoe[a] - (a == b) - (a == u)) / (total - 2)
+                        weight += pb_first * pu_b * pa_second
+                    evs = self.action_evs((VALUE_RANKS[a], VALUE_RANKS[b]), VALUE_RANKS[u])
+                    ev += weight * evs["strategy"]
+        return ev
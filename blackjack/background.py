@@ -0,0 +1,69 @@
+"""Run a simulation on a background thread and stream its progress.
+
+:class:`SimulationWorker` owns the simulator while it runs and posts events
+to a :class:`queue.Queue` that the GUI drains from ``root.after``:
+
+``("progress", trial, hands_played, new_rows)``
+    the run reached *hands_played* hands into *trial*; mid-trial,
+    *new_rows* holds the ``(trial, hand, bankroll)`` rows recorded since
+    the previous event, so the GUI can draw a trial while it is played;
+``("trial", trial, hands_played, bankroll)``
+    a trial finished and was written;
+``("done", cancelled)`` / ``("error", exception)``
+    the run ended; :attr:`SimulationWorker.sim` may be used again.
+
+The database connection is opened with ``check_same_thread=False`` so it
+can be handed from the worker back to the thread that created it, but it is
+only ever used by one thread at a time: the worker until it posts ``done``
+or ``error``, its owner afterwards.
+"""
+from __future__ import annotations
+import bisect
+import queue
+import sqlite3
+import threading
+from typing import List
+
+from .control import RunControl
+from .engine import TrialResult
+from .settings import SimulationSettings
+from .simulator import Simulator
+from .storage import configure_connection
+
+
+class SimulationWorker(threading.Thread):
+    def __init__(self, settings: SimulationSettings, events: queue.Queue | None = None):
+        super().__init__(name="blackjack-simulation", daemon=True)
+        self.events = events if events is not None else queue.Queue()
+        self.control = RunControl(on_progress=self._progress, on_trial=self._trial)
+        conn = sqlite3.connect(settings.database, check_same_thread=False)
+        configure_connection(conn, synchronous=settings.sqlite_synchronous)
+        self.sim = Simulator(settings, conn=conn)
+        self._trial_in_progress = 0
+        self._last_hand = 0
+
+    def _progress(self, trial: int, hands_played: int, rows: List[tuple] | None) -> None:
+        if trial != self._trial_in_progress:
+            self._trial_in_progress, self._last_hand = trial, 0
+        new_rows: List[tuple] = []
+        if rows:
+            # Checkpoints drain the list, so find the unsent rows by hand number.
+            start = bisect.bisect_right(rows, self._last_hand, key=lambda row: row[1])
+            new_rows = rows[start:]
+            if new_rows:
+                self._last_hand = new_rows[-1][1]
+        self.events.put(("progress", trial, hands_played, new_rows))
+
+    def _trial(self, result: TrialResult) -> None:
+        self.events.put(("trial", result.trial, result.hands_played, result.bankroll))
+
+    def run(self) -> None:
+        try:
+            # Rows of runs discarded earlier are deleted here, off the GUI thread.
+            self.sim.purge_discarded()
+            self.sim.run(control=self.control)
+        except Exception as exc:  # reported to the owning thread
+            self.sim.conn.rollback()
+            self.events.put(("error", exc))
+        else:
+            self.events.put(("done", self.sim.cancelled))
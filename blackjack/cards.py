@@ -1,41 +1,69 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional, Protocol, Tuple
 import random
 
 SUITS = ["hearts", "diamonds", "clubs", "spades"]
 RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
 
-@dataclass(frozen=True)
+# Index of each rank in ``RANKS`` and its blackjack value (aces count 11).
+RANK_INDEX: Dict[str, int] = {rank: i for i, rank in enumerate(RANKS)}
+RANK_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+_VALUES_BY_RANK: Dict[str, int] = dict(zip(RANKS, RANK_VALUES))
+
+@dataclass(frozen=True, slots=True)
 class Card:
     rank: str
     suit: str
 
     @property
     def value(self) -> int:
-        if self.rank in ["J", "Q", "K"]:
-            return 10
-        if self.rank == "A":
-            return 11
-        return int(self.rank)
+        return _VALUES_BY_RANK[self.rank]
+
+# Cards are encoded as ``rank_index * 4 + suit_index``.  The shoe only stores
+# these small integers and decodes them through this table, so drawing hands
+# out one of 52 shared ``Card`` instances instead of allocating a new one.
+# A plain list of codes is used rather than an ``array``: CPython's small-int
+# cache means no per-card allocation either way, and list pops and shuffles
+# are measurably faster.
+CARDS = tuple(Card(rank, suit) for rank in RANKS for suit in SUITS)
+_DECK = list(range(len(CARDS)))
+
+class ShoeWatcher(Protocol):
+    """Receives every card code drawn from a :class:`Shoe` it watches."""
+
+    def seen(self, code: int) -> None: ...
+
+    def reset(self) -> None: ...
+
 
 @dataclass
 class Shoe:
     num_decks: int
     penetration: float = 0.75
-    _cards: List[Card] = field(default_factory=list, init=False)
-    _discard: List[Card] = field(default_factory=list, init=False)
-    drawn_counts: dict = field(default_factory=lambda: {rank:0 for rank in RANKS}, init=False)
+    # Source of randomness for shuffles; ``None`` uses the global ``random`` module.
+    rng: Optional[random.Random] = field(default=None, repr=False, compare=False)
+    _cards: List[int] = field(default_factory=list, init=False, repr=False)
+    # Cards of each rank (in ``RANKS`` order) left since the last shuffle.
+    _remaining: List[int] = field(default_factory=lambda: [0] * len(RANKS), init=False, repr=False)
+    _watchers: List[ShoeWatcher] = field(default_factory=list, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.shuffle()
 
     def shuffle(self) -> None:
-        self._cards = [Card(rank, suit) for rank in RANKS for suit in SUITS] * self.num_decks
-        random.shuffle(self._cards)
-        self._discard.clear()
-        # Reset counts of drawn cards on shuffle
-        self.drawn_counts = {rank: 0 for rank in RANKS}
+        self._cards = _DECK * self.num_decks
+        (self.rng or random).shuffle(self._cards)
+        self._remaining = [4 * self.num_decks] * len(RANKS)
+        for watcher in self._watchers:
+            watcher.reset()
+
+    def watch(self, watcher: ShoeWatcher) -> None:
+        """Pass every card drawn from now on to ``watcher.seen``.
+
+        ``watcher.reset`` is called whenever the shoe is shuffled.
+        """
+        self._watchers.append(watcher)
 
     def draw(self) -> Card:
         """Draw a card from the shoe.
@@ -53,13 +81,42 @@ class Shoe:
                 # After reshuffling there are still no cards available
                 raise RuntimeError("Cannot draw from an empty shoe")
 
-        card = self._cards.pop()
-        self._discard.append(card)
-        self.drawn_counts[card.rank] += 1
-        return card
+        code = self._cards.pop()
+        self._remaining[code >> 2] -= 1
+        if self._watchers:
+            for watcher in self._watchers:
+                watcher.seen(code)
+        return CARDS[code]
+
+    @property
+    def drawn_counts(self) -> Dict[str, int]:
+        """Number of cards of each rank drawn since the last shuffle."""
+        full = 4 * self.num_decks
+        return {rank: full - left for rank, left in zip(RANKS, self._remaining)}
+
+    @property
+    def cards_remaining(self) -> int:
+        return len(self._cards)
+
+    def remaining(self, rank: str) -> int:
+        """Cards of *rank* still in the shoe."""
+        return self._remaining[RANK_INDEX[rank]]
+
+    def snapshot(self) -> Tuple[int, ...]:
+        """Cards left of each rank, in ``RANKS`` order.
+
+        The counts are kept up to date by :meth:`draw` and :meth:`shuffle`,
+        so this copies thirteen integers whatever the size of the shoe.
+        """
+        return tuple(self._remaining)
+
+    def value_snapshot(self) -> Tuple[int, ...]:
+        """Cards left by blackjack value: aces, 2-9, then all ten-valued cards."""
+        left = self._remaining
+        return (*left[:9], left[9] + left[10] + left[11] + left[12])
 
     @property
     def penetration_reached(self) -> bool:
-        used = len(self._discard)
         total = self.num_decks * 52
+        used = total - len(self._cards)
         return used / total >= self.penetration
@@ -0,0 +1,63 @@
+"""Thread-safe handle for following, pausing and cancelling a running simulation."""
+from __future__ import annotations
+from typing import Callable, List, Optional
+import threading
+
+from .engine import TrialResult
+
+
+class RunControl:
+    """Shared between a running :class:`~blackjack.simulator.Simulator` and its owner.
+
+    The simulator calls :meth:`checkpoint` between slices of rounds and
+    :meth:`trial_finished` after writing each trial; both run on the
+    simulating thread, so the callbacks must hand data over (for example
+    through a queue) rather than touch a GUI directly.
+    """
+
+    def __init__(
+        self,
+        on_progress: Optional[Callable[[int, int, Optional[List[tuple]]], None]] = None,
+        on_trial: Optional[Callable[[TrialResult], None]] = None,
+    ):
+        self.on_progress = on_progress
+        self.on_trial = on_trial
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def pause(self) -> None:
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        # Wake a paused run so it can stop.
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def checkpoint(
+        self, trial: int, hands_played: int, bankroll_rows: Optional[List[tuple]] = None
+    ) -> bool:
+        """Report progress, block while paused and return ``False`` once cancelled.
+
+        *bankroll_rows* is the trial's list of rows not yet written by a
+        checkpoint; mid-trial it keeps growing once this returns.
+        """
+        if self.on_progress is not None:
+            self.on_progress(trial, hands_played, bankroll_rows)
+        self._running.wait()
+        return not self._cancelled.is_set()
+
+    def trial_finished(self, result: TrialResult) -> None:
+        if self.on_trial is not None:
+            self.on_trial(result)
@@ -0,0 +1,221 @@
+"""Card counting: running and true counts, bet ramps and index plays.
+
+A :class:`Counter` watches a :class:`~blackjack.cards.Shoe` and adds the tag
+of each card as it is drawn, so keeping the count costs one addition per
+card.  The count includes the dealer's hole card as soon as it is dealt,
+which only matters for the few decisions taken before it is turned over.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+import math
+
+from .cards import RANKS, Shoe
+from .hand import Hand
+from .strategy import Action, BasicStrategy, UP_INDEX, _COLUMN_KEY
+
+# Tags per rank in ``RANKS`` order (A, 2..10, J, Q, K).
+HI_LO = (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1)
+KO = (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1)
+HI_OPT_I = (0, 0, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1)
+OMEGA_II = (0, 1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2)
+ZEN = (-1, 1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2)
+
+TAG_SYSTEMS: Dict[str, Tuple[int, ...]] = {
+    "hi-lo": HI_LO,
+    "ko": KO,
+    "hi-opt-i": HI_OPT_I,
+    "omega-ii": OMEGA_II,
+    "zen": ZEN,
+}
+# Unbalanced systems gain this much per full deck, so they start each shoe
+# below zero: KO starts at ``4 - 4 * decks``.
+_UNBALANCE_PER_DECK = {"ko": 4}
+
+
+def initial_count(system: str, num_decks: int) -> int:
+    """Running count of *system* after a shuffle of *num_decks* decks."""
+    return _UNBALANCE_PER_DECK.get(system, 0) * (1 - num_decks)
+
+
+class Counter:
+    """Running count of the cards drawn from a shoe since its last shuffle.
+
+    ``tags`` gives the value of each rank in :data:`~blackjack.cards.RANKS`
+    order; ``initial`` is the count after a shuffle (non-zero for
+    unbalanced systems such as KO).
+    """
+
+    def __init__(self, tags: Sequence[int] = HI_LO, initial: int = 0):
+        if len(tags) != len(RANKS):
+            raise ValueError(f"A tag table needs {len(RANKS)} entries")
+        # Indexed by card code so ``seen`` needs no rank lookup.
+        self._tags = [tags[code >> 2] for code in range(len(RANKS) * 4)]
+        self.initial = initial
+        self.running = initial
+        self.shoe: Shoe | None = None
+
+    def attach(self, shoe: Shoe) -> "Counter":
+        self.shoe = shoe
+        self.reset()
+        shoe.watch(self)
+        return self
+
+    def seen(self, code: int) -> None:
+        self.running += self._tags[code]
+
+    def reset(self) -> None:
+        self.running = self.initial
+
+    @property
+    def decks_remaining(self) -> float:
+        return self.shoe.cards_remaining / 52 if self.shoe else 0.0
+
+    @property
+    def true_count(self) -> float:
+        """Running count per remaining deck (the running count itself near the end)."""
+        decks = self.decks_remaining
+        return self.running / decks if decks >= 0.5 else float(self.running)
+
+
+@dataclass
+class BetRamp:
+    """Bet size in units as a function of the floored true count.
+
+    ``steps`` holds ``(true_count, units)`` pairs; the last step whose true
+    count is reached applies, and one unit is bet below the first.
+    """
+
+    steps: Sequence[Tuple[int, float]] = ()
+
+    def __post_init__(self) -> None:
+        self.steps = sorted(self.steps)
+
+    @classmethod
+    def linear(cls, spread: float) -> "BetRamp":
+        """Bet the true count in units, between one unit and *spread*."""
+        return cls([(tc, min(float(tc), spread)) for tc in range(2, math.ceil(spread) + 1)])
+
+    def units(self, true_count: float) -> float:
+        tc = math.floor(true_count)
+        units = 1.0
+        for threshold, value in self.steps:
+            if tc < threshold:
+                break
+            units = value
+        return units
+
+
+@dataclass(frozen=True)
+class IndexPlay:
+    """Play *action* instead of basic strategy depending on the true count.
+
+    ``kind`` is ``"hard"``, ``"soft"`` or ``"pair"`` and ``total`` the hand
+    total (or pair rank).  The deviation applies at or above ``index``, or
+    below it when ``above`` is false.
+    """
+
+    kind: str
+    total: int | str
+    up: str
+    index: float
+    action: Action
+    above: bool = True
+
+    def applies(self, true_count: float) -> bool:
+        return true_count >= self.index if self.above else true_count < self.index
+
+
+# The Illustrious 18 (without insurance, which the simulator does not offer)
+# and the Fab 4 surrenders, for Hi-Lo in a shoe game.
+ILLUSTRIOUS_18: Tuple[IndexPlay, ...] = (
+    IndexPlay("hard", 16, "10", 0, "stand"),
+    IndexPlay("hard", 15, "10", 4, "stand"),
+    IndexPlay("pair", "10", "5", 5, "split"),
+    IndexPlay("pair", "10", "6", 4, "split"),
+    IndexPlay("hard", 10, "10", 4, "double"),
+    IndexPlay("hard", 12, "3", 2, "stand"),
+    IndexPlay("hard", 12, "2", 3, "stand"),
+    IndexPlay("hard", 11, "A", 1, "double"),
+    IndexPlay("hard", 9, "2", 1, "double"),
+    IndexPlay("hard", 10, "A", 4, "double"),
+    IndexPlay("hard", 9, "7", 3, "double"),
+    IndexPlay("hard", 16, "9", 5, "stand"),
+    IndexPlay("hard", 13, "2", -1, "hit", above=False),
+    IndexPlay("hard", 12, "4", 0, "hit", above=False),
+    IndexPlay("hard", 12, "5", -2, "hit", above=False),
+    IndexPlay("hard", 12, "6", -1, "hit", above=False),
+    IndexPlay("hard", 13, "3", -2, "hit", above=False),
+)
+FAB_4: Tuple[IndexPlay, ...] = (
+    IndexPlay("hard", 14, "10", 3, "surrender"),
+    IndexPlay("hard", 15, "10", 0, "surrender"),
+    IndexPlay("hard", 15, "9", 2, "surrender"),
+    IndexPlay("hard", 15, "A", 1, "surrender"),
+)
+# Index plays per tag system.  The indices are true counts on the scale of
+# that system's tags, so the Hi-Lo set does not carry over to other systems;
+# those count for betting only.
+INDEX_PLAYS: Dict[str, Tuple[IndexPlay, ...]] = {"hi-lo": FAB_4 + ILLUSTRIOUS_18}
+
+
+@dataclass
+class CountingStrategy:
+    """Basic strategy with index plays driven by a :class:`Counter`.
+
+    The default deviations are the Hi-Lo ones of :data:`INDEX_PLAYS`.
+    Deviations are checked in order; one needing an option that is not
+    available (a double after the first two cards, say) is skipped, and
+    hands without an applicable deviation follow *base*.  When *base*
+    surrenders and surrender is available, only a surrender deviation
+    applies.
+    """
+
+    base: BasicStrategy
+    counter: Counter
+    deviations: Sequence[IndexPlay] = INDEX_PLAYS["hi-lo"]
+    _plays: Dict[tuple, List[IndexPlay]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for play in self.deviations:
+            total = _COLUMN_KEY.get(play.total, play.total) if play.kind == "pair" else play.total
+            key = (play.kind, total, UP_INDEX[play.up])
+            self._plays.setdefault(key, []).append(play)
+
+    def _deviation(self, key: tuple, options: Dict[str, bool]) -> Action | None:
+        plays = self._plays.get(key)
+        if not plays:
+            return None
+        tc = self.counter.true_count
+        for play in plays:
+            if not play.applies(tc):
+                continue
+            if play.action == "double" and not options.get("can_double"):
+                continue
+            if play.action == "surrender" and not options.get("can_surrender"):
+                continue
+            return play.action
+        return None
+
+    def decide(self, hand: Hand, dealer_up: str, options: Dict[str, bool]) -> Action:
+        up = UP_INDEX[dealer_up]
+        if options.get("can_split") and hand.can_split:
+            rank = hand.cards[0].rank
+            action = self._deviation(("pair", _COLUMN_KEY.get(rank, rank), up), options)
+            if action:
+                return action
+            # A pair basic strategy splits is not played as its total.
+            action = self.base.decide(hand, dealer_up, options)
+            if action == "split":
+                return action
+        kind = "soft" if hand.is_soft else "hard"
+        action = self._deviation((kind, hand.best_value, up), options)
+        if action is None:
+            return self.base.decide(hand, dealer_up, options)
+        if action != "surrender" and options.get("can_surrender"):
+            # Surrendering is worth more than the hit/stand index plays of
+            # the same hand, so only a surrender deviation goes before it.
+            base = self.base.decide(hand, dealer_up, options)
+            if base == "surrender":
+                return base
+        return action
@@ -1,19 +1,73 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import List
 
-from .cards import Shoe
+from .cards import RANKS, Shoe
 from .hand import Hand
 
+# Dealer play walks a table of states instead of re-deriving the hand's
+# value after every card.  A state is ``hard * 2 + has_ace`` where ``hard``
+# counts aces as one; an ace counts eleven whenever ``hard <= 11``.  States
+# above hard 21 are busts, and the dealer never draws from hard 17 or more,
+# so hard totals stop at 26.
+_MAX_HARD = 26
+_STATES = 2 * (_MAX_HARD + 1)
+# Hard value of each rank, keyed by rank.
+_HARD_VALUES = {rank: 1 if rank == "A" else min(10, i + 1) for i, rank in enumerate(RANKS)}
+
+
+def _stands(hit_soft_17: bool) -> List[bool]:
+    """Whether the dealer stands in each state."""
+    table = []
+    for state in range(_STATES):
+        hard, ace = divmod(state, 2)
+        soft = ace and hard <= 11
+        best = hard + 10 if soft else hard
+        table.append(best > 17 or (best == 17 and not (hit_soft_17 and soft)))
+    return table
+
+
+def _transitions() -> List[List[int]]:
+    """``_NEXT[state][value]``: the state after drawing a card of hard *value*."""
+    table = []
+    for state in range(_STATES):
+        hard, ace = divmod(state, 2)
+        row = [state] * 11
+        for value in range(1, 11):
+            if hard + value <= _MAX_HARD:
+                row[value] = 2 * (hard + value) + (ace or value == 1)
+        table.append(row)
+    return table
+
+
+_STANDS_S17 = _stands(False)
+_STANDS_H17 = _stands(True)
+_NEXT = _transitions()
+
+
 @dataclass
 class Dealer:
     hit_soft_17: bool = False
 
     def play(self, hand: Hand, shoe: Shoe) -> Hand:
+        """Draw from *shoe* until the dealer stands on *hand*."""
+        hard = hand.hard_total
+        if hard >= 17:
+            return hand
+        stands = _STANDS_H17 if self.hit_soft_17 else _STANDS_S17
+        state = 2 * hard + (hand.aces > 0)
+        if stands[state]:
+            return hand
+        draw, values, transitions = shoe.draw, _HARD_VALUES, _NEXT
+        drawn = []
+        aces = 0
         while True:
-            value = hand.best_value
-            soft = any(v <= 21 and v != value for v in hand.values)
-            if value < 17 or (value == 17 and soft and self.hit_soft_17):
-                hand.add_card(shoe.draw())
-                continue
-            break
-        return hand
+            card = draw()
+            drawn.append(card)
+            value = values[card.rank]
+            if value == 1:
+                aces += 1
+            state = transitions[state][value]
+            if stands[state]:
+                hand.extend_counted(drawn, state >> 1, aces)
+                return hand
@@ -0,0 +1,210 @@
+"""Level-of-detail bankroll curves for plotting very long trials.
+
+While rows are written, :class:`LodBuilder` folds each trial's
+``temp_bankroll`` rows into a pyramid of buckets stored in
+``temp_bankroll_lod``.  A bucket of level *L* covers ``LOD_FACTOR ** L``
+hands and keeps the lowest and highest bankroll inside it (with the hands
+they happened on) and the closing bankroll, so every level preserves the
+extremes a line plot would show.  Level 0 is ``temp_bankroll`` itself.
+
+:func:`curve` picks the coarsest level that still gives about the requested
+number of points over a range of hands, so redrawing (or re-querying after
+a zoom) costs the same for a trial of a thousand hands as for one of a
+hundred million.  :func:`overlay` and :func:`percentile_bands` do the same
+across trials.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Sequence, Tuple
+import sqlite3
+
+# Hands per bucket grow by this factor from one level to the next.
+LOD_FACTOR = 16
+# Levels above the raw rows; the top one has buckets of 16**6 (~16.8M) hands.
+LOD_LEVELS = 6
+
+Point = Tuple[int, float]
+
+
+class LodBuilder:
+    """Streaming min/max/close buckets for one trial's bankroll rows.
+
+    Rows must arrive in hand order, possibly over several :meth:`add`
+    calls (for example across checkpoints).  The builder is pickled with
+    the unfinished trial, so a resumed run carries on the same buckets.
+    """
+
+    def __init__(self, trial: int, factor: int = LOD_FACTOR, levels: int = LOD_LEVELS):
+        self.trial = trial
+        self.factor = factor
+        self.levels = levels
+        # Per level: [bucket, min_hand, min_bankroll, max_hand, max_bankroll,
+        # close_hand, close_bankroll] of the bucket still being filled.
+        self._open: List[list | None] = [None] * (levels + 1)
+
+    def add(self, rows: Iterable[tuple]) -> List[tuple]:
+        """Fold ``(trial, hand, bankroll)`` *rows* in; return the buckets they completed."""
+        out: List[tuple] = []
+        factor = self.factor
+        current = self._open[1]
+        for _, hand, bankroll in rows:
+            bucket = hand // factor
+            if current is not None and current[0] == bucket:
+                if bankroll < current[2]:
+                    current[1], current[2] = hand, bankroll
+                elif bankroll > current[4]:
+                    current[3], current[4] = hand, bankroll
+                current[5], current[6] = hand, bankroll
+                continue
+            if current is not None:
+                self._complete(1, current, out)
+            current = self._open[1] = [bucket, hand, bankroll, hand, bankroll, hand, bankroll]
+        return out
+
+    def close(self) -> List[tuple]:
+        """Return the partly filled buckets of every level; call once the trial ends."""
+        out: List[tuple] = []
+        for level in range(1, self.levels + 1):
+            current = self._open[level]
+            if current is not None:
+                self._open[level] = None
+                self._complete(level, current, out)
+        return out
+
+    def _complete(self, level: int, bucket: list, out: List[tuple]) -> None:
+        out.append((self.trial, level, *bucket))
+        if level == self.levels:
+            return
+        parent_id = bucket[0] // self.factor
+        parent = self._open[level + 1]
+        if parent is not None and parent[0] == parent_id:
+            if bucket[2] < parent[2]:
+                parent[1], parent[2] = bucket[1], bucket[2]
+            if bucket[4] > parent[4]:
+                parent[3], parent[4] = bucket[3], bucket[4]
+            parent[5], parent[6] = bucket[5], bucket[6]
+            return
+        if parent is not None:
+            self._complete(level + 1, parent, out)
+        self._open[level + 1] = [parent_id, *bucket[1:]]
+
+
+def choose_level(first_hand: int, last_hand: int, points: int, factor: int = LOD_FACTOR,
+                 levels: int = LOD_LEVELS) -> int:
+    """Coarsest level giving at least *points* points between the two hands.
+
+    Each bucket is drawn as two points (its minimum and maximum).
+    """
+    span = max(1, last_hand - first_hand)
+    level = 0
+    while level < levels and span / factor ** (level + 1) * 2 >= points:
+        level += 1
+    return level
+
+
+def _bucket_points(rows: Iterable[Sequence]) -> List[Point]:
+    points: List[Point] = []
+    for min_hand, min_bankroll, max_hand, max_bankroll in rows:
+        if min_hand <= max_hand:
+            points.append((min_hand, min_bankroll))
+            if max_hand != min_hand:
+                points.append((max_hand, max_bankroll))
+        else:
+            points.extend(((max_hand, max_bankroll), (min_hand, min_bankroll)))
+    return points
+
+
+def curve(
+    conn: sqlite3.Connection,
+    trial: int,
+    first_hand: int = 0,
+    last_hand: int | None = None,
+    points: int = 2000,
+    table: str = "temp_bankroll",
+) -> List[Point]:
+    """``(hand, bankroll)`` points of *trial* between two hands at a suitable level.
+
+    *last_hand* defaults to the end of the trial.  Below the lowest level
+    the raw rows of *table* are returned.
+    """
+    lod = f"{table}_lod"
+    if last_hand is None:
+        last_hand = conn.execute(
+            f"SELECT MAX(close_hand) FROM {lod} WHERE trial = ? AND level = 1", (trial,)
+        ).fetchone()[0]
+        if last_hand is None:
+            # No pyramid (an older run); fall back to the raw rows.
+            last_hand = conn.execute(f"SELECT MAX(hand) FROM {table} WHERE trial = ?", (trial,)).fetchone()[0]
+            if last_hand is None:
+                return []
+    level = choose_level(first_hand, last_hand, points)
+    if level == 0:
+        return conn.execute(
+            f"SELECT hand, bankroll FROM {table} WHERE trial = ? AND hand BETWEEN ? AND ? ORDER BY hand",
+            (trial, first_hand, last_hand),
+        ).fetchall()
+    width = LOD_FACTOR ** level
+    rows = conn.execute(
+        f"SELECT min_hand, min_bankroll, max_hand, max_bankroll FROM {lod}"
+        " WHERE trial = ? AND level = ? AND bucket BETWEEN ? AND ? ORDER BY bucket",
+        (trial, level, first_hand // width, last_hand // width),
+    )
+    return _bucket_points(rows)
+
+
+def overlay(
+    conn: sqlite3.Connection,
+    trials: Iterable[int],
+    first_hand: int = 0,
+    last_hand: int | None = None,
+    points: int = 500,
+    table: str = "temp_bankroll",
+) -> Dict[int, List[Point]]:
+    """:func:`curve` of several trials, each with *points* points."""
+    return {t: curve(conn, t, first_hand, last_hand, points, table) for t in trials}
+
+
+def percentile_bands(
+    conn: sqlite3.Connection,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    points: int = 500,
+    table: str = "temp_bankroll",
+) -> Tuple[List[int], Dict[float, List[float]]]:
+    """Percentiles of the bankroll over all trials, per bucket of hands.
+
+    Returns the hand at the end of each bucket and, for each percentile,
+    the bankroll at that percentile there.  A trial that ended early (for
+    example ruined) keeps its last bankroll for the rest of the curve.
+    """
+    lod = f"{table}_lod"
+    last_hand = conn.execute(f"SELECT MAX(close_hand) FROM {lod} WHERE level = 1").fetchone()[0]
+    if last_hand is None:
+        return [], {p: [] for p in percentiles}
+    level = max(1, choose_level(0, last_hand, points * 2))
+    width = LOD_FACTOR ** level
+    buckets = last_hand // width + 1
+    columns: List[List[float]] = [[] for _ in range(buckets)]
+    trial, filled, close = None, 0, 0.0
+    rows = conn.execute(
+        f"SELECT trial, bucket, close_bankroll FROM {lod} WHERE level = ? ORDER BY trial, bucket",
+        (level,),
+    )
+    for row_trial, bucket, bankroll in rows:
+        if row_trial != trial:
+            if trial is not None:
+                for column in columns[filled:]:
+                    column.append(close)
+            trial, filled = row_trial, 0
+        for column in columns[filled:bucket]:
+            column.append(close if filled else bankroll)
+        columns[bucket].append(bankroll)
+        filled, close = bucket + 1, bankroll
+    if trial is not None:
+        for column in columns[filled:]:
+            column.append(close)
+    hands = [min((b + 1) * width - 1, last_hand) for b in range(buckets)]
+    bands: Dict[float, List[float]] = {p: [] for p in percentiles}
+    for column in columns:
+        column.sort()
+        for p in percentiles:
+            bands[p].append(column[min(len(column) - 1, int(p / 100 * len(column)))])
+    return hands, bands
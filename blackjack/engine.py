@@ -0,0 +1,278 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .settings import SimulationSettings
+from .cards import Shoe, Card
+from .player import Player, PlayerSettings
+from .dealer import Dealer
+from .strategy import BasicStrategy
+from .hand import Hand
+from .stats import TrialStats
+from .layout import encode_round
+from .perf import PhaseTimer
+from .downsample import LodBuilder
+from .counting import BetRamp, Counter, CountingStrategy, INDEX_PLAYS, TAG_SYSTEMS, initial_count
+
+
+@dataclass
+class TrialResult:
+    """Rows produced by a single trial.
+
+    Trials are played without touching the database so they can run in a
+    worker process; the :class:`~blackjack.simulator.Simulator` writes the
+    rows into the ``temp_*`` tables afterwards.
+    """
+
+    trial: int
+    hands_played: int = 0
+    bankroll: float = 0.0
+    bankroll_rows: List[tuple] = field(default_factory=list)
+    result_rows: List[tuple] = field(default_factory=list)
+    card_counts: Dict[str, int] = field(default_factory=dict)
+    stats: TrialStats | None = None
+    perf: PhaseTimer | None = None
+    # Bankroll pyramid of the trial, built by the simulator as rows are written.
+    lod: LodBuilder | None = None
+
+
+def resolve_hand(hand: Hand, dealer_hand: Hand, settings: PlayerSettings) -> float:
+    if hand.surrendered:
+        return hand.bet  # half wager already deducted
+    if hand.is_bust:
+        return 0
+    dealer_bust = dealer_hand.is_bust
+    if hand.is_blackjack and not dealer_hand.is_blackjack:
+        return hand.bet * (1 + settings.blackjack_payout)
+    if dealer_hand.is_blackjack and not hand.is_blackjack:
+        return 0
+    if dealer_bust:
+        return hand.bet * 2
+    player_value = hand.best_value
+    dealer_value = dealer_hand.best_value
+    if player_value > dealer_value:
+        return hand.bet * 2
+    if player_value < dealer_value:
+        return 0
+    return hand.bet
+
+
+def format_round(
+    initial_cards: List[Card], player_hands: List[Hand], dealer_hand: Hand, bet_amount: float
+) -> str:
+    """Return the text layout of a round.
+
+    Trials store :func:`~blackjack.layout.encode_round` blobs instead; this
+    is the reference the decoder reproduces.
+    """
+    def _fmt(rank: str) -> str:
+        """Represent the rank using single-character notation.
+
+        The simulator records tens as ``"10"`` internally, but the
+        interface displays them as ``"T"`` to keep hand layouts compact
+        (e.g. ``9T`` for a hard 19).
+        """
+
+        return "T" if rank == "10" else rank
+
+    player_repr: str
+    if len(player_hands) == 1:
+        hand_obj = player_hands[0]
+        base = "".join(_fmt(c.rank) for c in initial_cards)
+        if hand_obj.surrendered:
+            player_repr = f"{base}|x"
+        else:
+            extra = ""
+            if len(hand_obj.cards) > 2:
+                extra_cards = hand_obj.cards[2:]
+                is_double = hand_obj.bet > bet_amount
+                if is_double:
+                    extra += "d" + _fmt(extra_cards[0].rank)
+                else:
+                    extra += "".join(_fmt(c.rank) for c in extra_cards)
+            player_repr = base + "|" + extra
+            player_repr += "_" if hand_obj.is_bust else "s"
+    else:
+        base = "".join(_fmt(c.rank) for c in initial_cards)
+        parts = []
+        for h in player_hands:
+            seg_cards = h.cards[1:]
+            if h.bet > bet_amount and len(seg_cards) >= 2:
+                seg = "v" + _fmt(seg_cards[0].rank) + "d" + _fmt(seg_cards[1].rank)
+            else:
+                seg = "v" + "".join(_fmt(c.rank) for c in seg_cards)
+            seg += "_" if h.is_bust else "s"
+            parts.append(seg)
+        player_repr = base + "|" + "_".join(parts)
+
+    dealer_base = _fmt(dealer_hand.cards[0].rank)
+    extra = "".join(_fmt(c.rank) for c in dealer_hand.cards[1:])
+    dealer_repr = dealer_base + "|" + extra
+    dealer_repr += "_" if dealer_hand.is_bust else "s"
+    return f"Player Hand: {player_repr}, Dealer Hand: {dealer_repr}"
+
+
+class TrialRunner:
+    """Play one trial of ``settings.hands_per_game`` hands, a batch of rounds at a time.
+
+    ``rng`` drives the shoe shuffles (see :mod:`blackjack.rng`); when
+    omitted the global ``random`` module is used.  A runner holds the whole
+    state of an unfinished trial (shoe, generator, bankroll, statistics);
+    with the same generator it plays the same rounds, so a checkpoint only
+    needs :attr:`rounds`.
+    """
+
+    def __init__(
+        self,
+        settings: SimulationSettings,
+        strategy: BasicStrategy,
+        trial: int,
+        sim_number: int,
+        rng=None,
+    ):
+        self.settings = settings
+        self.sim_number = sim_number
+        self.shoe = Shoe(settings.num_decks, penetration=settings.penetration, rng=rng)
+        self.player_settings = PlayerSettings(
+            bankroll=settings.bankroll,
+            blackjack_payout=settings.blackjack_payout,
+            double_after_split=settings.double_after_split,
+            resplit_aces=settings.resplit_aces,
+            allow_surrender=settings.allow_surrender,
+            bet_amount=settings.bet_amount,
+        )
+        self.counter = self.ramp = None
+        if settings.count_system:
+            if settings.count_system not in TAG_SYSTEMS:
+                raise ValueError(f"Unknown count system '{settings.count_system}'")
+            system = settings.count_system
+            self.counter = Counter(
+                TAG_SYSTEMS[system], initial=initial_count(system, settings.num_decks)
+            ).attach(self.shoe)
+            self.ramp = BetRamp.linear(settings.bet_spread)
+            if settings.index_plays and system in INDEX_PLAYS:
+                strategy = CountingStrategy(strategy, self.counter, INDEX_PLAYS[system])
+        self.player = Player(self.player_settings, strategy)
+        self.dealer = Dealer(hit_soft_17=settings.hit_soft_17)
+        self.result = TrialResult(trial=trial)
+        self.stats = TrialStats(settings.bankroll)
+        self.rounds = 0
+        self.hands_played = 0
+        self.perf = PhaseTimer() if settings.profile else None
+
+    @property
+    def done(self) -> bool:
+        return (
+            self.hands_played >= self.settings.hands_per_game
+            or self.player_settings.bankroll < self.player_settings.bet_amount
+        )
+
+    def play(self, max_rounds: int | None = None) -> bool:
+        """Play up to *max_rounds* more rounds (all when ``None``); return :attr:`done`."""
+        settings = self.settings
+        shoe, player, dealer = self.shoe, self.player, self.dealer
+        player_settings, stats, result = self.player_settings, self.stats, self.result
+        counter, ramp = self.counter, self.ramp
+        trial, sim_number = result.trial, self.sim_number
+        record_every = settings.record_every
+        shuffle, draw, record = shoe.shuffle, shoe.draw, stats.record
+        play_hands, play_dealer = player.play, dealer.play
+        resolve, encode = resolve_hand, encode_round
+        perf = self.perf
+        if perf is not None:
+            shuffle = perf.wrap("shuffle", shuffle)
+            draw = perf.wrap("deal", draw)
+            play_hands = perf.wrap("player", play_hands)
+            play_dealer = perf.wrap("dealer", play_dealer)
+            resolve = perf.wrap("resolve", resolve)
+            record = perf.wrap("stats", record)
+            encode = perf.wrap("layout", encode)
+        rounds = self.rounds
+        hands_played = self.hands_played
+        stop = None if max_rounds is None else rounds + max_rounds
+        bet = settings.bet_amount
+        while (
+            hands_played < settings.hands_per_game
+            and player_settings.bankroll >= player_settings.bet_amount
+            and rounds != stop
+        ):
+            if shoe.penetration_reached:
+                shuffle()
+            if ramp is not None:
+                bet = min(
+                    settings.bet_amount * ramp.units(counter.true_count), player_settings.bankroll
+                )
+            bankroll_before = player_settings.bankroll
+            player_settings.bankroll -= bet
+            player_hand = Hand(bet=bet)
+            dealer_hand = Hand()
+            player_hand.add_card(draw())
+            dealer_hand.add_card(draw())
+            player_hand.add_card(draw())
+            dealer_hand.add_card(draw())
+
+            initial_cards = list(player_hand.cards)
+            player_hands = play_hands(shoe, dealer_hand.cards[0].rank, player_hand)
+            if any(not h.is_bust and not h.surrendered for h in player_hands):
+                play_dealer(dealer_hand, shoe)
+            for h in player_hands:
+                change = resolve(h, dealer_hand, player_settings)
+                player_settings.bankroll += change
+            hands_played += len(player_hands)
+            rounds += 1
+            record(bankroll_before, player_settings.bankroll)
+            if not record_every or rounds % record_every:
+                continue
+
+            result.bankroll_rows.append((trial, hands_played, player_settings.bankroll))
+
+            layout = encode(initial_cards, player_hands, dealer_hand, bet)
+            result.result_rows.append(
+                (
+                    sim_number,
+                    trial,
+                    settings.num_decks,
+                    settings.penetration,
+                    "3:2" if settings.blackjack_payout == 1.5 else "6:5",
+                    "H17" if settings.hit_soft_17 else "S17",
+                    int(settings.double_after_split),
+                    int(settings.resplit_aces),
+                    int(settings.allow_surrender),
+                    len(player_hands),
+                    bet,
+                    bankroll_before,
+                    player_settings.bankroll,
+                    layout,
+                )
+            )
+        self.rounds = rounds
+        self.hands_played = hands_played
+        return self.done
+
+    def finish(self) -> TrialResult:
+        """Fill in the trial's totals and return its result."""
+        result = self.result
+        self.stats.ruined = self.hands_played < self.settings.hands_per_game
+        result.stats = self.stats
+        result.hands_played = self.hands_played
+        result.bankroll = self.player_settings.bankroll
+        result.card_counts = dict(self.shoe.drawn_counts)
+        result.perf = self.perf
+        return result
+
+
+def play_trial(
+    settings: SimulationSettings,
+    strategy: BasicStrategy,
+    trial: int,
+    sim_number: int,
+    rng=None,
+) -> TrialResult:
+    """Play one trial of ``settings.hands_per_game`` hands.
+
+    ``rng`` drives the shoe shuffles (see :mod:`blackjack.rng`); when
+    omitted the global ``random`` module is used.
+    """
+    runner = TrialRunner(settings, strategy, trial, sim_number, rng)
+    runner.play()
+    return runner.finish()
@@ -1,11 +1,24 @@
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox, font as tkfont
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
-import pandas as pd
 
+from .background import SimulationWorker
 from .settings import SimulationSettings
-from .simulator import Simulator
+from .downsample import curve, overlay, percentile_bands
+from .pager import BOOL_COLUMNS, KeysetPager, estimate_widths, is_numeric
+
+POLL_MS = 100
+# The results table holds this many pages of rows around the visible ones.
+TABLE_PAGE_SIZE = 200
+TABLE_PAGES = 3
+# Points per curve; about the width of the plot in pixels.
+GRAPH_POINTS = 2000
+OVERLAY_POINTS = 400
+OVERLAY_TRIALS = 50
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+ZOOM_DELAY_MS = 200
 
 
 class SimulatorGUI:
@@ -13,6 +26,9 @@ class SimulatorGUI:
         self.root = tk.Tk()
         self.root.title("Blackjack Simulator")
         self.sim = None
+        self.worker = None
+        self.events = queue.Queue()
+        self._live_rows = []
 
         # simulation setting variables
         self.bankroll = tk.DoubleVar(value=1000)
@@ -39,23 +55,36 @@ class SimulatorGUI:
         fig = Figure(figsize=(6, 4))
         self.ax = fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(fig, master=self.root)
+        self._zoom = None
+        self._zoom_job = None
+        self._redrawing = False
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
         self.test_mode_label = tk.Label(
             self.root, text="The Simulator is currently in 'Test Mode'", fg="red"
         )
+        toolbar = NavigationToolbar2Tk(self.canvas, self.root, pack_toolbar=False)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
         self.table_frame = tk.Frame(self.root)
         self.table_frame.pack(fill=tk.BOTH, expand=True)
         self.table = ttk.Treeview(self.table_frame, show="headings")
         self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scroll = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.table.yview)
-        self.table.configure(yscrollcommand=scroll.set)
-        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table_scroll = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.table.yview)
+        self.table.configure(yscrollcommand=self._on_table_scroll)
+        self.table_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.pager = None
+        self._paging = False
 
         controls = tk.Frame(self.root)
         controls.pack(side=tk.BOTTOM, fill=tk.X)
 
-        tk.Button(controls, text="Run", command=self.run_simulation).pack(side=tk.LEFT)
+        self.run_btn = tk.Button(controls, text="Run", command=self.run_simulation)
+        self.run_btn.pack(side=tk.LEFT)
+        self.pause_btn = tk.Button(controls, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_btn.pack(side=tk.LEFT)
+        self.cancel_btn = tk.Button(controls, text="Cancel", command=self.cancel_simulation, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT)
         self.save_btn = tk.Button(controls, text="Save", command=self.save_results, state=tk.DISABLED)
         self.save_btn.pack(side=tk.LEFT)
         self.discard_btn = tk.Button(controls, text="Discard", command=self.discard_results, state=tk.DISABLED)
@@ -72,6 +101,12 @@ class SimulatorGUI:
             width=5,
         )
         self.plot_trial_spin.pack(side=tk.LEFT)
+        self.show_overlay = tk.BooleanVar()
+        tk.Checkbutton(controls, text="All trials", variable=self.show_overlay, command=self.update_graph).pack(side=tk.LEFT)
+        self.show_bands = tk.BooleanVar()
+        tk.Checkbutton(controls, text="Bands", variable=self.show_bands, command=self.update_graph).pack(side=tk.LEFT)
+        self.status = tk.Label(controls, anchor="w")
+        self.status.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
 
         tk.Button(controls, text="Exit", command=self.exit_prompt).pack(side=tk.RIGHT)
         tk.Button(controls, text="Settings", command=self.open_settings).pack(side=tk.RIGHT)
@@ -161,10 +196,78 @@ class SimulatorGUI:
             seed=int(self.seed.get()) if self.seed.get() else None,
             test_mode=self.test_mode.get(),
         )
-        self.sim = Simulator(settings)
-        self.sim.run()
+        if self.worker is not None:
+            return
+        self.worker = SimulationWorker(settings, self.events)
+        self.sim = None
+        self._live_rows = []
         self.plot_trial_spin.config(to=self.trials.get())
         self.plot_trial.set(1)
+        self.run_btn.config(state=tk.DISABLED)
+        self.pause_btn.config(state=tk.NORMAL, text="Pause")
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.save_btn.config(state=tk.DISABLED)
+        self.discard_btn.config(state=tk.DISABLED)
+        self.status.config(text="Starting...")
+        self.worker.start()
+        self.root.after(POLL_MS, self._poll)
+
+    def toggle_pause(self):
+        if self.worker is None:
+            return
+        control = self.worker.control
+        if control.paused:
+            control.resume()
+            self.pause_btn.config(text="Pause")
+        else:
+            control.pause()
+            self.pause_btn.config(text="Resume")
+            self.status.config(text=self.status.cget("text") + " (paused)")
+
+    def cancel_simulation(self):
+        if self.worker is not None:
+            self.worker.control.cancel()
+            self.status.config(text="Cancelling...")
+
+    def _poll(self):
+        """Apply the worker's queued events; reschedules itself until the run ends."""
+        redraw = False
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == "progress":
+                _, trial, hands, rows = event
+                if trial == self.plot_trial.get():
+                    self._live_rows.extend(rows)
+                    redraw = redraw or bool(rows)
+                if not self.worker.control.paused:
+                    self.status.config(text=f"Trial {trial}/{self.trials.get()} \u2013 {hands} hands")
+            elif kind == "done":
+                self._finish_run(cancelled=event[1])
+                return
+            elif kind == "error":
+                self._finish_run(cancelled=True)
+                messagebox.showerror("Simulation failed", str(event[1]))
+                return
+        if redraw:
+            self._plot(self._live_rows)
+        self.root.after(POLL_MS, self._poll)
+
+    def _finish_run(self, cancelled: bool):
+        self.worker.join()
+        self.sim = self.worker.sim
+        self.worker = None
+        self._live_rows = []
+        self.run_btn.config(state=tk.NORMAL)
+        self.pause_btn.config(state=tk.DISABLED, text="Pause")
+        self.cancel_btn.config(state=tk.DISABLED)
+        hands = self.sim.hands_played
+        self.status.config(
+            text=f"{'Cancelled' if cancelled else 'Finished'} \u2013 {hands} hands in {self.sim.elapsed:.1f}s"
+        )
         self.update_graph()
         self.update_table()
         if self.test_mode.get():
@@ -175,59 +278,140 @@ class SimulatorGUI:
 
     def update_graph(self):
         if not self.sim:
+            # While a run is active only the rows streamed so far exist.
+            self._live_rows = []
             return
-        trial = self.plot_trial.get()
-        df = pd.read_sql_query(
-            "SELECT hand, bankroll FROM temp_bankroll WHERE trial=? ORDER BY hand",
-            self.sim.conn,
-            params=(trial,),
-        )
-        if df.empty:
+        self._zoom = None
+        self._draw_graph()
+
+    def _draw_graph(self):
+        """Plot the selected trial, re-querying the pyramid for the visible hands."""
+        conn = self.sim.conn
+        first, last = self._zoom or (0, None)
+        points = curve(conn, self.plot_trial.get(), first, last, points=GRAPH_POINTS)
+        if not points:
             return
+        self._plot(points, keep_limits=self._zoom is not None)
+        start = self.bankroll.get()
+        if self.show_bands.get():
+            hands, bands = percentile_bands(conn, BAND_PERCENTILES)
+            low, high = BAND_PERCENTILES[0], BAND_PERCENTILES[-1]
+            self.ax.fill_between(hands, [b - start for b in bands[low]], [b - start for b in bands[high]],
+                                 color="blue", alpha=0.1, linewidth=0)
+            self.ax.plot(hands, [b - start for b in bands[50]], color="blue", linewidth=0.5, alpha=0.5)
+        if self.show_overlay.get():
+            trials = range(1, min(self.trials.get(), OVERLAY_TRIALS) + 1)
+            for trial, trial_points in overlay(conn, trials, first, last, points=OVERLAY_POINTS).items():
+                if trial_points and trial != self.plot_trial.get():
+                    hands, bankrolls = zip(*trial_points)
+                    self.ax.plot(hands, [b - start for b in bankrolls], color="gray", linewidth=0.3, alpha=0.4)
+        self.canvas.draw_idle()
+
+    def _on_xlim_changed(self, ax):
+        """Re-query at the zoomed resolution once the toolbar stops changing the limits."""
+        if self._redrawing or not self.sim:
+            return
+        if self._zoom_job is not None:
+            self.root.after_cancel(self._zoom_job)
+        self._zoom_job = self.root.after(ZOOM_DELAY_MS, self._apply_zoom)
 
-        df["pl"] = df["bankroll"] - self.bankroll.get()
-        xmin = 0
-        xmax = max(100, df["hand"].max())
-        ymin = -self.bankroll.get()
-        ymax = self.bankroll.get() * 2
-
-        self.ax.clear()
-        self.ax.set_xlabel("Total Hands Played")
-        self.ax.set_ylabel("P/L")
-        self.ax.set_xlim(xmin, xmax)
-        self.ax.set_ylim(ymin, ymax)
-        # Draw a horizontal line at y=0 so it's visually centered
-        self.ax.axhline(0, color="gray", linewidth=0.5)
-        self.ax.plot(df["hand"], df["pl"], color="blue")
-        self.canvas.draw()
+    def _apply_zoom(self):
+        self._zoom_job = None
+        if not self.sim:
+            return
+        low, high = self.ax.get_xlim()
+        self._zoom = (max(0, int(low)), max(1, int(high) + 1))
+        self._draw_graph()
+
+    def _plot(self, rows, keep_limits=False):
+        """Draw ``(hand, bankroll)`` pairs, or ``(trial, hand, bankroll)`` rows, as P/L."""
+        points = [row[-2:] for row in rows]
+        if not points:
+            return
+        start = self.bankroll.get()
+        hands = [hand for hand, _ in points]
+        pl = [bankroll - start for _, bankroll in points]
+        if keep_limits:
+            xmin, xmax = self.ax.get_xlim()
+            ymin, ymax = self.ax.get_ylim()
+        else:
+            xmin = 0
+            xmax = max(100, hands[-1])
+            ymin = -start
+            ymax = start * 2
+
+        self._redrawing = True
+        try:
+            self.ax.clear()
+            self.ax.set_xlabel("Total Hands Played")
+            self.ax.set_ylabel("P/L")
+            self.ax.set_xlim(xmin, xmax)
+            self.ax.set_ylim(ymin, ymax)
+            # Draw a horizontal line at y=0 so it's visually centered
+            self.ax.axhline(0, color="gray", linewidth=0.5)
+            self.ax.plot(hands, pl, color="blue")
+            # ``clear`` drops the callbacks registered on the axes.
+            self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        finally:
+            self._redrawing = False
+        self.canvas.draw_idle()
 
     def update_table(self):
+        self.table.delete(*self.table.get_children())
+        self.pager = None
         if not self.sim:
             return
-        df = pd.read_sql_query(
-            "SELECT * FROM temp_results ORDER BY trial", self.sim.conn
-        )
-        self.table.delete(*self.table.get_children())
-        if df.empty:
+        pager = KeysetPager(self.sim.conn, "temp_results", page_size=TABLE_PAGE_SIZE, sim=self.sim.sim_number)
+        rows = pager.first()
+        if not rows:
             return
+        self.pager = pager
 
-        # Display booleans as Y/N instead of 1/0
-        bool_cols = {"das", "rsa", "surrender"}
-        for col in bool_cols & set(df.columns):
-            df[col] = df[col].map({0: "N", 1: "Y"})
-
-        self.table["columns"] = list(df.columns)
+        sample = [pager.display(row) for row in pager.sample()]
         font = tkfont.nametofont("TkDefaultFont")
-        for col in df.columns:
-            values = [str(v) for v in df[col].tolist()] + [col]
-            width = max(font.measure(v) for v in values) + 20
-            is_numeric = pd.api.types.is_numeric_dtype(df[col]) and col not in bool_cols
-            stretch = not (is_numeric or col in bool_cols)
+        widths = estimate_widths(pager.columns, sample, font.measure)
+        self.table["columns"] = pager.columns
+        for i, col in enumerate(pager.columns):
+            stretch = not (is_numeric(col, sample, i) or col in BOOL_COLUMNS)
             self.table.heading(col, text=col)
-            self.table.column(col, width=width, stretch=stretch)
-
-        for _, row in df.iterrows():
-            self.table.insert("", tk.END, values=[row[col] for col in df.columns])
+            self.table.column(col, width=widths[col], stretch=stretch)
+        self._append_rows(rows)
+
+    def _append_rows(self, rows, at=tk.END):
+        for row in rows if at == tk.END else reversed(rows):
+            self.table.insert("", at, iid=str(row[0]), values=self.pager.display(row))
+
+    def _on_table_scroll(self, first, last):
+        """Scrollbar callback that also swaps pages in near either end of the loaded rows."""
+        self.table_scroll.set(first, last)
+        if self.pager is not None and not self._paging:
+            self._paging = True
+            self.root.after_idle(self._page, float(first), float(last))
+
+    def _page(self, first, last):
+        """Keep at most ``TABLE_PAGES`` pages loaded around the visible rows."""
+        try:
+            items = self.table.get_children()
+            if not items or self.pager is None:
+                return
+            if last > 0.9:
+                rows = self.pager.after(int(items[-1]))
+                if rows:
+                    self._append_rows(rows)
+                    excess = len(items) + len(rows) - TABLE_PAGES * self.pager.page_size
+                    if excess > 0:
+                        self.table.delete(*items[:excess])
+                        self.table.see(str(rows[0][0]))
+            elif first < 0.1:
+                rows = self.pager.before(int(items[0]))
+                if rows:
+                    self._append_rows(rows, at=0)
+                    excess = len(items) + len(rows) - TABLE_PAGES * self.pager.page_size
+                    if excess > 0:
+                        self.table.delete(*items[-excess:])
+                    self.table.see(str(rows[-1][0]))
+        finally:
+            self._paging = False
 
     def save_results(self):
         if self.sim:
@@ -253,10 +437,17 @@ class SimulatorGUI:
         if not self.sim:
             return False
         cur = self.sim.conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM temp_results")
+        # temp_results stays empty when rounds are not recorded.
+        cur.execute("SELECT COUNT(*) FROM temp_summary")
         return cur.fetchone()[0] > 0
 
     def exit_prompt(self):
+        if self.worker is not None:
+            # Stop the run; what it finished so far can still be saved.
+            self.worker.control.cancel()
+            self.worker.join()
+            self.sim = self.worker.sim
+            self.worker = None
         if self.has_unsaved_data():
             win = tk.Toplevel(self.root)
             win.title("Exit")
@@ -4,31 +4,80 @@ from typing import List
 
 from .cards import Card
 
-@dataclass
+@dataclass(slots=True)
 class Hand:
+    """A player or dealer hand.
+
+    Totals are kept incrementally: ``_hard`` counts every ace as one and
+    ``_aces`` records how many aces it holds, so the value properties never
+    rescan ``cards``.  Cards must therefore be added and removed through
+    :meth:`add_card` and :meth:`pop_card` rather than by mutating ``cards``.
+    """
+
     cards: List[Card] = field(default_factory=list)
     bet: float = 0.0
     is_split_aces: bool = False
     is_split: bool = False
     surrendered: bool = False
+    _hard: int = field(default=0, init=False, repr=False, compare=False)
+    _aces: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        for card in self.cards:
+            self._count(card, 1)
+
+    def _count(self, card: Card, sign: int) -> None:
+        if card.rank == "A":
+            self._aces += sign
+            self._hard += sign
+        else:
+            self._hard += sign * card.value
 
     def add_card(self, card: Card) -> None:
         self.cards.append(card)
+        self._count(card, 1)
+
+    def extend_counted(self, cards: List[Card], hard: int, aces: int) -> None:
+        """Add *cards*, bringing the hand to the already known *hard* total.
+
+        For callers that tracked the totals while drawing (see
+        :class:`~blackjack.dealer.Dealer`); *aces* is the number of aces
+        among *cards*.
+        """
+        self.cards.extend(cards)
+        self._hard = hard
+        self._aces += aces
+
+    def pop_card(self) -> Card:
+        """Remove and return the last card, e.g. to start a split hand."""
+        card = self.cards.pop()
+        self._count(card, -1)
+        return card
+
+    @property
+    def hard_total(self) -> int:
+        """Total with every ace counted as one."""
+        return self._hard
+
+    @property
+    def aces(self) -> int:
+        return self._aces
 
     @property
     def values(self) -> List[int]:
-        totals = [0]
-        for card in self.cards:
-            if card.rank == "A":
-                totals = [t + 1 for t in totals] + [t + 11 for t in totals]
-            else:
-                totals = [t + card.value for t in totals]
-        return sorted(set(totals))
+        # Each ace counted as eleven instead of one adds ten to the total.
+        return [self._hard + 10 * i for i in range(self._aces + 1)]
 
     @property
     def best_value(self) -> int:
-        valid = [v for v in self.values if v <= 21]
-        return max(valid) if valid else min(self.values)
+        if self._aces and self._hard <= 11:
+            return self._hard + 10
+        return self._hard
+
+    @property
+    def is_soft(self) -> bool:
+        """True when an ace is counted as eleven in :attr:`best_value`."""
+        return self._aces > 0 and self._hard <= 11
 
     @property
     def is_blackjack(self) -> bool:
@@ -36,7 +85,7 @@ class Hand:
 
     @property
     def is_bust(self) -> bool:
-        return min(self.values) > 21
+        return self._hard > 21
 
     @property
     def can_split(self) -> bool:
@@ -0,0 +1,164 @@
+"""Compact encoding of a round's cards for the ``results.cards`` column.
+
+Rounds are stored as a short ``bytes`` blob and only turned into the text
+layout (``Player Hand: 9T|s, Dealer Hand: 7|Ts``) when something displays
+them.  The blob holds exactly what the layout shows::
+
+    first card, second card, number of player hands,
+    per player hand: header, shown ranks...
+    dealer header, dealer ranks...
+
+Cards are rank indexes into :data:`~blackjack.cards.RANKS`.  A header packs
+the number of ranks that follow (``<< 3``) with the ``DOUBLED``, ``BUST``
+and ``SURRENDERED`` flags.  A single hand shows the cards drawn after the
+first two; a split hand shows every card after its split card.  A typical
+round takes about a dozen bytes instead of forty-odd characters.
+"""
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+import sqlite3
+
+from .cards import RANK_INDEX, RANKS, Card
+from .hand import Hand
+
+DOUBLED = 1
+BUST = 2
+SURRENDERED = 4
+
+# Ranks as they appear in the text layout: tens are written "T".
+_SYMBOLS = tuple("T" if rank == "10" else rank for rank in RANKS)
+_SYMBOL_INDEX = {symbol: i for i, symbol in enumerate(_SYMBOLS)}
+
+
+def encode_round(
+    initial_cards: List[Card], player_hands: List[Hand], dealer_hand: Hand, bet_amount: float
+) -> bytes:
+    """Encode a finished round; the blob decodes to :func:`~blackjack.engine.format_round`."""
+    out = [RANK_INDEX[initial_cards[0].rank], RANK_INDEX[initial_cards[1].rank], len(player_hands)]
+    skip = 2 if len(player_hands) == 1 else 1
+    for hand in player_hands:
+        shown = hand.cards[skip:]
+        flags = len(shown) << 3
+        if hand.bet > bet_amount:
+            flags |= DOUBLED
+        if hand.is_bust:
+            flags |= BUST
+        if hand.surrendered:
+            flags |= SURRENDERED
+        out.append(flags)
+        out.extend(RANK_INDEX[c.rank] for c in shown)
+    shown = dealer_hand.cards[1:]
+    out.append(len(shown) << 3 | (BUST if dealer_hand.is_bust else 0))
+    out.append(RANK_INDEX[dealer_hand.cards[0].rank])
+    out.extend(RANK_INDEX[c.rank] for c in shown)
+    return bytes(out)
+
+
+def _unpack(blob: bytes) -> Tuple[str, List[Tuple[int, str]], Tuple[int, str]]:
+    base = _SYMBOLS[blob[0]] + _SYMBOLS[blob[1]]
+    pos = 3
+    hands = []
+    for _ in range(blob[2]):
+        header = blob[pos]
+        end = pos + 1 + (header >> 3)
+        hands.append((header & 7, "".join(_SYMBOLS[r] for r in blob[pos + 1:end])))
+        pos = end
+    header = blob[pos]
+    dealer = "".join(_SYMBOLS[r] for r in blob[pos + 1:])
+    return base, hands, (header & 7, dealer)
+
+
+def decode_round(blob: bytes | str | None) -> str | None:
+    """Return the text layout of *blob*.
+
+    Text written before rounds were encoded is returned unchanged, as is
+    ``None`` for engines that do not record cards.
+    """
+    if blob is None or isinstance(blob, str):
+        return blob
+    base, hands, (dealer_flags, dealer) = _unpack(bytes(blob))
+    if len(hands) == 1:
+        flags, shown = hands[0]
+        if flags & SURRENDERED:
+            player = f"{base}|x"
+        else:
+            if flags & DOUBLED and shown:
+                shown = "d" + shown[0]
+            player = base + "|" + shown + ("_" if flags & BUST else "s")
+    else:
+        parts = []
+        for flags, shown in hands:
+            if flags & DOUBLED and len(shown) >= 2:
+                seg = "v" + shown[0] + "d" + shown[1]
+            else:
+                seg = "v" + shown
+            parts.append(seg + ("_" if flags & BUST else "s"))
+        player = base + "|" + "_".join(parts)
+    dealer = dealer[0] + "|" + dealer[1:] + ("_" if dealer_flags & BUST else "s")
+    return f"Player Hand: {player}, Dealer Hand: {dealer}"
+
+
+def _ranks(symbols: str) -> List[int]:
+    return [_SYMBOL_INDEX[s] for s in symbols]
+
+
+def parse_layout(text: str) -> bytes:
+    """Encode a text layout written by earlier versions of the simulator."""
+    player, dealer = text.split(", Dealer Hand: ")
+    player = player[len("Player Hand: "):]
+    base, _, rest = player.partition("|")
+    out = _ranks(base)
+    if not rest.startswith("v"):
+        if rest == "x":
+            out += [1, SURRENDERED]
+        else:
+            flags = BUST if rest[-1] == "_" else 0
+            shown = rest[:-1]
+            if shown.startswith("d"):
+                flags |= DOUBLED
+                shown = shown[1:]
+            out += [1, len(shown) << 3 | flags, *_ranks(shown)]
+    else:
+        hands = []
+        pos = 0
+        while pos < len(rest):
+            # Each segment is "v", its cards and an "s"/"_" terminator,
+            # followed by a "_" separator unless it is the last one.
+            end = pos + 1
+            while rest[end] not in "s_":
+                end += 1
+            seg = rest[pos + 1:end]
+            flags = BUST if rest[end] == "_" else 0
+            if "d" in seg:
+                flags |= DOUBLED
+                seg = seg.replace("d", "")
+            hands.append([len(seg) << 3 | flags, *_ranks(seg)])
+            pos = end + 1
+            if pos < len(rest) and rest[pos] == "_":
+                pos += 1
+        out.append(len(hands))
+        for hand in hands:
+            out += hand
+    up, _, drawn = dealer.partition("|")
+    shown = drawn[:-1]
+    out += [len(shown) << 3 | (BUST if drawn[-1] == "_" else 0), *_ranks(up), *_ranks(shown)]
+    return bytes(out)
+
+
+def migrate_layouts(
+    conn: sqlite3.Connection, tables: Sequence[str] = ("results_data",)
+) -> int:
+    """Re-encode text layouts in *tables* as blobs and return the rows changed."""
+    changed = 0
+    cur = conn.cursor()
+    for table in tables:
+        rows = cur.execute(
+            f"SELECT rowid, cards FROM {table} WHERE typeof(cards) = 'text'"
+        ).fetchall()
+        cur.executemany(
+            f"UPDATE {table} SET cards = ? WHERE rowid = ?",
+            ((parse_layout(text), rowid) for rowid, text in rows),
+        )
+        changed += len(rows)
+    conn.commit()
+    return changed
@@ -0,0 +1,123 @@
+"""Page through large result tables without loading them whole.
+
+:class:`KeysetPager` reads a fixed number of rows before or after a known
+``rowid`` (keyset pagination), so fetching a page costs the same at the end
+of a table of millions of rows as at its start.  Result rows are written in
+trial order, so ``rowid`` order is also trial order.
+
+The GUI keeps a few pages in its ``ttk.Treeview`` and swaps them as the
+user scrolls; column widths are estimated from :meth:`KeysetPager.sample`
+instead of measuring every value.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Sequence
+import sqlite3
+
+from .layout import decode_round
+from .schema import data_table, table_columns
+
+# Stored as 0/1, shown as N/Y.
+BOOL_COLUMNS = frozenset({"das", "rsa", "surrender"})
+
+
+class KeysetPager:
+    """Pages of *table* in ``rowid`` order; each row is ``(rowid, *columns)``.
+
+    With *sim*, *table* names a view of :mod:`~blackjack.schema` (which has
+    no usable ``rowid``) and the rows of that run are read from the table
+    behind it instead.
+    """
+
+    def __init__(
+        self, conn: sqlite3.Connection, table: str = "temp_results", page_size: int = 200, sim: int | None = None
+    ):
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.conn = conn
+        self.page_size = page_size
+        self.columns: List[str] = table_columns(conn, table)
+        if sim is None:
+            self.table, self._filter, self._params = table, "1", ()
+        else:
+            self.table = data_table(table)
+            # A run's rows are contiguous, so pages are read from its rowid
+            # range (found through the (sim, trial) index) rather than the
+            # sim index, which would need a sort per page.
+            bounds = [
+                conn.execute(
+                    f"SELECT rowid FROM {self.table} WHERE sim = ? ORDER BY trial {order}, rowid {order} LIMIT 1",
+                    (sim,),
+                ).fetchone()
+                for order in ("ASC", "DESC")
+            ]
+            low, high = (row[0] for row in bounds) if bounds[0] else (0, -1)
+            self._filter, self._params = "+sim = ? AND rowid BETWEEN ? AND ?", (sim, low, high)
+        self._select = f"SELECT rowid, {', '.join(self.columns)} FROM {self.table}"
+
+    def count(self) -> int:
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM {self.table} WHERE {self._filter}", self._params
+        ).fetchone()[0]
+
+    def first(self) -> List[tuple]:
+        return self.after(None)
+
+    def after(self, rowid: int | None) -> List[tuple]:
+        """The page following *rowid*, or the first page for ``None``."""
+        if rowid is None:
+            rowid = -1
+        return self.conn.execute(
+            f"{self._select} WHERE {self._filter} AND rowid > ? ORDER BY rowid LIMIT ?",
+            (*self._params, rowid, self.page_size),
+        ).fetchall()
+
+    def before(self, rowid: int) -> List[tuple]:
+        """The page preceding *rowid*, in ascending order."""
+        rows = self.conn.execute(
+            f"{self._select} WHERE {self._filter} AND rowid < ? ORDER BY rowid DESC LIMIT ?",
+            (*self._params, rowid, self.page_size),
+        ).fetchall()
+        rows.reverse()
+        return rows
+
+    def sample(self, size: int = 200) -> List[tuple]:
+        """Up to *size* rows spread evenly over the table, each found by ``rowid``."""
+        first, last = self.after(None)[:1], self.before(2**63 - 1)[-1:]
+        if not first:
+            return []
+        low, high = first[0][0], last[0][0]
+        step = max(1, (high - low + 1) // size)
+        ids = list(range(low, high + 1, step))[:size]
+        placeholders = ", ".join("?" * len(ids))
+        return self.conn.execute(
+            f"{self._select} WHERE {self._filter} AND rowid IN ({placeholders})", (*self._params, *ids)
+        ).fetchall()
+
+    def display(self, row: tuple) -> List[object]:
+        """Column values of *row* (without its ``rowid``) as the table shows them."""
+        values = []
+        for column, value in zip(self.columns, row[1:]):
+            if column == "cards":
+                value = decode_round(value)
+            elif column in BOOL_COLUMNS and value is not None:
+                value = "Y" if value else "N"
+            values.append(value)
+        return values
+
+
+def estimate_widths(
+    columns: Sequence[str], rows: Sequence[Sequence[object]], measure: Callable[[str], int], padding: int = 20
+) -> Dict[str, int]:
+    """Width of each column fitting its heading and the displayed *rows*."""
+    widths = {}
+    for i, column in enumerate(columns):
+        widths[column] = max([measure(column)] + [measure(str(row[i])) for row in rows]) + padding
+    return widths
+
+
+def is_numeric(column: str, rows: Sequence[Sequence[object]], index: int) -> bool:
+    """Whether the sampled values of a column are all numbers."""
+    if column in BOOL_COLUMNS:
+        return False
+    values = [row[index] for row in rows if row[index] is not None]
+    return bool(values) and all(isinstance(v, (int, float)) for v in values)
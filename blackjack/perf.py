@@ -0,0 +1,69 @@
+"""Opt-in timing of the simulator's phases.
+
+With ``SimulationSettings.profile`` set, each trial wraps the functions its
+round loop calls in :meth:`PhaseTimer.wrap`, so the untimed loop is left
+exactly as it is.  The timers of all trials are merged by the
+:class:`~blackjack.simulator.Simulator`, printed by the CLI and stored in
+the ``perf`` table.
+
+Phases nest the way the code does: ``player`` and ``dealer`` include the
+cards they draw, while ``deal`` only covers the four initial cards.  Timing
+adds a little overhead per call, so compare profiled runs with each other
+rather than with unprofiled ones.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Tuple
+import time
+
+# Phases in the order the report lists them.
+PHASES = ("shuffle", "deal", "player", "dealer", "resolve", "stats", "layout", "write", "commit")
+
+
+class PhaseTimer:
+    """Cumulative seconds and call counts per phase."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float, calls: int = 1) -> None:
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        """Return *func* timed under *phase*."""
+        seconds, calls = self.seconds, self.calls
+        seconds.setdefault(phase, 0.0)
+        calls.setdefault(phase, 0)
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                seconds[phase] += clock() - start
+                calls[phase] += 1
+
+        return timed
+
+    def merge(self, other: "PhaseTimer") -> None:
+        for phase, seconds in other.seconds.items():
+            self.add(phase, seconds, other.calls[phase])
+
+    def rows(self) -> List[Tuple[str, int, float]]:
+        """``(phase, calls, seconds)`` for every phase seen, in report order."""
+        order = {phase: i for i, phase in enumerate(PHASES)}
+        phases = sorted(self.seconds, key=lambda p: (order.get(p, len(order)), p))
+        return [(p, self.calls[p], self.seconds[p]) for p in phases]
+
+    def report(self, elapsed: float, hands: int) -> str:
+        """Text breakdown of the phases against *elapsed* wall time."""
+        lines = [f"{'phase':<10}{'calls':>12}{'seconds':>11}{'share':>8}{'us/call':>10}"]
+        for phase, calls, seconds in self.rows():
+            share = seconds / elapsed if elapsed else 0.0
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            lines.append(f"{phase:<10}{calls:>12}{seconds:>11.3f}{share:>8.1%}{per_call:>10.2f}")
+        rate = hands / elapsed if elapsed else 0.0
+        lines.append(f"{hands} hands in {elapsed:.3f}s ({rate:,.0f} hands/s)")
+        return "\n".join(lines)
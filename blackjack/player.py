@@ -73,7 +73,7 @@ class Player:
                         action = "hit"
                     else:
                         self.settings.bankroll -= hand.bet
-                        new_hand = Hand(cards=[hand.cards.pop()], bet=hand.bet, is_split_aces=True, is_split=True)
+                        new_hand = Hand(cards=[hand.pop_card()], bet=hand.bet, is_split_aces=True, is_split=True)
                         hand.is_split_aces = True
                         hand.is_split = True
                         hand.add_card(shoe.draw())
@@ -82,7 +82,7 @@ class Player:
                         continue
                 else:
                     self.settings.bankroll -= hand.bet
-                    new_hand = Hand(cards=[hand.cards.pop()], bet=hand.bet, is_split_aces=False, is_split=True)
+                    new_hand = Hand(cards=[hand.pop_card()], bet=hand.bet, is_split_aces=False, is_split=True)
                     hand.is_split = True
                     hand.add_card(shoe.draw())
                     new_hand.add_card(shoe.draw())
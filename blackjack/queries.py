@@ -0,0 +1,117 @@
+"""Reports over the saved (permanent) tables of a simulation database.
+
+Every query filters on ``sim`` first so it is answered from the indexes
+added by :mod:`~blackjack.schema` rather than by scanning every run ever
+saved.  Runs saved before the ``sim`` column existed are not listed.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import math
+import sqlite3
+
+from .stats import RunningStats
+
+
+@dataclass
+class RunReport:
+    sim: int
+    trials: int
+    hands: int
+    rounds: int
+    mean_per_round: float
+    stddev_per_round: float
+    risk_of_ruin: float
+    mean_final_bankroll: float
+    min_final_bankroll: float
+    max_final_bankroll: float
+    # Rules as stored with the rounds; empty when no rounds were recorded.
+    rules: Dict[str, object]
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of :attr:`mean_per_round`."""
+        return self.stddev_per_round / math.sqrt(self.rounds) if self.rounds else 0.0
+
+
+_RULE_COLUMNS = ("decks", "penetration", "payout", "soft17", "das", "rsa", "surrender")
+
+
+def runs(conn: sqlite3.Connection) -> List[int]:
+    """The saved runs, oldest first."""
+    return [row[0] for row in conn.execute("SELECT DISTINCT sim FROM summary WHERE sim IS NOT NULL ORDER BY sim")]
+
+
+def rules(conn: sqlite3.Connection, sim: int) -> Dict[str, object]:
+    row = conn.execute(
+        f"SELECT {', '.join(_RULE_COLUMNS)} FROM results WHERE sim = ? LIMIT 1", (sim,)
+    ).fetchone()
+    return dict(zip(_RULE_COLUMNS, row)) if row else {}
+
+
+def run_report(conn: sqlite3.Connection, sim: int) -> RunReport | None:
+    """Summary of run *sim*, or ``None`` if it was not saved."""
+    trials, hands, mean_final, low, high = conn.execute(
+        "SELECT COUNT(*), SUM(hands_played), AVG(bankroll), MIN(bankroll), MAX(bankroll)"
+        " FROM summary WHERE sim = ?",
+        (sim,),
+    ).fetchone()
+    if not trials:
+        return None
+    outcomes = RunningStats()
+    ruined = 0
+    for rounds, mean, variance, trial_ruined in conn.execute(
+        "SELECT rounds, mean, variance, ruined FROM trial_stats WHERE sim = ?", (sim,)
+    ):
+        # trial_stats keeps the sample variance; RunningStats merges sums of squares.
+        outcomes.merge(RunningStats(rounds, mean, variance * (rounds - 1) if rounds > 1 else 0.0))
+        ruined += trial_ruined
+    return RunReport(
+        sim=sim,
+        trials=trials,
+        hands=hands,
+        rounds=outcomes.count,
+        mean_per_round=outcomes.mean,
+        stddev_per_round=outcomes.stddev,
+        risk_of_ruin=ruined / trials,
+        mean_final_bankroll=mean_final,
+        min_final_bankroll=low,
+        max_final_bankroll=high,
+        rules=rules(conn, sim),
+    )
+
+
+def bankroll_curve(conn: sqlite3.Connection, sim: int, trial: int) -> List[Tuple[int, float]]:
+    """``(hand, bankroll)`` rows recorded for one saved trial."""
+    return conn.execute(
+        "SELECT hand, bankroll FROM bankroll WHERE sim = ? AND trial = ? ORDER BY hand", (sim, trial)
+    ).fetchall()
+
+
+def card_frequencies(conn: sqlite3.Connection, sim: int) -> Dict[str, float]:
+    """Share of each rank among the cards dealt in run *sim* (tens as ``T``)."""
+    counts = dict(
+        conn.execute(
+            "SELECT card, SUM(count) FROM card_distribution WHERE sim = ? GROUP BY card", (sim,)
+        ).fetchall()
+    )
+    total = sum(counts.values())
+    return {card: count / total for card, count in counts.items()} if total else {}
+
+
+def compare_runs(conn: sqlite3.Connection, sims: List[int] | None = None) -> List[RunReport]:
+    """Reports for *sims* (default: every saved run), best mean per round first."""
+    reports = [run_report(conn, sim) for sim in (runs(conn) if sims is None else sims)]
+    return sorted((r for r in reports if r is not None), key=lambda r: r.mean_per_round, reverse=True)
+
+
+def format_reports(reports: List[RunReport]) -> str:
+    """Text table of *reports* for the CLI."""
+    lines = [f"{'sim':>5}{'trials':>8}{'rounds':>10}{'EV/round':>11}{'+/-':>9}{'ruin':>7}  rules"]
+    for r in reports:
+        rules_text = " ".join(f"{k}={v}" for k, v in r.rules.items())
+        lines.append(
+            f"{r.sim:>5}{r.trials:>8}{r.rounds:>10}{r.mean_per_round:>+11.4f}"
+            f"{r.standard_error:>9.4f}{r.risk_of_ruin:>7.1%}  {rules_text}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+"""Random number streams for shoe shuffles.
+
+A shoe only needs an object with a ``shuffle(list)`` method.  Every trial
+gets its own stream derived from the simulation seed and the trial number,
+so trials can be played in any order or process with the same result:
+
+``python``
+    :class:`random.Random` seeded by
+    :func:`derive_trial_seed`; the historical default.
+``pcg64`` / ``philox``
+    NumPy generators whose trial streams are children of one
+    :class:`numpy.random.SeedSequence` (``spawn_key=(trial,)``).  Shuffles
+    take permutations generated in growing batches; each is several times
+    faster than ``random.shuffle``, although play dominates a trial.
+"""
+from __future__ import annotations
+from typing import Dict, List
+import hashlib
+import random
+
+try:  # NumPy is optional
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+RNG_KINDS = ("python", "pcg64", "philox")
+# SeedSequence only takes non-negative entropy.
+_ENTROPY_MASK = (1 << 128) - 1
+
+
+def derive_trial_seed(seed: int, trial: int) -> int:
+    """Return the seed for *trial* derived from the simulation *seed*.
+
+    The derivation only depends on the two integers, so a trial gets the
+    same stream whichever process ends up playing it.
+    """
+    digest = hashlib.blake2b(f"{seed}:{trial}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _require_numpy(kind: str) -> None:
+    if np is None:
+        raise ImportError(f"The '{kind}' generator requires NumPy; install it with 'pip install numpy'")
+
+
+def bit_generator(kind: str, seed_sequence):
+    """Return the NumPy bit generator for *kind* (``python`` maps to PCG64)."""
+    _require_numpy(kind)
+    if kind in ("python", "pcg64"):
+        return np.random.PCG64(seed_sequence)
+    if kind == "philox":
+        return np.random.Philox(seed_sequence)
+    raise ValueError(f"Unknown random generator '{kind}'")
+
+
+def seed_sequence(seed: int | None, trial: int | None = None):
+    """SeedSequence for *seed*, or for its child stream of *trial*."""
+    entropy = None if seed is None else seed & _ENTROPY_MASK
+    if trial is None:
+        return np.random.SeedSequence(entropy)
+    return np.random.SeedSequence(entropy, spawn_key=(trial,))
+
+
+class NumpyShuffler:
+    """``shuffle`` backed by a NumPy generator, drawing permutations in bulk.
+
+    Permutations of each list length are generated in batches that start
+    at one and double up to ``batch``, so a trial that shuffles once or
+    twice does not pay for permutations it never uses.  Rows are drawn from
+    the stream in order, so the batch sizes do not change the shuffles.
+    Applying a permutation to a list is a single C-level ``map``.
+    """
+
+    def __init__(self, generator, batch: int = 64):
+        self.generator = generator
+        self.batch = batch
+        self._pending: Dict[int, List[List[int]]] = {}
+        self._next_batch: Dict[int, int] = {}
+
+    def permutations(self, n: int, count: int):
+        """Return a ``(count, n)`` array whose rows are independent permutations."""
+        return self.generator.permuted(np.tile(np.arange(n), (count, 1)), axis=1)
+
+    def shuffle(self, x: list) -> None:
+        n = len(x)
+        pending = self._pending.get(n)
+        if not pending:
+            count = self._next_batch.get(n, 1)
+            self._next_batch[n] = min(2 * count, self.batch)
+            # Reversed so permutations are used in the order they were drawn.
+            pending = self._pending[n] = self.permutations(n, count).tolist()[::-1]
+        x[:] = map(x.__getitem__, pending.pop())
+
+
+def trial_rng(kind: str, seed: int, trial: int):
+    """Return the shuffle stream of *trial* for the simulation *seed*."""
+    if kind == "python":
+        return random.Random(derive_trial_seed(seed, trial))
+    if kind not in RNG_KINDS:
+        raise ValueError(f"Unknown random generator '{kind}'")
+    _require_numpy(kind)
+    return NumpyShuffler(np.random.Generator(bit_generator(kind, seed_sequence(seed, trial))))
@@ -0,0 +1,232 @@
+"""Risk of ruin and bankroll survival from a per-round outcome distribution.
+
+Playing full trials until they go broke is an expensive way to estimate
+ruin.  :class:`OutcomeDistribution` holds what one round does to the
+bankroll, in units of the base bet, measured from the engine
+(:meth:`~OutcomeDistribution.from_engine`), from rounds already in the
+database (:meth:`~OutcomeDistribution.from_results`) or from a mean and
+variance such as :meth:`~blackjack.analysis.ExactAnalyzer.expected_value`
+(:meth:`~OutcomeDistribution.from_moments`).
+
+:func:`survival` then runs random walks of that distribution with NumPy,
+many paths at once.  Because outcomes are in bet units, one set of walks
+answers every bankroll and bet combination: a walk survives a bankroll of
+*r* bets as long as its running minimum stays at or above ``1 - r``, the
+engine's stop condition of ``bankroll < bet_amount``.  The walks do not
+model the engine skipping a double or split it cannot afford.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Dict, List, Sequence, Tuple
+import math
+import sqlite3
+
+from .engine import TrialRunner
+from .settings import SimulationSettings
+from .strategy import BasicStrategy
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Rounds simulated per block; bounds the memory of a batch of walks.
+BLOCK_ROUNDS = 64
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The risk-of-ruin analyzer requires NumPy; install it with 'pip install numpy'")
+
+
+@dataclass(frozen=True)
+class OutcomeDistribution:
+    """Net result of a round, in base bets, and the probability of each."""
+
+    values: Tuple[float, ...]
+    probabilities: Tuple[float, ...]
+
+    @classmethod
+    def from_counts(cls, counts: Dict[float, int]) -> "OutcomeDistribution":
+        total = sum(counts.values())
+        if not total:
+            raise ValueError("No outcomes to build a distribution from")
+        values = tuple(sorted(counts))
+        return cls(values, tuple(counts[v] / total for v in values))
+
+    @classmethod
+    def from_moments(cls, mean: float, variance: float) -> "OutcomeDistribution":
+        """Two equally likely outcomes with the given mean and variance.
+
+        Enough for ruin estimates over many rounds, where only the first two
+        moments matter; blackjack rounds have a variance of about 1.3.
+        """
+        spread = math.sqrt(variance)
+        return cls((mean - spread, mean + spread), (0.5, 0.5))
+
+    @classmethod
+    def from_results(
+        cls, conn: sqlite3.Connection, sim: int, table: str = "results", digits: int = 4
+    ) -> "OutcomeDistribution":
+        """Outcomes of the rounds of run *sim* recorded in *table*."""
+        rows = conn.execute(
+            f"SELECT ROUND((close_bankroll - open_bankroll) / wager, ?), COUNT(*) FROM {table}"
+            " WHERE sim = ? AND wager > 0 GROUP BY 1",
+            (digits, sim),
+        )
+        return cls.from_counts(dict(rows))
+
+    @classmethod
+    def from_engine(
+        cls, settings: SimulationSettings, strategy: BasicStrategy, rounds: int = 100_000, rng=None
+    ) -> "OutcomeDistribution":
+        """Play *rounds* rounds of the reference engine and count their outcomes.
+
+        The bankroll is made large enough never to run out, so every round is
+        played with the rules of *settings* as they are.
+        """
+        settings = replace(
+            settings,
+            hands_per_game=2**62,
+            bankroll=settings.bet_amount * (8 * rounds + 8),
+            count_system="",
+            record_every=1,
+            profile=False,
+        )
+        runner = TrialRunner(settings, strategy, 1, 0, rng)
+        runner.play(rounds)
+        counts: Dict[float, int] = {}
+        for row in runner.result.result_rows:
+            outcome = round((row[12] - row[11]) / row[10], 4)
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return cls.from_counts(counts)
+
+    @property
+    def mean(self) -> float:
+        return sum(v * p for v, p in zip(self.values, self.probabilities))
+
+    @property
+    def variance(self) -> float:
+        mean = self.mean
+        return sum((v - mean) ** 2 * p for v, p in zip(self.values, self.probabilities))
+
+    @property
+    def n0(self) -> float:
+        """Rounds for the expected win to equal one standard deviation (``variance / mean**2``)."""
+        mean = self.mean
+        return self.variance / mean**2 if mean else math.inf
+
+
+@dataclass
+class RuinResult:
+    """Survival of one bankroll and bet size."""
+
+    bankroll: float
+    bet: float
+    # Round numbers and the fraction of walks still playing after each.
+    rounds: List[int]
+    survival: List[float]
+    # Diffusion approximation of ruin with no limit on the number of rounds.
+    analytic_risk: float
+    # Expected rounds to double the bankroll, from the mean outcome.
+    rounds_to_double: float
+
+    @property
+    def risk_of_ruin(self) -> float:
+        """Fraction of walks ruined by the last round."""
+        return 1.0 - self.survival[-1] if self.survival else 0.0
+
+
+def _alias_table(probabilities: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """Walker's alias table: outcome *k* is kept when a uniform draw is below
+    ``threshold[k]`` and replaced by ``alias[k]`` otherwise."""
+    n = len(probabilities)
+    scaled = [p * n for p in probabilities]
+    threshold, alias = [1.0] * n, list(range(n))
+    small = [k for k, p in enumerate(scaled) if p < 1.0]
+    large = [k for k, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        k, j = small.pop(), large.pop()
+        threshold[k], alias[k] = scaled[k], j
+        scaled[j] -= 1.0 - scaled[k]
+        (small if scaled[j] < 1.0 else large).append(j)
+    return threshold, alias
+
+
+def analytic_risk(distribution: OutcomeDistribution, units: float) -> float:
+    """Risk of ever losing *units* bets, ``exp(-2 * mean * units / variance)``."""
+    mean, variance = distribution.mean, distribution.variance
+    if mean <= 0 or not variance:
+        return 1.0 if mean <= 0 else 0.0
+    return min(1.0, math.exp(-2 * mean * units / variance))
+
+
+def survival(
+    distribution: OutcomeDistribution,
+    bankrolls: Sequence[float],
+    bets: Sequence[float] = (1.0,),
+    rounds: int = 10_000,
+    paths: int = 10_000,
+    points: int = 100,
+    seed: int | None = None,
+) -> List[RuinResult]:
+    """Survival curves of every bankroll and bet combination over *rounds* rounds.
+
+    All combinations share the same *paths* random walks, so adding one
+    costs a comparison per checkpoint rather than another simulation.
+    Results are in the order of ``itertools.product(bankrolls, bets)``.
+    """
+    _require_numpy()
+    if rounds < 1 or paths < 1:
+        raise ValueError("rounds and paths must be at least 1")
+    rng = np.random.default_rng(seed)
+    # Steps are drawn with an alias table: one uniform per step, whatever the
+    # number of distinct outcomes.
+    threshold, alias = _alias_table(distribution.probabilities)
+    outcomes = len(threshold)
+    threshold = np.asarray(threshold)
+    # Values of the kept outcomes followed by those of their aliases.
+    table = np.asarray(distribution.values + tuple(distribution.values[k] for k in alias))
+    checkpoints = np.unique(np.linspace(1, rounds, min(points, rounds)).round().astype(np.int64))
+    # Lowest point of each walk by each checkpoint.
+    lows = np.empty((len(checkpoints), paths))
+    position = np.zeros(paths)
+    low = np.zeros(paths)
+    done = 0
+    next_checkpoint = 0
+    while done < rounds:
+        block = min(BLOCK_ROUNDS, rounds - done)
+        draws = rng.random((block, paths))
+        draws *= outcomes
+        index = draws.astype(np.intp)
+        draws -= index
+        index += (draws >= threshold.take(index)) * outcomes
+        steps = table.take(index)
+        # Round by round over every path at once: rows are contiguous, so
+        # this beats cumsum/minimum.accumulate along an axis.
+        for i in range(block):
+            position += steps[i]
+            np.minimum(low, position, out=low)
+            if done + i + 1 == checkpoints[next_checkpoint]:
+                lows[next_checkpoint] = low
+                next_checkpoint += 1
+                if next_checkpoint == len(checkpoints):
+                    break
+        done += block
+    mean = distribution.mean
+    results = []
+    for bankroll in bankrolls:
+        for bet in bets:
+            units = bankroll / bet
+            alive = (lows >= 1 - units).mean(axis=1)
+            results.append(
+                RuinResult(
+                    bankroll=bankroll,
+                    bet=bet,
+                    rounds=checkpoints.tolist(),
+                    survival=alive.tolist(),
+                    analytic_risk=analytic_risk(distribution, units),
+                    rounds_to_double=units / mean if mean > 0 else math.inf,
+                )
+            )
+    return results
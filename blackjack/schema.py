@@ -0,0 +1,307 @@
+"""Versioned schema of the simulation database.
+
+``PRAGMA user_version`` records how many of :data:`MIGRATIONS` a database
+has applied; :func:`migrate` applies the rest in order, each in its own
+transaction.  New databases go through the same steps as old ones, so both
+end up with identical tables.  Add a function to the end of the list to
+change the schema; never edit one that has shipped.
+"""
+from __future__ import annotations
+from typing import Callable, List
+import sqlite3
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _create_tables(cur: sqlite3.Cursor) -> None:
+    """The tables as they were before the schema was versioned."""
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS bankroll (trial INTEGER, hand INTEGER, bankroll REAL)"
+    )
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS summary (trial INTEGER, hands_played INTEGER, bankroll REAL)"
+    )
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS card_distribution (trial INTEGER, card TEXT, count INTEGER)"
+    )
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS temp_bankroll (trial INTEGER, hand INTEGER, bankroll REAL)"
+    )
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS temp_summary (trial INTEGER, hands_played INTEGER, bankroll REAL)"
+    )
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS temp_card_distribution (trial INTEGER, card TEXT, count INTEGER)"
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS results (
+            sim INTEGER,
+            trial INTEGER,
+            decks INTEGER,
+            penetration REAL,
+            payout TEXT,
+            soft17 TEXT,
+            das INTEGER,
+            rsa INTEGER,
+            surrender INTEGER,
+            hands INTEGER,
+            wager REAL,
+            open_bankroll REAL,
+            close_bankroll REAL,
+            cards TEXT
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS temp_results (
+            sim INTEGER,
+            trial INTEGER,
+            decks INTEGER,
+            penetration REAL,
+            payout TEXT,
+            soft17 TEXT,
+            das INTEGER,
+            rsa INTEGER,
+            surrender INTEGER,
+            hands INTEGER,
+            wager REAL,
+            open_bankroll REAL,
+            close_bankroll REAL,
+            cards TEXT
+        )
+        """
+    )
+    # Progress of an unfinished run as JSON; see ``Simulator.resume``.
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS checkpoints (sim INTEGER PRIMARY KEY, next_trial INTEGER, state BLOB)"
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perf (
+            sim INTEGER,
+            version TEXT,
+            engine TEXT,
+            phase TEXT,
+            calls INTEGER,
+            seconds REAL,
+            recorded TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    # Downsampled bankroll curves; see ``blackjack.downsample``.
+    for table in ("bankroll_lod", "temp_bankroll_lod"):
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                trial INTEGER,
+                level INTEGER,
+                bucket INTEGER,
+                min_hand INTEGER,
+                min_bankroll REAL,
+                max_hand INTEGER,
+                max_bankroll REAL,
+                close_hand INTEGER,
+                close_bankroll REAL
+            )
+            """
+        )
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_idx ON {table} (trial, level, bucket)")
+    for table in ("trial_stats", "temp_trial_stats"):
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                sim INTEGER,
+                trial INTEGER,
+                rounds INTEGER,
+                mean REAL,
+                variance REAL,
+                min_bankroll REAL,
+                max_bankroll REAL,
+                max_drawdown REAL,
+                ruined INTEGER
+            )
+            """
+        )
+
+
+# Permanent tables that gained a ``sim`` column (their temp_* copies hold a
+# single run and are written without it).
+_SIM_COLUMN_TABLES = ("bankroll", "summary", "card_distribution", "bankroll_lod")
+
+
+def _add_sim_keys(cur: sqlite3.Cursor) -> None:
+    """Tag permanent rows with their run and index them by (sim, trial, ...).
+
+    Rows saved before this migration keep a ``NULL`` sim: their run cannot
+    be recovered from the trial number alone.  The large temp_* tables were
+    left unindexed here so recording rounds was not slowed down;
+    :func:`_promote_by_status` replaces them and does index the rows.
+    """
+    for table in _SIM_COLUMN_TABLES:
+        if "sim" not in table_columns(cur.connection, table):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN sim INTEGER")
+    cur.execute("DROP INDEX IF EXISTS bankroll_lod_idx")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS bankroll_key ON bankroll (sim, trial, hand)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS summary_key ON summary (sim, trial)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS card_distribution_key ON card_distribution (sim, trial, card)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS bankroll_lod_key ON bankroll_lod (sim, trial, level, bucket)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS trial_stats_key ON trial_stats (sim, trial)")
+    cur.execute("CREATE INDEX IF NOT EXISTS results_sim ON results (sim, trial)")
+    cur.execute("CREATE INDEX IF NOT EXISTS perf_sim ON perf (sim)")
+
+
+# Run lifecycle: rows of a run are written once and only its status changes.
+TEMP, SAVED, DISCARDED = "temp", "saved", "discarded"
+# Tables moved behind views by ``_promote_by_status``.
+_PROMOTED_TABLES = ("bankroll", "summary", "card_distribution", "results", "trial_stats", "bankroll_lod")
+# Row tables that exist as a ``{name}_data`` table behind the ``{name}`` and
+# ``temp_{name}`` views.
+DATA_TABLES = _PROMOTED_TABLES + ("seats",)
+_DATA_KEYS = {
+    "bankroll": ("UNIQUE", "sim, trial, hand"),
+    "summary": ("UNIQUE", "sim, trial"),
+    "card_distribution": ("UNIQUE", "sim, trial, card"),
+    "results": ("", "sim, trial"),
+    "trial_stats": ("UNIQUE", "sim, trial"),
+    "bankroll_lod": ("UNIQUE", "sim, trial, level, bucket"),
+}
+
+
+def data_table(name: str) -> str:
+    """The table holding the rows of *name* or ``temp_{name}``."""
+    return f"{name.removeprefix('temp_')}_data"
+
+
+def _create_views(cur: sqlite3.Cursor, name: str, columns: List[str], temp_columns: List[str]) -> None:
+    """The ``{name}`` and ``temp_{name}`` views over ``{name}_data``."""
+    data = data_table(name)
+    # Legacy rows with a NULL sim count as saved.
+    cur.execute(
+        f"CREATE VIEW {name} AS SELECT {', '.join(columns)} FROM {data} AS d WHERE NOT EXISTS"
+        f" (SELECT 1 FROM runs WHERE runs.sim = d.sim AND runs.status != '{SAVED}')"
+    )
+    cur.execute(
+        f"CREATE VIEW temp_{name} AS SELECT {', '.join(temp_columns)} FROM {data}"
+        f" WHERE sim IN (SELECT sim FROM runs WHERE status = '{TEMP}')"
+    )
+
+
+def _promote_by_status(cur: sqlite3.Cursor) -> None:
+    """Replace each temp_*/permanent table pair with one table plus two views.
+
+    Rows are written once into ``{name}_data`` with their ``sim``; the
+    ``runs`` table says whether a run is temporary, saved or discarded, and
+    the old table names become views filtering on it.  Saving or discarding
+    a run updates a single ``runs`` row instead of copying or deleting its
+    rows.  Existing rows are moved over once by this step.
+
+    Each data table keeps the ``(sim, trial, ...)`` key of its permanent
+    table.  Rows are now recorded straight into those keyed tables, which
+    makes recording rounds slower than into the old unindexed temp_*
+    tables: 1.4-1.7x for the buffered writer in
+    ``benchmarks/sqlite_writer.py`` and 1.3-1.6x for ``write_results`` of a
+    3000-trial run.  The keys are kept because every read of a run goes
+    through them: the ``temp_*`` views and the keyset pages select one
+    run's rows from a table that holds every saved run as well.
+    """
+    conn = cur.connection
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS runs ("
+        " sim INTEGER PRIMARY KEY, status TEXT NOT NULL, created TEXT DEFAULT CURRENT_TIMESTAMP)"
+    )
+    cur.execute(
+        "INSERT OR IGNORE INTO runs (sim, status)"
+        " SELECT sim, ? FROM results WHERE sim IS NOT NULL"
+        " UNION SELECT sim, ? FROM trial_stats WHERE sim IS NOT NULL",
+        (SAVED, SAVED),
+    )
+    # Unsaved rows without a sim column belong to the unsaved run, if any.
+    (temp_sim,) = cur.execute(
+        "SELECT MAX(sim) FROM (SELECT sim FROM temp_results UNION SELECT sim FROM temp_trial_stats)"
+    ).fetchone()
+    if temp_sim is None:
+        (temp_sim,) = cur.execute("SELECT COALESCE(MAX(sim), 0) + 1 FROM runs").fetchone()
+    cur.execute(
+        "INSERT OR REPLACE INTO runs (sim, status)"
+        " SELECT sim, ? FROM temp_results WHERE sim IS NOT NULL"
+        " UNION SELECT sim, ? FROM temp_trial_stats WHERE sim IS NOT NULL",
+        (TEMP, TEMP),
+    )
+    has_temp_rows = False
+    for name in _PROMOTED_TABLES:
+        temp = f"temp_{name}"
+        data = data_table(name)
+        info = conn.execute(f"PRAGMA table_info({name})").fetchall()
+        columns = [row[1] for row in info]
+        temp_columns = table_columns(conn, temp)
+        cur.execute(f"CREATE TABLE {data} ({', '.join(f'{row[1]} {row[2]}' for row in info)})")
+        cur.execute(f"INSERT INTO {data} SELECT * FROM {name}")
+        listed = ", ".join(temp_columns)
+        if "sim" in temp_columns:
+            cur.execute(f"INSERT INTO {data} ({listed}) SELECT {listed} FROM {temp}")
+        else:
+            cur.execute(f"INSERT INTO {data} ({listed}, sim) SELECT {listed}, ? FROM {temp}", (temp_sim,))
+            has_temp_rows = has_temp_rows or cur.rowcount > 0
+        cur.execute(f"DROP TABLE {name}")
+        cur.execute(f"DROP TABLE {temp}")
+        unique, key = _DATA_KEYS[name]
+        cur.execute(f"CREATE {unique} INDEX {data}_key ON {data} ({key})")
+        _create_views(cur, name, columns, temp_columns)
+    if has_temp_rows:
+        cur.execute("INSERT OR IGNORE INTO runs (sim, status) VALUES (?, ?)", (temp_sim, TEMP))
+
+
+def _add_seats(cur: sqlite3.Cursor) -> None:
+    """Per-seat totals of multi-seat table runs; see ``blackjack.table``."""
+    columns = [
+        "sim", "trial", "seat", "hands_played", "bankroll",
+        "rounds", "mean", "variance", "max_drawdown", "ruined",
+    ]
+    cur.execute(
+        "CREATE TABLE seats_data (sim INTEGER, trial INTEGER, seat INTEGER, hands_played INTEGER,"
+        " bankroll REAL, rounds INTEGER, mean REAL, variance REAL, max_drawdown REAL, ruined INTEGER)"
+    )
+    cur.execute("CREATE UNIQUE INDEX seats_data_key ON seats_data (sim, trial, seat)")
+    _create_views(cur, "seats", columns, columns)
+
+
+MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    _create_tables,
+    _add_sim_keys,
+    _promote_by_status,
+    _add_seats,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring *conn* up to :data:`SCHEMA_VERSION`; return the number of steps applied."""
+    version = schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this simulator supports ({SCHEMA_VERSION})"
+        )
+    if conn.in_transaction:
+        conn.commit()
+    for step in range(version, SCHEMA_VERSION):
+        cur = conn.cursor()
+        # Explicit, so the DDL of a step is rolled back with it on failure.
+        cur.execute("BEGIN")
+        try:
+            MIGRATIONS[step](cur)
+        except Exception:
+            conn.rollback()
+            raise
+        # PRAGMA does not take parameters; step is an int.
+        cur.execute(f"PRAGMA user_version = {step + 1}")
+        conn.commit()
+    return SCHEMA_VERSION - version
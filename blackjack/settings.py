@@ -21,3 +21,14 @@ class SimulationSettings:
     database: str = "simulation.db"
     seed: int | None = None
     test_mode: bool = False
+    engine: str = "reference"  # "reference" or "vectorized" (NumPy, flat bets only)
+    rng: str = "python"  # shuffle generator: "python", "pcg64" or "philox" (NumPy)
+    count_system: str = ""  # counting tags from blackjack.counting.TAG_SYSTEMS; "" bets flat
+    bet_spread: float = 8.0  # largest bet, in units of bet_amount, of the linear true-count ramp
+    index_plays: bool = True  # apply count-based deviations when counting
+    record_every: int = 1  # persist every Nth round to temp_bankroll/temp_results; 0 keeps none
+    checkpoint_interval: float = 0.0  # seconds between resumable checkpoints; 0 commits once per run
+    profile: bool = False  # time the simulator's phases into the perf table
+    workers: int = 1  # processes used to play trials; 0 uses every CPU
+    write_chunk_size: int = 5000  # rows buffered per table before an executemany
+    sqlite_synchronous: str = "NORMAL"  # PRAGMA synchronous level for the database
@@ -1,271 +1,447 @@
 from __future__ import annotations
+import os
 import sqlite3
+import json
 import random
+import time
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
+from importlib import metadata
 
-from importlib import import_module
-
-from typing import List
+from typing import Iterable, List, Sequence
 
 from .settings import SimulationSettings
-from .cards import Shoe, Card
-from .player import Player, PlayerSettings
-from .dealer import Dealer
+from .cards import Card
+from .player import PlayerSettings
 from .strategy import BasicStrategy
 from .hand import Hand
+from .engine import TrialResult, TrialRunner, format_round, play_trial, resolve_hand
+from .rng import trial_rng
+from .storage import BufferedWriter, configure_connection
+from .stats import SimulationStats
+from .perf import PhaseTimer
+from .control import RunControl
+from .table import Seat, TableResult, play_table
+from .downsample import LodBuilder
+from .schema import DATA_TABLES, DISCARDED, SAVED, TEMP, data_table, migrate, table_columns
+
 
+# Rounds a trial plays between checks for a due checkpoint.
+CHECKPOINT_ROUNDS = 1000
 
-# Mapping of permanent tables to their temporary counterparts
-TABLE_PAIRS = [
-    ("bankroll", "temp_bankroll"),
-    ("summary", "temp_summary"),
-    ("card_distribution", "temp_card_distribution"),
-    ("results", "temp_results"),
-]
+# Mapping of permanent views to their temporary counterparts; both read the
+# same ``{name}_data`` table (see ``blackjack.schema``).
+TABLE_PAIRS = [(name, f"temp_{name}") for name in DATA_TABLES]
 
 
 class Simulator:
-    def __init__(self, settings: SimulationSettings):
+    def __init__(self, settings: SimulationSettings, conn: sqlite3.Connection | None = None):
+        """Open ``settings.database``, or write through *conn* when given.
+
+        A shared *conn* lets several simulations (such as the cells of a
+        :mod:`~blackjack.sweep`) reuse one configured connection.
+        """
         self.settings = settings
-        self.conn = sqlite3.connect(self.settings.database)
+        if conn is None:
+            conn = sqlite3.connect(self.settings.database)
+            configure_connection(conn, synchronous=self.settings.sqlite_synchronous)
+        self.conn = conn
+        self.writer = BufferedWriter(self.conn, chunk_size=self.settings.write_chunk_size)
+        self.stats = SimulationStats()
+        self.perf = PhaseTimer() if settings.profile else None
+        self.hands_played = 0
+        self.elapsed = 0.0
+        self.cancelled = False
         self._init_db()
-        cur = self.conn.cursor()
-        cur.execute("SELECT COALESCE(MAX(sim), 0) FROM results")
-        self.sim_number = cur.fetchone()[0] + 1
+        (last,) = self.conn.execute("SELECT COALESCE(MAX(sim), 0) FROM runs").fetchone()
+        self.sim_number = last + 1
+        self._registered: int | None = None
 
     def _init_db(self) -> None:
-        cur = self.conn.cursor()
+        migrate(self.conn)
 
-        cur.execute(
-            "CREATE TABLE IF NOT EXISTS bankroll (trial INTEGER, hand INTEGER, bankroll REAL)"
-        )
-        cur.execute(
-            "CREATE TABLE IF NOT EXISTS summary (trial INTEGER, hands_played INTEGER, bankroll REAL)"
-        )
-        cur.execute(
-            "CREATE TABLE IF NOT EXISTS card_distribution (trial INTEGER, card TEXT, count INTEGER)"
-        )
-        cur.execute(
-            "CREATE TABLE IF NOT EXISTS temp_bankroll (trial INTEGER, hand INTEGER, bankroll REAL)"
-        )
-        cur.execute(
-            "CREATE TABLE IF NOT EXISTS temp_summary (trial INTEGER, hands_played INTEGER, bankroll REAL)"
-        )
-        cur.execute(
-            "CREATE TABLE IF NOT EXISTS temp_card_distribution (trial INTEGER, card TEXT, count INTEGER)"
+    def _format_round(
+        self, initial_cards: List[Card], player_hands: List[Hand], dealer_hand: Hand
+    ) -> str:
+        return format_round(initial_cards, player_hands, dealer_hand, self.settings.bet_amount)
+
+    def run(self, control: RunControl | None = None) -> None:
+        """Play every trial and write the rows into the ``temp_*`` tables.
+
+        *control* lets another thread follow the run and pause or cancel it;
+        a cancelled run keeps the trials finished so far.
+        """
+        # Every trial shuffles from its own stream derived from the base seed,
+        # so results do not depend on how trials are spread over workers.
+        base_seed = self.settings.seed
+        if base_seed is None:
+            base_seed = random.getrandbits(64)
+        self._play(base_seed, 1, control=control)
+
+    def resume(self, control: RunControl | None = None) -> bool:
+        """Continue the run saved in the latest checkpoint.
+
+        The run carries on with the settings, seed and statistics it was
+        started with, so its rows end up identical to those of an
+        uninterrupted run.  Returns ``False`` when there is no checkpoint.
+
+        The checkpoint is plain JSON; an unfinished trial is recreated by
+        replaying the rounds it had played from the trial's own stream.
+        """
+        row = self.conn.execute(
+            "SELECT sim, state FROM checkpoints ORDER BY sim DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return False
+        try:
+            state = json.loads(row[1])
+        except ValueError:
+            raise ValueError(
+                f"The checkpoint of run {row[0]} was written by an older version and cannot be resumed"
+            ) from None
+        self.sim_number = row[0]
+        self.settings = SimulationSettings(**state["settings"])
+        self.stats = SimulationStats.from_state(state["stats"])
+        self.hands_played = state["hands_played"]
+        self.perf = PhaseTimer() if self.settings.profile else None
+        self._play(state["base_seed"], state["next_trial"], state["rounds"], control)
+        return True
+
+    def _play(
+        self,
+        base_seed: int,
+        first_trial: int,
+        replay_rounds: int = 0,
+        control: RunControl | None = None,
+    ) -> None:
+        strat = BasicStrategy.from_json(
+            self.settings.strategy_file, allow_surrender=self.settings.allow_surrender
         )
+        workers = self.settings.workers or os.cpu_count() or 1
+        trials = range(first_trial, self.settings.trials + 1)
+        started = time.perf_counter()
+        self._checkpoint_due = time.monotonic() + self.settings.checkpoint_interval
+        self.cancelled = False
+        if self.settings.engine == "vectorized":
+            from .vectorized import run_vectorized
 
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS results (
-                sim INTEGER,
-                trial INTEGER,
-                decks INTEGER,
-                penetration REAL,
-                payout TEXT,
-                soft17 TEXT,
-                das INTEGER,
-                rsa INTEGER,
-                surrender INTEGER,
-                hands INTEGER,
-                wager REAL,
-                open_bankroll REAL,
-                close_bankroll REAL,
-                cards TEXT
+            if self.settings.checkpoint_interval or first_trial > 1:
+                raise ValueError("The vectorized engine does not support checkpoints")
+            for result in run_vectorized(self.settings, strat, self.sim_number):
+                self._write_trial(result)
+                if not self._trial_finished(result, control):
+                    break
+        elif self.settings.engine != "reference":
+            raise ValueError(f"Unknown engine '{self.settings.engine}'")
+        elif workers > 1 and len(trials) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(trials)),
+                initializer=_init_worker,
+                initargs=(self.settings, strat, self.sim_number, base_seed),
+            ) as pool:
+                chunksize = max(1, len(trials) // (workers * 4))
+                for result in pool.map(_play_trial_in_worker, trials, chunksize=chunksize):
+                    self._write_trial(result)
+                    self._checkpoint(base_seed, result.trial + 1)
+                    if not self._trial_finished(result, control):
+                        pool.shutdown(cancel_futures=True)
+                        break
+        else:
+            # Trials are played in slices of rounds when something needs to
+            # happen in between; otherwise each trial runs in one call.
+            step = CHECKPOINT_ROUNDS if self.settings.checkpoint_interval or control else None
+            for trial in trials:
+                runner = TrialRunner(
+                    self.settings, strat, trial, self.sim_number,
+                    trial_rng(self.settings.rng, base_seed, trial),
+                )
+                if replay_rounds:
+                    self._replay(runner, replay_rounds)
+                    replay_rounds = 0
+                while not runner.play(step):
+                    self._checkpoint(base_seed, trial, runner)
+                    if control is not None and not control.checkpoint(
+                        trial, runner.hands_played, runner.result.bankroll_rows
+                    ):
+                        self.cancelled = True
+                        break
+                if self.cancelled:
+                    break
+                result = runner.finish()
+                self._write_trial(result)
+                self._checkpoint(base_seed, trial + 1)
+                if not self._trial_finished(result, control):
+                    break
+        self.writer.flush()
+        self.conn.execute("DELETE FROM checkpoints WHERE sim = ?", (self.sim_number,))
+        commit_started = time.perf_counter()
+        self.conn.commit()
+        self.elapsed = time.perf_counter() - started
+        if self.perf is not None:
+            self.perf.add("commit", time.perf_counter() - commit_started)
+            self._save_perf()
+
+    def run_table(self, seats: Sequence[Seat]) -> None:
+        """Play every trial at one table of *seats* sharing the shoe.
+
+        Each trial writes one ``temp_seats`` row per seat, in bulk, and the
+        table's card counts; the per-round tables have no seat column, so no
+        rounds are recorded.  Trials use the same per-trial shuffle streams
+        as :meth:`run`.
+        """
+        base_seed = self.settings.seed
+        if base_seed is None:
+            base_seed = random.getrandbits(64)
+        settings = self.settings
+        started = time.perf_counter()
+        for trial in range(1, settings.trials + 1):
+            result = play_table(
+                settings, seats, trial, self.sim_number, trial_rng(settings.rng, base_seed, trial)
             )
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS temp_results (
-                sim INTEGER,
-                trial INTEGER,
-                decks INTEGER,
-                penetration REAL,
-                payout TEXT,
-                soft17 TEXT,
-                das INTEGER,
-                rsa INTEGER,
-                surrender INTEGER,
-                hands INTEGER,
-                wager REAL,
-                open_bankroll REAL,
-                close_bankroll REAL,
-                cards TEXT
+            self._write_table(result)
+        self.writer.flush()
+        self.conn.commit()
+        self.elapsed = time.perf_counter() - started
+
+    def _write_table(self, result: TableResult) -> None:
+        self._register_run()
+        rows = []
+        for seat, seat_result in enumerate(result.seats, 1):
+            stats = seat_result.stats
+            rows.append(
+                (
+                    self.sim_number,
+                    result.trial,
+                    seat,
+                    seat_result.hands_played,
+                    seat_result.bankroll,
+                    stats.outcomes.count,
+                    stats.outcomes.mean,
+                    stats.outcomes.variance,
+                    stats.max_drawdown,
+                    int(stats.ruined),
+                )
             )
-            """
+            self.hands_played += seat_result.hands_played
+            self.stats.add_trial(stats, seat_result.bankroll)
+        self.writer.extend("temp_seats", rows)
+        self.writer.extend(
+            "temp_card_distribution",
+            (
+                (result.trial, "T" if card == "10" else card, count)
+                for card, count in result.card_counts.items()
+            ),
         )
 
+    def _save_perf(self) -> None:
+        """Store the phase timings of the run, plus a ``total`` row of hands and wall time."""
+        rows = self.perf.rows() + [("total", self.hands_played, self.elapsed)]
+        self.conn.executemany(
+            "INSERT INTO perf (sim, version, engine, phase, calls, seconds) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (self.sim_number, _package_version(), self.settings.engine, phase, calls, seconds)
+                for phase, calls, seconds in rows
+            ),
+        )
         self.conn.commit()
 
-    def _format_round(
-        self, initial_cards: List[Card], player_hands: List[Hand], dealer_hand: Hand
-    ) -> str:
-        def _fmt(rank: str) -> str:
-            """Represent the rank using single-character notation.
-
-            The simulator records tens as ``"10"`` internally, but the
-            interface displays them as ``"T"`` to keep hand layouts compact
-            (e.g. ``9T`` for a hard 19).
-            """
-
-            return "T" if rank == "10" else rank
-
-        player_repr: str
-        if len(player_hands) == 1:
-            hand_obj = player_hands[0]
-            base = "".join(_fmt(c.rank) for c in initial_cards)
-            if hand_obj.surrendered:
-                player_repr = f"{base}|x"
-            else:
-                extra = ""
-                if len(hand_obj.cards) > 2:
-                    extra_cards = hand_obj.cards[2:]
-                    is_double = hand_obj.bet > self.settings.bet_amount
-                    if is_double:
-                        extra += "d" + _fmt(extra_cards[0].rank)
-                    else:
-                        extra += "".join(_fmt(c.rank) for c in extra_cards)
-                player_repr = base + "|" + extra
-                player_repr += "_" if hand_obj.is_bust else "s"
-        else:
-            base = "".join(_fmt(c.rank) for c in initial_cards)
-            parts = []
-            for h in player_hands:
-                seg_cards = h.cards[1:]
-                if h.bet > self.settings.bet_amount and len(seg_cards) >= 2:
-                    seg = "v" + _fmt(seg_cards[0].rank) + "d" + _fmt(seg_cards[1].rank)
-                else:
-                    seg = "v" + "".join(_fmt(c.rank) for c in seg_cards)
-                seg += "_" if h.is_bust else "s"
-                parts.append(seg)
-            player_repr = base + "|" + "_".join(parts)
-
-        dealer_base = _fmt(dealer_hand.cards[0].rank)
-        extra = "".join(_fmt(c.rank) for c in dealer_hand.cards[1:])
-        dealer_repr = dealer_base + "|" + extra
-        dealer_repr += "_" if dealer_hand.is_bust else "s"
-        return f"Player Hand: {player_repr}, Dealer Hand: {dealer_repr}"
-
-    def run(self) -> None:
-        if self.settings.seed is not None:
-            random.seed(self.settings.seed)
-        strat = BasicStrategy.from_json(
-            self.settings.strategy_file, allow_surrender=self.settings.allow_surrender
+    def _trial_finished(self, result: TrialResult, control: RunControl | None) -> bool:
+        """Tell *control* about a written trial; return whether to carry on."""
+        if control is None:
+            return True
+        control.trial_finished(result)
+        if not control.checkpoint(result.trial, result.hands_played, result.bankroll_rows):
+            self.cancelled = True
+        return not self.cancelled
+
+    def _checkpoint(self, base_seed: int, next_trial: int, runner: TrialRunner | None = None) -> None:
+        """Commit the rows so far with the state needed to resume, when one is due.
+
+        An unfinished trial is saved through its *runner*; the rows it has
+        produced are written now and cleared from it.
+        """
+        interval = self.settings.checkpoint_interval
+        if not interval or time.monotonic() < self._checkpoint_due:
+            return
+        self._register_run()
+        if runner is not None:
+            result = runner.result
+            self._write_bankroll(result)
+            self.writer.extend("temp_results", result.result_rows)
+            result.bankroll_rows, result.result_rows = [], []
+        self.writer.flush()
+        state = {
+            "settings": asdict(self.settings),
+            "base_seed": base_seed,
+            "next_trial": next_trial,
+            "rounds": runner.rounds if runner is not None else 0,
+            "stats": self.stats.state(),
+            "hands_played": self.hands_played,
+        }
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+            (self.sim_number, next_trial, json.dumps(state)),
         )
-        for trial in range(1, self.settings.trials + 1):
-            shoe = Shoe(self.settings.num_decks, penetration=self.settings.penetration)
-            player_settings = PlayerSettings(
-                bankroll=self.settings.bankroll,
-                blackjack_payout=self.settings.blackjack_payout,
-                double_after_split=self.settings.double_after_split,
-                resplit_aces=self.settings.resplit_aces,
-                allow_surrender=self.settings.allow_surrender,
-                bet_amount=self.settings.bet_amount,
-            )
-            player = Player(player_settings, strat)
-            dealer = Dealer(hit_soft_17=self.settings.hit_soft_17)
-            hands_played = 0
-            cur = self.conn.cursor()
-            while (
-                hands_played < self.settings.hands_per_game
-                and player_settings.bankroll >= player_settings.bet_amount
-            ):
-                if shoe.penetration_reached:
-                    shoe.shuffle()
-                bankroll_before = player_settings.bankroll
-                player_settings.bankroll -= player_settings.bet_amount
-                player_hand = Hand(bet=player_settings.bet_amount)
-                dealer_hand = Hand()
-                player_hand.add_card(shoe.draw())
-                dealer_hand.add_card(shoe.draw())
-                player_hand.add_card(shoe.draw())
-                dealer_hand.add_card(shoe.draw())
-
-                initial_cards = list(player_hand.cards)
-                player_hands = player.play(shoe, dealer_hand.cards[0].rank, player_hand)
-                if any(not h.is_bust and not h.surrendered for h in player_hands):
-                    dealer.play(dealer_hand, shoe)
-                for h in player_hands:
-                    change = self.resolve_hand(h, dealer_hand, player_settings)
-                    player_settings.bankroll += change
-                hands_played += len(player_hands)
-
-                cur.execute(
-                    "INSERT INTO temp_bankroll VALUES (?,?,?)",
-                    (trial, hands_played, player_settings.bankroll),
-                )
+        self.conn.commit()
+        self._checkpoint_due = time.monotonic() + interval
 
-                layout = self._format_round(initial_cards, player_hands, dealer_hand)
-                cur.execute(
-                    "INSERT INTO temp_results VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
-                    (
-                        self.sim_number,
-                        trial,
-                        self.settings.num_decks,
-                        self.settings.penetration,
-                        "3:2" if self.settings.blackjack_payout == 1.5 else "6:5",
-                        "H17" if self.settings.hit_soft_17 else "S17",
-                        int(self.settings.double_after_split),
-                        int(self.settings.resplit_aces),
-                        int(self.settings.allow_surrender),
-                        len(player_hands),
-                        self.settings.bet_amount,
-                        bankroll_before,
-                        player_settings.bankroll,
-                        layout,
-                    ),
-                )
-            cur.execute(
-                "INSERT INTO temp_summary VALUES (?,?,?)",
-                (trial, hands_played, player_settings.bankroll),
+    def _replay(self, runner: TrialRunner, rounds: int) -> None:
+        """Play the first *rounds* rounds of *runner* again without writing them.
+
+        Their rows were written before the checkpoint; only the pyramid
+        buckets still open are rebuilt from them.
+        """
+        runner.play(rounds)
+        result = runner.result
+        if result.bankroll_rows:
+            result.lod = LodBuilder(result.trial)
+            result.lod.add(result.bankroll_rows)
+        result.bankroll_rows, result.result_rows = [], []
+        if runner.perf is not None:
+            runner.perf = PhaseTimer()
+
+    def write_results(self, results: Iterable[TrialResult]) -> None:
+        """Write *results* into the ``temp_*`` tables in a single transaction."""
+        for result in results:
+            self._write_trial(result)
+        self.writer.flush()
+        self.conn.commit()
+
+    def _write_trial(self, result: TrialResult) -> None:
+        self.hands_played += result.hands_played
+        if self.perf is None:
+            self._write_rows(result)
+            return
+        started = time.perf_counter()
+        self._write_rows(result)
+        self.perf.add("write", time.perf_counter() - started)
+        if result.perf is not None:
+            self.perf.merge(result.perf)
+
+    def _write_bankroll(self, result: TrialResult, finished: bool = False) -> None:
+        """Write the bankroll rows of *result* and the pyramid buckets they complete."""
+        if result.bankroll_rows:
+            if result.lod is None:
+                result.lod = LodBuilder(result.trial)
+            self.writer.extend("temp_bankroll", result.bankroll_rows)
+            self.writer.extend("temp_bankroll_lod", result.lod.add(result.bankroll_rows))
+        if finished and result.lod is not None:
+            self.writer.extend("temp_bankroll_lod", result.lod.close())
+
+    def _write_rows(self, result: TrialResult) -> None:
+        self._register_run()
+        self._write_bankroll(result, finished=True)
+        self.writer.extend("temp_results", result.result_rows)
+        self.writer.add(
+            "temp_summary", (result.trial, result.hands_played, result.bankroll)
+        )
+        # Store tens as "T" for compact distribution records
+        self.writer.extend(
+            "temp_card_distribution",
+            (
+                (result.trial, "T" if card == "10" else card, count)
+                for card, count in result.card_counts.items()
+            ),
+        )
+        stats = result.stats
+        if stats is not None:
+            self.writer.add(
+                "temp_trial_stats",
+                (
+                    self.sim_number,
+                    result.trial,
+                    stats.outcomes.count,
+                    stats.outcomes.mean,
+                    stats.outcomes.variance,
+                    stats.low,
+                    stats.high,
+                    stats.max_drawdown,
+                    int(stats.ruined),
+                ),
             )
-            for card, count in shoe.drawn_counts.items():
-                # Store tens as "T" for compact distribution records
-                rank = "T" if card == "10" else card
-                cur.execute(
-                    "INSERT INTO temp_card_distribution VALUES (?,?,?)",
-                    (trial, rank, count),
+            self.stats.add_trial(stats, result.bankroll)
+
+    def _register_run(self) -> None:
+        """Record the run as temporary and point the writer at its data tables.
+
+        Runs once per ``sim_number`` (a sweep renumbers its cells), before
+        any of the run's rows are written.
+        """
+        if self._registered == self.sim_number:
+            return
+        self.writer.flush()
+        sim = int(self.sim_number)
+        self.conn.execute("INSERT OR IGNORE INTO runs (sim, status) VALUES (?, ?)", (sim, TEMP))
+        for _, temp in TABLE_PAIRS:
+            columns = table_columns(self.conn, temp)
+            placeholders = ", ".join("?" * len(columns))
+            if "sim" in columns:
+                sql = f"INSERT INTO {data_table(temp)} ({', '.join(columns)}) VALUES ({placeholders})"
+            else:
+                # The temp views leave out sim, so it is a constant of the statement.
+                sql = (
+                    f"INSERT INTO {data_table(temp)} ({', '.join(columns)}, sim)"
+                    f" VALUES ({placeholders}, {sim})"
                 )
-            self.conn.commit()
+            self.writer.set_statement(temp, sql)
+        self._registered = sim
 
     def save_results(self) -> None:
-        """Persist temporary tables into permanent storage."""
+        """Move the temporary runs into permanent storage.
+
+        Only the status of each run changes; its rows stay where they were
+        written.
+        """
         if self.settings.test_mode:
             raise RuntimeError("Cannot save results while in test mode")
-        cur = self.conn.cursor()
-        for permanent, temp in TABLE_PAIRS:
-            cur.execute(f"INSERT INTO {permanent} SELECT * FROM {temp}")
-            cur.execute(f"DELETE FROM {temp}")
+        self.conn.execute("UPDATE runs SET status = ? WHERE status = ?", (SAVED, TEMP))
         self.conn.commit()
 
     def discard_results(self) -> None:
-        """Remove any data from the temporary tables."""
+        """Hide the temporary runs; :meth:`purge_discarded` deletes their rows."""
+        self.conn.execute("UPDATE runs SET status = ? WHERE status = ?", (DISCARDED, TEMP))
+        self.conn.commit()
+
+    def purge_discarded(self) -> int:
+        """Delete the rows of discarded runs and return how many runs were purged."""
+        sims = [row[0] for row in self.conn.execute("SELECT sim FROM runs WHERE status = ?", (DISCARDED,))]
         cur = self.conn.cursor()
-        for _, temp in TABLE_PAIRS:
-            cur.execute(f"DELETE FROM {temp}")
+        for name in DATA_TABLES:
+            cur.execute(
+                f"DELETE FROM {data_table(name)} WHERE sim IN (SELECT sim FROM runs WHERE status = ?)",
+                (DISCARDED,),
+            )
+        cur.execute("DELETE FROM runs WHERE status = ?", (DISCARDED,))
         self.conn.commit()
+        return len(sims)
 
     def close(self) -> None:
         self.conn.close()
 
     def resolve_hand(self, hand, dealer_hand, settings: PlayerSettings) -> float:
-        if hand.surrendered:
-            return hand.bet  # half wager already deducted
-        if hand.is_bust:
-            return 0
-        dealer_bust = dealer_hand.is_bust
-        if hand.is_blackjack and not dealer_hand.is_blackjack:
-            return hand.bet * (1 + settings.blackjack_payout)
-        if dealer_hand.is_blackjack and not hand.is_blackjack:
-            return 0
-        if dealer_bust:
-            return hand.bet * 2
-        player_value = hand.best_value
-        dealer_value = dealer_hand.best_value
-        if player_value > dealer_value:
-            return hand.bet * 2
-        if player_value < dealer_value:
-            return 0
-        return hand.bet
+        return resolve_hand(hand, dealer_hand, settings)
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("blackjack-simulator")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# State shared by the trials a worker process plays, set once per process by
+# ``_init_worker`` so the strategy is not pickled again for every trial.
+_worker_state: tuple | None = None
+
+
+def _init_worker(
+    settings: SimulationSettings, strategy: BasicStrategy, sim_number: int, base_seed: int
+) -> None:
+    global _worker_state
+    _worker_state = (settings, strategy, sim_number, base_seed)
+
+
+def _play_trial_in_worker(trial: int) -> TrialResult:
+    settings, strategy, sim_number, base_seed = _worker_state
+    return play_trial(settings, strategy, trial, sim_number, trial_rng(settings.rng, base_seed, trial))
@@ -0,0 +1,247 @@
+"""Constant-memory statistics updated one observation at a time.
+
+The simulator feeds every round into these accumulators instead of relying
+on per-round rows, so summaries are available however many hands a trial
+plays and whether or not the rounds are persisted.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+import math
+
+
+@dataclass
+class RunningStats:
+    """Count, mean, variance and range using Welford's online update."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+    def merge(self, other: "RunningStats") -> None:
+        """Fold *other* into this accumulator (Chan et al. pairwise update)."""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, or ``0.0`` with fewer than two observations."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile with the P² algorithm.
+
+    Jain & Chlamtac's method keeps five markers whose heights are adjusted
+    with piecewise-parabolic interpolation, so memory does not grow with the
+    number of observations.  Until five values have been seen the exact
+    quantile of those values is returned.
+    """
+
+    def __init__(self, p: float):
+        if not 0 < p < 1:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+        positions = self._positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        for i in (1, 2, 3):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (
+                d <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        positions[i + step] - positions[i]
+                    )
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def state(self) -> Dict[str, Any]:
+        """The estimator's markers as plain values, for :meth:`from_state`."""
+        return {
+            "p": self.p,
+            "count": self.count,
+            "heights": self._heights,
+            "positions": self._positions,
+            "desired": self._desired,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "P2Quantile":
+        q = cls(state["p"])
+        q.count = state["count"]
+        q._heights = list(state["heights"])
+        q._positions = list(state["positions"])
+        q._desired = list(state["desired"])
+        return q
+
+    @property
+    def value(self) -> float:
+        if not self._heights:
+            return math.nan
+        if self.count <= 5:
+            ordered = self._heights
+            return ordered[min(len(ordered) - 1, int(round(self.p * (len(ordered) - 1))))]
+        return self._heights[2]
+
+
+@dataclass
+class TrialStats:
+    """Running statistics for one trial's bankroll path."""
+
+    start: float
+    outcomes: RunningStats = field(default_factory=RunningStats)
+    low: float = math.nan
+    high: float = math.nan
+    peak: float = math.nan
+    max_drawdown: float = 0.0
+    ruined: bool = False
+
+    def __post_init__(self) -> None:
+        self.low = self.high = self.peak = self.start
+
+    def record(self, before: float, after: float) -> None:
+        """Account for a round that moved the bankroll from *before* to *after*."""
+        self.outcomes.add(after - before)
+        if after < self.low:
+            self.low = after
+        if after > self.high:
+            self.high = after
+        if after > self.peak:
+            self.peak = after
+        elif self.peak - after > self.max_drawdown:
+            self.max_drawdown = self.peak - after
+
+
+class SimulationStats:
+    """Statistics across every trial of a run."""
+
+    QUANTILES = (0.05, 0.5, 0.95)
+
+    def __init__(self) -> None:
+        self.trials = 0
+        self.ruined = 0
+        self.outcomes = RunningStats()
+        self.final_bankroll = RunningStats()
+        self.max_drawdown = RunningStats()
+        self.bankroll_quantiles = {p: P2Quantile(p) for p in self.QUANTILES}
+        self.drawdown_quantiles = {p: P2Quantile(p) for p in self.QUANTILES}
+
+    def add_trial(self, stats: TrialStats, final_bankroll: float) -> None:
+        self.trials += 1
+        self.ruined += stats.ruined
+        self.outcomes.merge(stats.outcomes)
+        self.final_bankroll.add(final_bankroll)
+        self.max_drawdown.add(stats.max_drawdown)
+        for q in self.bankroll_quantiles.values():
+            q.add(final_bankroll)
+        for q in self.drawdown_quantiles.values():
+            q.add(stats.max_drawdown)
+
+    def state(self) -> Dict[str, Any]:
+        """The accumulators as JSON-compatible values, for :meth:`from_state`."""
+        return {
+            "trials": self.trials,
+            "ruined": self.ruined,
+            "outcomes": asdict(self.outcomes),
+            "final_bankroll": asdict(self.final_bankroll),
+            "max_drawdown": asdict(self.max_drawdown),
+            "bankroll_quantiles": [q.state() for q in self.bankroll_quantiles.values()],
+            "drawdown_quantiles": [q.state() for q in self.drawdown_quantiles.values()],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SimulationStats":
+        stats = cls()
+        stats.trials = state["trials"]
+        stats.ruined = state["ruined"]
+        stats.outcomes = RunningStats(**state["outcomes"])
+        stats.final_bankroll = RunningStats(**state["final_bankroll"])
+        stats.max_drawdown = RunningStats(**state["max_drawdown"])
+        for name in ("bankroll_quantiles", "drawdown_quantiles"):
+            quantiles = [P2Quantile.from_state(q) for q in state[name]]
+            setattr(stats, name, {q.p: q for q in quantiles})
+        return stats
+
+    @property
+    def risk_of_ruin(self) -> float:
+        """Fraction of trials that ran out of money before their last hand."""
+        return self.ruined / self.trials if self.trials else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        result = {
+            "trials": self.trials,
+            "rounds": self.outcomes.count,
+            "mean_per_round": self.outcomes.mean,
+            "stddev_per_round": self.outcomes.stddev,
+            "risk_of_ruin": self.risk_of_ruin,
+            "mean_final_bankroll": self.final_bankroll.mean,
+            "worst_drawdown": self.max_drawdown.maximum if self.trials else 0.0,
+        }
+        for p, q in self.bankroll_quantiles.items():
+            result[f"final_bankroll_p{round(p * 100):02d}"] = q.value
+        for p, q in self.drawdown_quantiles.items():
+            result[f"max_drawdown_p{round(p * 100):02d}"] = q.value
+        return result
@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List
+import sqlite3
+
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def configure_connection(conn: sqlite3.Connection, synchronous: str = "NORMAL") -> None:
+    """Apply the pragmas used for simulation databases.
+
+    File databases switch to write-ahead logging, which lets readers (such as
+    the GUI) query while a run is writing and makes commits cheaper.  With WAL
+    enabled ``synchronous=NORMAL`` is still safe against corruption; only the
+    last transactions may be lost on power failure.
+    """
+    level = synchronous.upper()
+    if level not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Unknown synchronous level '{synchronous}'")
+    cur = conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute(f"PRAGMA synchronous={level}")
+    cur.execute("PRAGMA temp_store=MEMORY")
+
+
+class BufferedWriter:
+    """Accumulate rows per table and insert them with ``executemany``.
+
+    Rows are held in memory until ``chunk_size`` of them are pending for a
+    table, then written in one call that reuses a single prepared ``INSERT``
+    statement.  The writer never commits; callers decide the transaction
+    boundaries and must call :meth:`flush` before committing.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, chunk_size: int = 5000):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self._pending: Dict[str, List[tuple]] = {}
+        self._statements: Dict[str, str] = {}
+        self.rows_written = 0
+
+    def set_statement(self, table: str, sql: str) -> None:
+        """Insert the rows buffered under *table* with *sql* instead of ``INSERT INTO table``."""
+        self._statements[table] = sql
+
+    def add(self, table: str, row: tuple) -> None:
+        pending = self._pending.setdefault(table, [])
+        pending.append(row)
+        if len(pending) >= self.chunk_size:
+            self._flush_table(table)
+
+    def extend(self, table: str, rows: Iterable[tuple]) -> None:
+        pending = self._pending.setdefault(table, [])
+        pending.extend(rows)
+        if len(pending) >= self.chunk_size:
+            self._flush_table(table)
+
+    def flush(self) -> None:
+        for table in list(self._pending):
+            self._flush_table(table)
+
+    def _flush_table(self, table: str) -> None:
+        rows = self._pending.get(table)
+        if not rows:
+            return
+        sql = self._statements.get(table)
+        if sql is None:
+            placeholders = ",".join("?" * len(rows[0]))
+            sql = f"INSERT INTO {table} VALUES ({placeholders})"
+            self._statements[table] = sql
+        # Write in chunk_size slices so a large extend() does not build one
+        # enormous executemany batch.
+        for start in range(0, len(rows), self.chunk_size):
+            self.conn.executemany(sql, rows[start:start + self.chunk_size])
+        self.rows_written += len(rows)
+        self._pending[table] = []
@@ -1,12 +1,107 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import json
+import os
+import struct
+import sys
 
+from .cards import RANK_INDEX
 from .hand import Hand
 
 Action = str  # 'hit', 'stand', 'double', 'split', 'surrender'
 
+# Dealer up-card columns of the strategy tables.  Face cards share the "10"
+# column, which is how the JSON tables are keyed.
+DEALER_UP_CARDS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "A"]
+_COLUMN_KEY = {"J": "10", "Q": "10", "K": "10"}
+UP_INDEX = {rank: DEALER_UP_CARDS.index(_COLUMN_KEY.get(rank, rank)) for rank in RANK_INDEX}
+
+# Totals covered by the compiled table; bust hands are included so a lookup
+# never falls outside it.
+TABLE_TOTALS = 32
+ACTIONS = ("stand", "hit", "double", "split", "surrender")
+
+# Rows each table must define for all ten up-cards.  Hard totals above 16
+# and soft 12 (unsplit aces) may be left out and stand.  The pair table needs
+# every pair rank the engine can deal (face cards use the "10" row); any
+# action but ``split`` plays the pair as its total.
+REQUIRED_HARD = range(4, 17)
+REQUIRED_SOFT = range(13, 22)
+REQUIRED_PAIR = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")
+_HARD_TOTALS = range(4, 22)
+_SOFT_TOTALS = range(12, 22)
+
+# Compiled strategies keyed by (path, mtime_ns, size, allow_surrender); the
+# same entries are stored as files in :func:`cache_dir`.
+_CACHE: Dict[tuple, "BasicStrategy"] = {}
+# A cache file is this header (magic, format version, table and pair-flag
+# lengths) followed by one byte per action and per flag, then the source
+# tables as JSON.  Nothing in it is executed when it is read back.
+_CACHE_MAGIC = b"BJSC"
+_CACHE_VERSION = 2
+_CACHE_HEADER = struct.Struct("<4sBII")
+CACHE_DIR_ENV = "BLACKJACK_CACHE_DIR"
+
+
+def cache_dir() -> str:
+    """Directory of the compiled strategy cache.
+
+    ``$BLACKJACK_CACHE_DIR`` when set, otherwise ``blackjack-simulator`` in
+    the per-user cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``, and
+    ``%LOCALAPPDATA%`` on Windows).
+    """
+    path = os.environ.get(CACHE_DIR_ENV)
+    if path:
+        return path
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        root = os.environ["LOCALAPPDATA"]
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "blackjack-simulator")
+
+
+def validate_tables(hard: Dict[int, Dict[str, Action]], soft: Dict[int, Dict[str, Action]],
+                    pair: Dict[str, Dict[str, Action]], source: str = "strategy") -> None:
+    """Raise ``ValueError`` unless the tables are complete and use known keys and actions."""
+    def check(name: str, table: Dict, keys, required, actions) -> None:
+        for key, row in table.items():
+            if key not in keys:
+                raise ValueError(f"{source}: unknown {name} row {key!r}")
+            if not isinstance(row, dict):
+                raise ValueError(f"{source}: {name} row {key!r} is not an object")
+            for up, action in row.items():
+                if up not in DEALER_UP_CARDS:
+                    raise ValueError(f"{source}: unknown dealer up-card {up!r} in {name} row {key!r}")
+                if action not in actions:
+                    raise ValueError(f"{source}: unknown action {action!r} in {name} row {key!r}")
+        if not table:
+            raise ValueError(f"{source}: the {name} table is missing or empty")
+        for key in required:
+            missing = [up for up in DEALER_UP_CARDS if up not in table.get(key, {})]
+            if missing:
+                raise ValueError(f"{source}: {name} row {key!r} is missing dealer up-cards {', '.join(missing)}")
+
+    plays = set(ACTIONS) - {"split"}
+    check("hard", hard, _HARD_TOTALS, REQUIRED_HARD, plays)
+    check("soft", soft, _SOFT_TOTALS, REQUIRED_SOFT, plays)
+    check("pair", pair, REQUIRED_PAIR, REQUIRED_PAIR, set(ACTIONS))
+
+
+def clear_strategy_cache() -> None:
+    """Forget the strategies compiled by this process (the files are kept)."""
+    _CACHE.clear()
+
+
+def _fallback(action: Action | None, can_double: bool, can_surrender: bool) -> Action:
+    """Replace *action* when it needs an option that is not available."""
+    if action == "double" and not can_double:
+        action = "hit"
+    if action == "surrender" and not can_surrender:
+        action = "hit"
+    return action or "stand"
+
 
 @dataclass
 class BasicStrategy:
@@ -17,38 +112,173 @@ class BasicStrategy:
     mapping of dealer up cards (``"2"``..``"10"``, ``"A"``) and the
     recommended action (``hit``, ``stand``, ``double``, ``split`` or
     ``surrender``).
+
+    :meth:`compile` flattens the tables into a list indexed by hand category,
+    total, dealer up-card and available options, after which :meth:`decide`
+    is a single lookup.  The dictionaries must not be modified once compiled.
     """
 
     hard: Dict[int, Dict[str, Action]] = field(default_factory=dict)
     soft: Dict[int, Dict[str, Action]] = field(default_factory=dict)
     pair: Dict[str, Dict[str, Action]] = field(default_factory=dict)
+    _table: Optional[List[Action]] = field(default=None, init=False, repr=False, compare=False)
+    _pairs: Optional[List[bool]] = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
-    def from_json(cls, path: str, allow_surrender: bool = True) -> "BasicStrategy":  # pragma: no cover - CLI helper
-        """Create a strategy instance from ``path``.
+    def from_json(cls, path: str, allow_surrender: bool = True) -> "BasicStrategy":
+        """Return the compiled strategy of ``path``, from a cache when possible.
 
-        Missing sections in the JSON default to empty dictionaries which
-        effectively cause the strategy to stand on every hand.
-        ``allow_surrender`` replaces any "surrender" recommendations with
-        "hit" when set to ``False``.
+        The ``hard``, ``soft`` and ``pair`` tables must define every row in
+        :data:`REQUIRED_HARD`, :data:`REQUIRED_SOFT` and
+        :data:`REQUIRED_PAIR` for all dealer up-cards.  Missing tables or
+        rows, and unknown sections, rows, up-cards or actions, raise
+        ``ValueError``.  ``allow_surrender`` replaces any "surrender"
+        recommendations with "hit" when set to ``False``.
+
+        Compiled strategies are kept per process and in :func:`cache_dir`,
+        keyed by the file's path, modification time and size, so sweeps and
+        repeated runs skip parsing.  The returned instance may be shared and
+        must not be modified.
         """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, allow_surrender)
+        strategy = _CACHE.get(key)
+        if strategy is None:
+            strategy = cls._load_cached(key)
+            if strategy is None:
+                strategy = cls._parse_json(path, allow_surrender)
+                cls._store_cached(key, strategy)
+            _CACHE[key] = strategy
+        return strategy
+
+    @classmethod
+    def _parse_json(cls, path: str, allow_surrender: bool) -> "BasicStrategy":
         with open(path, "r", encoding="utf8") as f:
-            data = json.load(f)
-        hard = {int(k): v for k, v in data.get("hard", {}).items()}
-        soft = {int(k): v for k, v in data.get("soft", {}).items()}
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}: invalid JSON ({exc})") from None
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected an object with 'hard', 'soft' and 'pair' tables")
+        unknown = set(data) - {"hard", "soft", "pair", "split"}
+        if unknown:
+            raise ValueError(f"{path}: unknown sections {', '.join(sorted(unknown))}")
+        try:
+            hard = {int(k): v for k, v in data.get("hard", {}).items()}
+            soft = {int(k): v for k, v in data.get("soft", {}).items()}
+        except (AttributeError, ValueError):
+            raise ValueError(f"{path}: hard and soft must be objects keyed by totals") from None
         pair = data.get("pair") or data.get("split") or {}
+        validate_tables(hard, soft, pair, source=path)
         if not allow_surrender:
             for table in (hard, soft, pair):
                 for row in table.values():
                     for dealer, action in list(row.items()):
                         if action == "surrender":
                             row[dealer] = "hit"
-        return cls(hard=hard, soft=soft, pair=pair)
+        return cls(hard=hard, soft=soft, pair=pair).compile()
+
+    @staticmethod
+    def _cache_file(key: tuple) -> str:
+        """``<path>-<version>-<allow_surrender>.bin``, the first two hashed.
+
+        The version hash covers the JSON's modification time and size.
+        """
+        path, mtime_ns, size, allow_surrender = key
+        path_hash = hashlib.blake2b(path.encode(), digest_size=8).hexdigest()
+        version_hash = hashlib.blake2b(repr((_CACHE_VERSION, mtime_ns, size)).encode(), digest_size=8).hexdigest()
+        return os.path.join(cache_dir(), f"{path_hash}-{version_hash}-{int(allow_surrender)}.bin")
+
+    @classmethod
+    def _load_cached(cls, key: tuple) -> Optional["BasicStrategy"]:
+        try:
+            with open(cls._cache_file(key), "rb") as f:
+                data = f.read()
+            magic, version, table_size, pairs_size = _CACHE_HEADER.unpack_from(data)
+            if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+                return None
+            start = _CACHE_HEADER.size
+            table = data[start:start + table_size]
+            pairs = data[start + table_size:start + table_size + pairs_size]
+            source = json.loads(data[start + table_size + pairs_size:].decode("utf8"))
+            hard = {int(k): v for k, v in source["hard"].items()}
+            soft = {int(k): v for k, v in source["soft"].items()}
+            pair = source["pair"]
+            actions = [ACTIONS[i] for i in table]
+        except (OSError, struct.error, UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError, IndexError):
+            return None
+        if len(actions) != 2 * TABLE_TOTALS * len(DEALER_UP_CARDS) * 4 or len(pairs) != len(RANK_INDEX) * 10:
+            return None
+        strategy = cls(hard=hard, soft=soft, pair=pair)
+        strategy._table = actions
+        strategy._pairs = [bool(b) for b in pairs]
+        return strategy
+
+    @classmethod
+    def _store_cached(cls, key: tuple, strategy: "BasicStrategy") -> None:
+        """Write *strategy* to the cache; an unwritable cache directory just skips it."""
+        path = cls._cache_file(key)
+        table, pairs = strategy.lookup_tables()
+        table_bytes = bytes(ACTIONS.index(a) for a in table)
+        source = json.dumps({"hard": strategy.hard, "soft": strategy.soft, "pair": strategy.pair})
+        data = b"".join((
+            _CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, len(table_bytes), len(pairs)),
+            table_bytes,
+            bytes(pairs),
+            source.encode("utf8"),
+        ))
+        directory, name = os.path.split(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Files for older versions of the same JSON are dropped.
+            path_hash, version_hash, _ = name.split("-")
+            for old in os.listdir(directory):
+                if old.startswith(f"{path_hash}-") and not old.startswith(f"{path_hash}-{version_hash}-"):
+                    os.remove(os.path.join(directory, old))
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def compile(self) -> "BasicStrategy":
+        """Build the flat lookup tables used by :meth:`decide` and return ``self``.
+
+        Entry ``((soft * 32 + total) * 10 + up) * 4 + variant`` holds the action
+        for that hand, where ``variant`` is ``can_double + 2 * can_surrender``,
+        so the option fallbacks are resolved ahead of time.
+        """
+        table: List[Action] = []
+        for source in (self.hard, self.soft):
+            for total in range(TABLE_TOTALS):
+                for up in DEALER_UP_CARDS:
+                    action = self._lookup(source, total, up)
+                    for variant in range(4):
+                        table.append(_fallback(action, bool(variant & 1), bool(variant & 2)))
+        pairs: List[bool] = []
+        for rank in RANK_INDEX:
+            for up in DEALER_UP_CARDS:
+                pairs.append(self._lookup(self.pair, rank, up) == "split")
+        self._table = table
+        self._pairs = pairs
+        return self
+
+    def lookup_tables(self) -> Tuple[List[Action], List[bool]]:
+        """Return the compiled action table and pair-split flags.
+
+        The split flags are indexed by ``rank_index * 10 + up`` where
+        ``rank_index`` follows :data:`~blackjack.cards.RANKS`.  Engines that
+        vectorize decisions use these to build their own arrays.
+        """
+        if self._table is None:
+            self.compile()
+        return self._table, self._pairs
 
     def _lookup(self, table: Dict, key, dealer_up: str) -> Action | None:
-        row = table.get(key)
+        row = table.get(_COLUMN_KEY.get(key, key))
         if row:
-            return row.get(dealer_up)
+            return row.get(_COLUMN_KEY.get(dealer_up, dealer_up))
         return None
 
     def decide(self, hand: Hand, dealer_up: str, options: Dict[str, bool]) -> Action:
@@ -57,6 +287,21 @@ class BasicStrategy:
         ``options`` controls availability of ``double``, ``split`` and
         ``surrender``.
         """
+        if self._table is not None:
+            up = UP_INDEX[dealer_up]
+            if (
+                options.get("can_split")
+                and hand.can_split
+                and self._pairs[RANK_INDEX[hand.cards[0].rank] * 10 + up]
+            ):
+                return "split"
+            index = ((hand.is_soft * TABLE_TOTALS + hand.best_value) * 10 + up) * 4
+            if options.get("can_double"):
+                index += 1
+            if options.get("can_surrender"):
+                index += 2
+            return self._table[index]
+
         # Check for pair/split actions first
         if options.get("can_split") and hand.can_split:
             rank = hand.cards[0].rank
@@ -65,14 +310,8 @@ class BasicStrategy:
                 return "split"
 
         total = hand.best_value
-        soft = any(v <= 21 and v != total for v in hand.values)
-        table = self.soft if soft else self.hard
+        table = self.soft if hand.is_soft else self.hard
         action = self._lookup(table, total, dealer_up)
 
         # Fallback when action requires an unavailable option
-        if action == "double" and not options.get("can_double"):
-            action = "hit"
-        if action == "surrender" and not options.get("can_surrender"):
-            action = "hit"
-
-        return action or "stand"
+        return _fallback(action, options.get("can_double"), options.get("can_surrender"))
@@ -0,0 +1,190 @@
+"""Run a grid of rule and setting combinations as one resumable job.
+
+Each combination (a *cell*) is a full simulation written under its own
+``sim`` number.  Cells are played in worker processes that receive every
+parsed strategy once, while the parent writes their rows through a single
+connection.  A cell's rows and its ``sweep_cells`` entry are committed
+together, so an interrupted sweep restarted with the same name skips the
+cells that already finished.
+
+Every cell uses the base settings' seed, so cells that only differ in one
+rule are compared on the same shuffles.  Without a seed one is drawn when
+the sweep is first created and stored with it, so a resumed sweep plays its
+remaining cells on the same shuffles too.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+import hashlib
+import itertools
+import json
+import os
+import random
+
+from .engine import TrialResult, play_trial
+from .rng import trial_rng
+from .schema import SAVED
+from .settings import SimulationSettings
+from .simulator import Simulator
+from .strategy import BasicStrategy
+
+# Settings that describe the job rather than a configuration.
+_FIXED_FIELDS = {"database", "workers", "test_mode", "sqlite_synchronous", "write_chunk_size"}
+_SETTING_FIELDS = {f.name for f in fields(SimulationSettings)}
+
+
+def load_grid(spec: str) -> Dict[str, list]:
+    """Parse a grid given as inline JSON or the path of a JSON file."""
+    path = Path(spec)
+    text = path.read_text(encoding="utf8") if path.is_file() else spec
+    grid = json.loads(text)
+    if not isinstance(grid, dict):
+        raise ValueError("A sweep grid maps setting names to lists of values")
+    return {key: values if isinstance(values, list) else [values] for key, values in grid.items()}
+
+
+def expand_grid(base: SimulationSettings, grid: Dict[str, Sequence]) -> List[SimulationSettings]:
+    """Return one settings object per combination of *grid* values."""
+    for key in grid:
+        if key not in _SETTING_FIELDS:
+            raise ValueError(f"Unknown setting '{key}' in sweep grid")
+        if key in _FIXED_FIELDS:
+            raise ValueError(f"'{key}' cannot vary within a sweep")
+    keys = list(grid)
+    return [
+        replace(base, **dict(zip(keys, values)))
+        for values in itertools.product(*(grid[k] for k in keys))
+    ]
+
+
+def _strategy_key(settings: SimulationSettings) -> Tuple[str, bool]:
+    return settings.strategy_file, settings.allow_surrender
+
+
+def _play_cell(
+    settings: SimulationSettings, strategy: BasicStrategy, sim_number: int
+) -> List[TrialResult]:
+    """Play every trial of one cell serially, as ``Simulator.run`` would."""
+    if settings.engine == "vectorized":
+        from .vectorized import run_vectorized
+
+        return list(run_vectorized(settings, strategy, sim_number))
+    return [
+        play_trial(settings, strategy, trial, sim_number, trial_rng(settings.rng, settings.seed, trial))
+        for trial in range(1, settings.trials + 1)
+    ]
+
+
+# Parsed strategies shared by the cells a worker plays, set by ``_init_worker``.
+_worker_strategies: Dict[Tuple[str, bool], BasicStrategy] = {}
+
+
+def _init_worker(strategies: Dict[Tuple[str, bool], BasicStrategy]) -> None:
+    global _worker_strategies
+    _worker_strategies = strategies
+
+
+def _play_cell_in_worker(job: Tuple[SimulationSettings, int]) -> List[TrialResult]:
+    settings, sim_number = job
+    return _play_cell(settings, _worker_strategies[_strategy_key(settings)], sim_number)
+
+
+class Sweep:
+    """Schedule every cell of *grid* over ``base.workers`` processes."""
+
+    def __init__(self, base: SimulationSettings, grid: Dict[str, Sequence], name: str | None = None):
+        self.grid = grid
+        self.cells = expand_grid(base, grid)
+        if name is None:
+            config = {k: v for k, v in asdict(base).items() if k not in _FIXED_FIELDS}
+            spec = json.dumps([config, grid], sort_keys=True, default=str)
+            name = hashlib.blake2b(spec.encode(), digest_size=6).hexdigest()
+        self.name = name
+        self.sim = Simulator(base)
+        self.conn = self.sim.conn
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sweep_cells (
+                sweep TEXT,
+                cell INTEGER,
+                sim INTEGER,
+                params TEXT,
+                PRIMARY KEY (sweep, cell)
+            )
+            """
+        )
+        # Seeds are stored as text: a 64-bit seed does not fit an SQLite integer.
+        self.conn.execute("CREATE TABLE IF NOT EXISTS sweeps (sweep TEXT PRIMARY KEY, seed TEXT)")
+        if base.seed is None:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sweeps VALUES (?, ?)", (name, str(random.getrandbits(64)))
+            )
+            (seed,) = self.conn.execute("SELECT seed FROM sweeps WHERE sweep = ?", (name,)).fetchone()
+            base = replace(base, seed=int(seed))
+            self.cells = expand_grid(base, grid)
+        self.conn.commit()
+        self.base = base
+
+    def completed(self) -> Dict[int, int]:
+        """Map the index of every finished cell to its ``sim`` number."""
+        rows = self.conn.execute(
+            "SELECT cell, sim FROM sweep_cells WHERE sweep = ?", (self.name,)
+        ).fetchall()
+        return dict(rows)
+
+    def params(self, cell: int) -> Dict[str, object]:
+        settings = self.cells[cell]
+        return {key: getattr(settings, key) for key in self.grid}
+
+    def run(self) -> Dict[int, int]:
+        """Play the cells not finished yet and return every cell's ``sim`` number."""
+        done = self.completed()
+        pending = [i for i in range(len(self.cells)) if i not in done]
+        # Test-mode cells leave nothing in the permanent tables, so finished
+        # cells are checked too when numbering the rest.
+        (last,) = self.conn.execute("SELECT COALESCE(MAX(sim), 0) FROM sweep_cells").fetchone()
+        first = max(self.sim.sim_number, last + 1)
+        jobs = [(self.cells[i], first + offset) for offset, i in enumerate(pending)]
+        strategies: Dict[Tuple[str, bool], BasicStrategy] = {}
+        for settings in self.cells:
+            key = _strategy_key(settings)
+            if key not in strategies:
+                strategies[key] = BasicStrategy.from_json(*key)
+        workers = min(self.base.workers or os.cpu_count() or 1, len(jobs))
+        if workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(strategies,)
+            ) as pool:
+                for i, job, results in zip(pending, jobs, pool.map(_play_cell_in_worker, jobs)):
+                    self._record(i, job, results)
+                    done[i] = job[1]
+        else:
+            _init_worker(strategies)
+            for i, job in zip(pending, jobs):
+                self._record(i, job, _play_cell_in_worker(job))
+                done[i] = job[1]
+        return done
+
+    def _record(self, cell: int, job: Tuple[SimulationSettings, int], results: List[TrialResult]) -> None:
+        settings, sim_number = job
+        sim = Simulator(settings, conn=self.conn)
+        sim.sim_number = sim_number
+        # The cell is marked finished in the same transaction as its rows.
+        self.conn.execute(
+            "INSERT INTO sweep_cells VALUES (?, ?, ?, ?)",
+            (self.name, cell, sim_number, json.dumps(self.params(cell))),
+        )
+        if settings.test_mode:
+            sim.write_results(results)
+        else:
+            for result in results:
+                sim._write_trial(result)
+            sim.writer.flush()
+            # Only this cell's run: other unsaved runs in the file stay temporary.
+            self.conn.execute("UPDATE runs SET status = ? WHERE sim = ?", (SAVED, sim_number))
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
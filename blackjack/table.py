@@ -0,0 +1,200 @@
+"""Several players at one table, sharing a shoe and a dealer hand.
+
+:class:`TableRunner` is the multi-seat counterpart of
+:class:`~blackjack.engine.TrialRunner`.  Each round deals one card to every
+seat still playing, then the dealer's up-card, a second card round the
+table and the dealer's hole card; seats play their hands in order and the
+dealer draws once for all of them.  A seat leaves the table when it has
+played ``hands_per_game`` hands or cannot cover its bet, and the trial ends
+when every seat has left.  With a single seat the cards are drawn in the
+same order as :class:`~blackjack.engine.TrialRunner`, so both give the same
+results.
+
+Rounds are not recorded: the per-round tables have no seat column.  Each
+seat's :class:`TrialResult` carries its totals and statistics only.
+
+Per-round work is a loop over the seats with no per-seat setup, so a round
+at a full table costs about seven single-seat rounds minus the shared
+shuffle and dealer play.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Sequence
+
+from .settings import SimulationSettings
+from .cards import Shoe
+from .player import Player, PlayerSettings
+from .dealer import Dealer
+from .strategy import BasicStrategy
+from .hand import Hand
+from .stats import TrialStats
+from .engine import TrialResult, resolve_hand
+
+# Seats at a standard blackjack table.
+MAX_SEATS = 7
+
+
+@dataclass
+class Seat:
+    """One player's rules, wager and strategy.
+
+    The bankroll in *settings* is the seat's starting bankroll; every trial
+    plays with a copy.
+    """
+
+    settings: PlayerSettings
+    strategy: BasicStrategy
+
+
+def seats_from_settings(settings: SimulationSettings, strategy: BasicStrategy, count: int) -> List[Seat]:
+    """*count* identical seats using the player rules of *settings*."""
+    player_settings = PlayerSettings(
+        bankroll=settings.bankroll,
+        blackjack_payout=settings.blackjack_payout,
+        double_after_split=settings.double_after_split,
+        resplit_aces=settings.resplit_aces,
+        allow_surrender=settings.allow_surrender,
+        bet_amount=settings.bet_amount,
+    )
+    return [Seat(replace(player_settings), strategy) for _ in range(count)]
+
+
+@dataclass
+class TableResult:
+    """Totals of a single trial at the table, one :class:`TrialResult` per seat."""
+
+    trial: int
+    seats: List[TrialResult] = field(default_factory=list)
+    rounds: int = 0
+    # Every seat sees the same cards, so they are counted once per table.
+    card_counts: Dict[str, int] = field(default_factory=dict)
+
+
+class TableRunner:
+    """Play one trial with every seat of *seats* at the same table.
+
+    The dealer rules (decks, penetration, soft 17) come from *settings*;
+    each seat brings its own payout, doubling, splitting and surrender
+    rules, bet and strategy.  Like :class:`~blackjack.engine.TrialRunner`
+    it can be pickled between calls to :meth:`play`.
+    """
+
+    def __init__(
+        self,
+        settings: SimulationSettings,
+        seats: Sequence[Seat],
+        trial: int,
+        sim_number: int,
+        rng=None,
+    ):
+        if not 1 <= len(seats) <= MAX_SEATS:
+            raise ValueError(f"A table has 1 to {MAX_SEATS} seats, not {len(seats)}")
+        self.settings = settings
+        self.sim_number = sim_number
+        self.shoe = Shoe(settings.num_decks, penetration=settings.penetration, rng=rng)
+        self.dealer = Dealer(hit_soft_17=settings.hit_soft_17)
+        self.seat_settings = [replace(seat.settings) for seat in seats]
+        self.players = [Player(s, seat.strategy) for s, seat in zip(self.seat_settings, seats)]
+        self.results = [TrialResult(trial=trial) for _ in seats]
+        self.stats = [TrialStats(s.bankroll) for s in self.seat_settings]
+        self.hands_played = [0] * len(seats)
+        self.rounds = 0
+
+    def _active(self) -> List[int]:
+        limit = self.settings.hands_per_game
+        return [
+            i for i, s in enumerate(self.seat_settings)
+            if self.hands_played[i] < limit and s.bankroll >= s.bet_amount
+        ]
+
+    @property
+    def done(self) -> bool:
+        return not self._active()
+
+    def play(self, max_rounds: int | None = None) -> bool:
+        """Play up to *max_rounds* more rounds (all when ``None``); return :attr:`done`."""
+        settings = self.settings
+        shoe, dealer = self.shoe, self.dealer
+        draw = shoe.draw
+        limit = settings.hands_per_game
+        hands_played = self.hands_played
+        rounds = self.rounds
+        stop = None if max_rounds is None else rounds + max_rounds
+        # Seats still playing, with what each round needs from them.
+        active = [
+            (i, self.seat_settings[i], self.players[i].play, self.stats[i].record)
+            for i in self._active()
+        ]
+        while active and rounds != stop:
+            if shoe.penetration_reached:
+                shoe.shuffle()
+            dealer_hand = Hand()
+            boxes = []
+            opening = []
+            for _, player_settings, _, _ in active:
+                bet = player_settings.bet_amount
+                opening.append(player_settings.bankroll)
+                player_settings.bankroll -= bet
+                hand = Hand(bet=bet)
+                hand.add_card(draw())
+                boxes.append(hand)
+            dealer_hand.add_card(draw())
+            for hand in boxes:
+                hand.add_card(draw())
+            dealer_hand.add_card(draw())
+
+            up = dealer_hand.cards[0].rank
+            played = []
+            live = False
+            for (_, _, play_hands, _), hand in zip(active, boxes):
+                player_hands = play_hands(shoe, up, hand)
+                played.append(player_hands)
+                live = live or any(not h.is_bust and not h.surrendered for h in player_hands)
+            if live:
+                dealer.play(dealer_hand, shoe)
+
+            rounds += 1
+            left = False
+            for (i, player_settings, _, record), bankroll_before, player_hands in zip(active, opening, played):
+                for h in player_hands:
+                    player_settings.bankroll += resolve_hand(h, dealer_hand, player_settings)
+                hands_played[i] += len(player_hands)
+                record(bankroll_before, player_settings.bankroll)
+                if hands_played[i] >= limit or player_settings.bankroll < player_settings.bet_amount:
+                    left = True
+            if left:
+                active = [
+                    seat for seat in active
+                    if hands_played[seat[0]] < limit and seat[1].bankroll >= seat[1].bet_amount
+                ]
+        self.rounds = rounds
+        return self.done
+
+    def finish(self) -> TableResult:
+        """Fill in each seat's totals and return the trial's result."""
+        limit = self.settings.hands_per_game
+        for i, result in enumerate(self.results):
+            stats = self.stats[i]
+            stats.ruined = self.hands_played[i] < limit
+            result.stats = stats
+            result.hands_played = self.hands_played[i]
+            result.bankroll = self.seat_settings[i].bankroll
+        return TableResult(
+            trial=self.results[0].trial,
+            seats=self.results,
+            rounds=self.rounds,
+            card_counts=dict(self.shoe.drawn_counts),
+        )
+
+
+def play_table(
+    settings: SimulationSettings,
+    seats: Sequence[Seat],
+    trial: int,
+    sim_number: int,
+    rng=None,
+) -> TableResult:
+    """Play one trial of the table until every seat has left."""
+    runner = TableRunner(settings, seats, trial, sim_number, rng)
+    runner.play()
+    return runner.finish()
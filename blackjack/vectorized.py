@@ -0,0 +1,408 @@
+"""NumPy engine that plays many trials side by side.
+
+Each trial is a *lane* with its own shoe, bankroll and hands.  A round is
+played for every active lane at once: draws, strategy lookups, dealer play
+and settlement are array operations across lanes, and only the per-hand
+action loop and the dealer draw loop iterate in Python.  The rules follow
+:mod:`blackjack.engine` exactly, but the engine only supports a flat
+``bet_amount`` with a fixed :class:`~blackjack.strategy.BasicStrategy` and
+shuffles with NumPy's generator, so it is statistically equivalent to the
+reference engine rather than card-for-card identical.
+"""
+from __future__ import annotations
+from typing import Iterator, List, Sequence
+
+from .cards import RANKS
+from .engine import TrialResult
+from .settings import SimulationSettings
+from .stats import RunningStats, TrialStats
+from .rng import bit_generator, seed_sequence
+from .strategy import ACTIONS, BasicStrategy, TABLE_TOTALS, UP_INDEX
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+STAND, HIT, DOUBLE, SPLIT, SURRENDER = (ACTIONS.index(a) for a in ("stand", "hit", "double", "split", "surrender"))
+ACE = RANKS.index("A")
+# Hard value of each rank index (aces count one).
+_HARD_VALUES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10]
+
+DEFAULT_LANES = 4096
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The vectorized engine requires NumPy; install it with 'pip install numpy'")
+
+
+class VectorizedEngine:
+    """Play a batch of trials, one per lane."""
+
+    def __init__(self, settings: SimulationSettings, strategy: BasicStrategy, rng, lanes: int):
+        _require_numpy()
+        self.settings = settings
+        self.rng = rng
+        self.lanes = lanes
+        table, pairs = strategy.lookup_tables()
+        self.table = np.array([ACTIONS.index(a) for a in table], dtype=np.int8)
+        self.pairs = np.array(pairs, dtype=bool)
+        self.hard_values = np.array(_HARD_VALUES, dtype=np.int16)
+        self.up_index = np.array([UP_INDEX[r] for r in RANKS], dtype=np.int16)
+
+        self.shoe_size = settings.num_decks * 52
+        self.deck = np.repeat(np.arange(len(RANKS), dtype=np.int8), 4 * settings.num_decks)
+        self.shoe = np.empty((lanes, self.shoe_size), dtype=np.int8)
+        self.pos = np.zeros(lanes, dtype=np.int64)
+        self._shuffle(np.arange(lanes))
+
+        self.bankroll = np.full(lanes, settings.bankroll, dtype=np.float64)
+        self.hands_played = np.zeros(lanes, dtype=np.int64)
+        self._alloc_hands(4)
+        self.d_hard = np.zeros(lanes, dtype=np.int16)
+        self.d_aces = np.zeros(lanes, dtype=np.int16)
+        self.d_cards = np.zeros(lanes, dtype=np.int16)
+        self.d_up = np.zeros(lanes, dtype=np.int8)
+
+    # -- shoe ---------------------------------------------------------------
+
+    def _shuffle(self, lanes) -> None:
+        if self.shoe_size == 0:
+            raise RuntimeError("Cannot draw from an empty shoe")
+        self.shoe[lanes] = self.rng.permuted(np.tile(self.deck, (len(lanes), 1)), axis=1)
+        self.pos[lanes] = 0
+
+    def _draw(self, lanes):
+        empty = self.pos[lanes] >= self.shoe_size
+        if empty.any():
+            self._shuffle(lanes[empty])
+        cards = self.shoe[lanes, self.pos[lanes]]
+        self.pos[lanes] += 1
+        return cards
+
+    # -- hands --------------------------------------------------------------
+
+    def _alloc_hands(self, slots: int) -> None:
+        shape = (self.lanes, slots)
+        self.slots = slots
+        self.n_hands = np.zeros(self.lanes, dtype=np.int64)
+        self.hard = np.zeros(shape, dtype=np.int16)
+        self.aces = np.zeros(shape, dtype=np.int16)
+        self.n_cards = np.zeros(shape, dtype=np.int16)
+        self.first = np.zeros(shape, dtype=np.int8)
+        self.second = np.zeros(shape, dtype=np.int8)
+        self.bet = np.zeros(shape, dtype=np.float64)
+        self.split = np.zeros(shape, dtype=bool)
+        self.split_aces = np.zeros(shape, dtype=bool)
+        self.surrendered = np.zeros(shape, dtype=bool)
+
+    def _grow_hands(self) -> None:
+        """Double the number of hand slots per lane (resplits are unlimited)."""
+        for name in ("hard", "aces", "n_cards", "first", "second", "bet", "split", "split_aces", "surrendered"):
+            old = getattr(self, name)
+            setattr(self, name, np.concatenate([old, np.zeros_like(old)], axis=1))
+        self.slots *= 2
+
+    def _add(self, lanes, slots, cards) -> None:
+        self.hard[lanes, slots] += self.hard_values[cards]
+        self.aces[lanes, slots] += cards == ACE
+        n = self.n_cards[lanes, slots]
+        self.first[lanes, slots] = np.where(n == 0, cards, self.first[lanes, slots])
+        self.second[lanes, slots] = np.where(n == 1, cards, self.second[lanes, slots])
+        self.n_cards[lanes, slots] = n + 1
+
+    def _totals(self, lanes, slot):
+        hard = self.hard[lanes, slot]
+        soft = (self.aces[lanes, slot] > 0) & (hard <= 11)
+        return hard + 10 * soft, soft
+
+    def _decide(self, lanes, slot, can_double, can_split, can_surrender):
+        best, soft = self._totals(lanes, slot)
+        up = self.up_index[self.d_up[lanes]]
+        index = ((soft * TABLE_TOTALS + best) * 10 + up) * 4 + can_double + 2 * can_surrender
+        action = self.table[index]
+        split = can_split & self.pairs[self.first[lanes, slot] * 10 + up]
+        return np.where(split, SPLIT, action)
+
+    def _split(self, lanes, slot) -> None:
+        while (self.n_hands[lanes] >= self.slots).any():
+            self._grow_hands()
+        new = self.n_hands[lanes]
+        card = self.second[lanes, slot]
+        is_ace = card == ACE
+        self.bankroll[lanes] -= self.bet[lanes, slot]
+        self.bet[lanes, new] = self.bet[lanes, slot]
+        self.split[lanes, new] = True
+        self.split_aces[lanes, new] = is_ace
+        self._add(lanes, new, card)
+        self.hard[lanes, slot] -= self.hard_values[card]
+        self.aces[lanes, slot] -= is_ace
+        self.n_cards[lanes, slot] = 1
+        self.split[lanes, slot] = True
+        self.split_aces[lanes, slot] |= is_ace
+        self._add(lanes, slot, self._draw(lanes))
+        self._add(lanes, new, self._draw(lanes))
+        self.n_hands[lanes] += 1
+
+    def _play_hand(self, lanes, slot: int) -> None:
+        s = self.settings
+        split = self.split[lanes, slot]
+        split_aces = self.split_aces[lanes, slot]
+        pair = (self.n_cards[lanes, slot] == 2) & (self.first[lanes, slot] == self.second[lanes, slot])
+        action = self._decide(
+            lanes,
+            slot,
+            (~split | s.double_after_split) & ~split_aces,
+            pair,
+            s.allow_surrender & ~split,
+        )
+        surrender = action == SURRENDER
+        self.surrendered[lanes[surrender], slot] = True
+        self.bet[lanes[surrender], slot] /= 2
+
+        act = lanes[~surrender]
+        while len(act):
+            n_cards = self.n_cards[act, slot]
+            best, _ = self._totals(act, slot)
+            split = self.split[act, slot]
+            split_aces = self.split_aces[act, slot]
+            done = (n_cards == 2) & (best == 21)
+            done |= self.hard[act, slot] > 21
+            done |= split_aces & (n_cards == 2) & (
+                (not s.resplit_aces) | (self.second[act, slot] != ACE)
+            )
+            keep = ~done
+            act, n_cards, split, split_aces = act[keep], n_cards[keep], split[keep], split_aces[keep]
+            if not len(act):
+                break
+            two = n_cards == 2
+            pair = two & (self.first[act, slot] == self.second[act, slot])
+            action = self._decide(
+                act, slot, two & (~split | s.double_after_split) & ~split_aces, pair, False
+            )
+            bet = self.bet[act, slot]
+            funded = self.bankroll[act] >= bet
+            stand = action == STAND
+            double = (action == DOUBLE) & two & funded
+            do_split = (action == SPLIT) & pair & funded
+            aces = do_split & (self.first[act, slot] == ACE) & split_aces
+            if aces.any():
+                ace_hands = self.split_aces[act].sum(axis=1)
+                do_split &= ~(aces & ((not s.resplit_aces) | (ace_hands >= 4)))
+            hit = ~(stand | double | do_split)
+
+            doubled = act[double]
+            if len(doubled):
+                self.bankroll[doubled] -= bet[double]
+                self.bet[doubled, slot] *= 2
+                self._add(doubled, slot, self._draw(doubled))
+            if do_split.any():
+                self._split(act[do_split], slot)
+            hitting = act[hit]
+            if len(hitting):
+                self._add(hitting, slot, self._draw(hitting))
+            act = act[~(stand | double)]
+
+    # -- rounds -------------------------------------------------------------
+
+    def play_round(self, lanes) -> np.ndarray:
+        """Play one round for *lanes* and return each lane's bankroll before it."""
+        s = self.settings
+        reshuffle = self.pos[lanes] / self.shoe_size >= s.penetration
+        if reshuffle.any():
+            self._shuffle(lanes[reshuffle])
+        before = self.bankroll[lanes].copy()
+        self.bankroll[lanes] -= s.bet_amount
+
+        for name in ("hard", "aces", "n_cards", "first", "second", "bet", "split", "split_aces", "surrendered"):
+            getattr(self, name)[lanes] = 0
+        self.n_hands[lanes] = 1
+        self.bet[lanes, 0] = s.bet_amount
+        self.d_hard[lanes] = 0
+        self.d_aces[lanes] = 0
+        zero = np.zeros(len(lanes), dtype=np.int64)
+        self._add(lanes, zero, self._draw(lanes))
+        up = self._draw(lanes)
+        self.d_up[lanes] = up
+        self._add(lanes, zero, self._draw(lanes))
+        hole = self._draw(lanes)
+        self.d_hard[lanes] = self.hard_values[up] + self.hard_values[hole]
+        self.d_aces[lanes] = (up == ACE).astype(np.int16) + (hole == ACE)
+        self.d_cards[lanes] = 2
+
+        slot = 0
+        while True:
+            playing = lanes[self.n_hands[lanes] > slot]
+            if not len(playing):
+                break
+            self._play_hand(playing, slot)
+            slot += 1
+
+        # The dealer only draws when some hand is still live.
+        used = np.arange(self.slots) < self.n_hands[lanes][:, None]
+        live = used & (self.hard[lanes] <= 21) & ~self.surrendered[lanes]
+        dealer = lanes[live.any(axis=1)]
+        while len(dealer):
+            hard = self.d_hard[dealer]
+            soft = (self.d_aces[dealer] > 0) & (hard <= 11)
+            best = hard + 10 * soft
+            hits = (best < 17) | ((best == 17) & soft & s.hit_soft_17)
+            dealer = dealer[hits]
+            if len(dealer):
+                cards = self._draw(dealer)
+                self.d_hard[dealer] += self.hard_values[cards]
+                self.d_aces[dealer] += cards == ACE
+                self.d_cards[dealer] += 1
+
+        d_hard = self.d_hard[lanes][:, None]
+        d_best = d_hard + 10 * ((self.d_aces[lanes][:, None] > 0) & (d_hard <= 11))
+        d_bj = (self.d_cards[lanes][:, None] == 2) & (d_best == 21)
+        hard = self.hard[lanes]
+        best = hard + 10 * ((self.aces[lanes] > 0) & (hard <= 11))
+        bj = (self.n_cards[lanes] == 2) & (best == 21)
+        bet = self.bet[lanes]
+        payout = np.select(
+            [
+                self.surrendered[lanes],
+                hard > 21,
+                bj & ~d_bj,
+                d_bj & ~bj,
+                d_best > 21,
+                best > d_best,
+                best < d_best,
+            ],
+            [bet, 0.0, bet * (1 + s.blackjack_payout), 0.0, bet * 2, bet * 2, 0.0],
+            default=bet,
+        )
+        self.bankroll[lanes] += np.where(used, payout, 0.0).sum(axis=1)
+        self.hands_played[lanes] += self.n_hands[lanes]
+        return before
+
+
+class _LaneStats:
+    """Welford accumulators and drawdown tracking for every lane."""
+
+    def __init__(self, lanes: int, start: float):
+        self.count = np.zeros(lanes, dtype=np.int64)
+        self.mean = np.zeros(lanes)
+        self.m2 = np.zeros(lanes)
+        self.minimum = np.full(lanes, np.inf)
+        self.maximum = np.full(lanes, -np.inf)
+        self.low = np.full(lanes, start)
+        self.high = np.full(lanes, start)
+        self.peak = np.full(lanes, start)
+        self.max_drawdown = np.zeros(lanes)
+
+    def record(self, lanes, before, after) -> None:
+        x = after - before
+        self.count[lanes] += 1
+        delta = x - self.mean[lanes]
+        mean = self.mean[lanes] + delta / self.count[lanes]
+        self.mean[lanes] = mean
+        self.m2[lanes] += delta * (x - mean)
+        self.minimum[lanes] = np.minimum(self.minimum[lanes], x)
+        self.maximum[lanes] = np.maximum(self.maximum[lanes], x)
+        self.low[lanes] = np.minimum(self.low[lanes], after)
+        self.high[lanes] = np.maximum(self.high[lanes], after)
+        peak = np.maximum(self.peak[lanes], after)
+        self.peak[lanes] = peak
+        self.max_drawdown[lanes] = np.maximum(self.max_drawdown[lanes], peak - after)
+
+    def trial_stats(self, lane: int, start: float, ruined: bool) -> TrialStats:
+        stats = TrialStats(start)
+        stats.outcomes = RunningStats(
+            count=int(self.count[lane]),
+            mean=float(self.mean[lane]),
+            m2=float(self.m2[lane]),
+            minimum=float(self.minimum[lane]),
+            maximum=float(self.maximum[lane]),
+        )
+        stats.low = float(self.low[lane])
+        stats.high = float(self.high[lane])
+        stats.peak = float(self.peak[lane])
+        stats.max_drawdown = float(self.max_drawdown[lane])
+        stats.ruined = ruined
+        return stats
+
+
+def play_trials(
+    settings: SimulationSettings,
+    strategy: BasicStrategy,
+    trials: Sequence[int],
+    sim_number: int,
+    rng,
+) -> List[TrialResult]:
+    """Play *trials* in one batch of lanes and return their rows."""
+    engine = VectorizedEngine(settings, strategy, rng, len(trials))
+    stats = _LaneStats(len(trials), settings.bankroll)
+    rounds = np.zeros(len(trials), dtype=np.int64)
+    bet = settings.bet_amount
+    log = []
+    while True:
+        active = np.flatnonzero(
+            (engine.hands_played < settings.hands_per_game) & (engine.bankroll >= bet)
+        )
+        if not len(active):
+            break
+        before = engine.play_round(active)
+        after = engine.bankroll[active]
+        stats.record(active, before, after)
+        if not settings.record_every:
+            continue
+        rounds[active] += 1
+        keep = rounds[active] % settings.record_every == 0
+        if keep.any():
+            log.append(
+                (active[keep], engine.hands_played[active][keep], before[keep],
+                 after[keep], engine.n_hands[active][keep])
+            )
+
+    results = [TrialResult(trial=t) for t in trials]
+    if log:
+        lane, hands, before, after, n_hands = (np.concatenate(col) for col in zip(*log))
+        order = np.argsort(lane, kind="stable")
+        bounds = np.searchsorted(lane[order], np.arange(len(trials) + 1))
+        payout = "3:2" if settings.blackjack_payout == 1.5 else "6:5"
+        soft17 = "H17" if settings.hit_soft_17 else "S17"
+        for i, result in enumerate(results):
+            rows = order[bounds[i]:bounds[i + 1]]
+            trial = result.trial
+            hp, opened, closed, nh = (
+                hands[rows].tolist(), before[rows].tolist(), after[rows].tolist(), n_hands[rows].tolist()
+            )
+            result.bankroll_rows = [(trial, h, b) for h, b in zip(hp, closed)]
+            result.result_rows = [
+                (
+                    sim_number, trial, settings.num_decks, settings.penetration, payout, soft17,
+                    int(settings.double_after_split), int(settings.resplit_aces),
+                    int(settings.allow_surrender), n, bet, o, c, None,
+                )
+                for n, o, c in zip(nh, opened, closed)
+            ]
+    for i, result in enumerate(results):
+        result.hands_played = int(engine.hands_played[i])
+        result.bankroll = float(engine.bankroll[i])
+        result.stats = stats.trial_stats(
+            i, settings.bankroll, result.hands_played < settings.hands_per_game
+        )
+        counts = np.bincount(engine.shoe[i, :engine.pos[i]], minlength=len(RANKS))
+        result.card_counts = dict(zip(RANKS, counts.tolist()))
+    return results
+
+
+def run_vectorized(
+    settings: SimulationSettings,
+    strategy: BasicStrategy,
+    sim_number: int,
+    lanes: int = DEFAULT_LANES,
+) -> Iterator[TrialResult]:
+    """Yield the results of every trial, playing up to *lanes* trials at once."""
+    _require_numpy()
+    if settings.count_system:
+        raise ValueError("The vectorized engine plays flat bets only; use the reference engine to count")
+    seeds = seed_sequence(settings.seed)
+    for start in range(1, settings.trials + 1, lanes):
+        trials = range(start, min(start + lanes, settings.trials + 1))
+        rng = np.random.Generator(bit_generator(settings.rng, seeds.spawn(1)[0]))
+        yield from play_trials(settings, strategy, trials, sim_number, rng)
@@ -0,0 +1,11 @@
+import pytest
+
+from blackjack.strategy import CACHE_DIR_ENV
+
+
+@pytest.fixture(autouse=True)
+def strategy_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep compiled strategies out of the user's cache directory."""
+    path = tmp_path_factory.mktemp("strategy-cache")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    return path
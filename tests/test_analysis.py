@@ -0,0 +1,58 @@
+import math
+import statistics
+
+import pytest
+
+from blackjack.analysis import ExactAnalyzer
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+
+def test_dealer_distribution_is_exact_for_single_deck():
+    analyzer = ExactAnalyzer(SimulationSettings(num_decks=1, strategy_file=str(DEFAULT_STRATEGY_FILE)))
+    dist = analyzer.dealer_distribution("A")
+    assert sum(dist.values()) == pytest.approx(1.0)
+    assert dist["blackjack"] == pytest.approx(16 / 51)
+    # Removing the tens leaves no blackjack for the dealer.
+    dist = analyzer.dealer_distribution("A", removed=["10"] * 16)
+    assert dist["blackjack"] == 0
+
+    evs = analyzer.action_evs(["A", "K"], "6")
+    assert evs == {"stand": 1.5, "strategy": 1.5}
+    evs = analyzer.action_evs(["10", "6"], "10")
+    assert evs["surrender"] == -0.5
+    assert evs["strategy"] == max(evs["hit"], evs["surrender"])
+
+
+def test_exact_ev_agrees_with_simulation():
+    settings = SimulationSettings(
+        trials=300,
+        hands_per_game=80,
+        bankroll=10_000,
+        num_decks=2,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:",
+        seed=3,
+    )
+    ev = ExactAnalyzer(settings).expected_value()
+    sim = Simulator(settings)
+    sim.run()
+    cur = sim.conn.cursor()
+    cur.execute("SELECT close_bankroll - open_bankroll FROM temp_results")
+    outcomes = [row[0] for row in cur.fetchall()]
+    sim.close()
+    mean = statistics.fmean(outcomes)
+    se = statistics.pstdev(outcomes) / math.sqrt(len(outcomes))
+    assert abs(mean - ev) < 4.5 * se
+
+
+def test_exact_dealer_results_do_not_depend_on_call_order():
+    settings = SimulationSettings(num_decks=1, strategy_file=str(DEFAULT_STRATEGY_FILE))
+    analyzer = ExactAnalyzer(settings, exact_dealer=True)
+    analyzer.action_evs(["2", "2"], "5")
+    after = analyzer.action_evs(["2", "2"], "3")
+    assert after == ExactAnalyzer(settings, exact_dealer=True).action_evs(["2", "2"], "3")
+    # The hand cache is bounded like the dealer cache.
+    small = ExactAnalyzer(settings, cache_size=64)
+    assert small._play.cache_info().maxsize == 64
+    assert small.action_evs(["10", "6"], "10") == ExactAnalyzer(settings).action_evs(["10", "6"], "10")
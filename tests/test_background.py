@@ -0,0 +1,75 @@
+import queue
+
+from blackjack import simulator
+from blackjack.background import SimulationWorker
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+
+def make_settings(path, **kw):
+    return SimulationSettings(
+        trials=5,
+        hands_per_game=40,
+        bankroll=200,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=str(path),
+        seed=11,
+        **kw,
+    )
+
+
+def drain(events):
+    out = []
+    while True:
+        event = events.get(timeout=10)
+        out.append(event)
+        if event[0] in ("done", "error"):
+            return out
+
+
+def test_worker_matches_direct_run_and_streams_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(simulator, "CHECKPOINT_ROUNDS", 9)
+    direct = Simulator(make_settings(tmp_path / "direct.db"))
+    direct.run()
+    expected = direct.conn.execute("SELECT * FROM temp_bankroll ORDER BY rowid").fetchall()
+    direct.close()
+
+    worker = SimulationWorker(make_settings(tmp_path / "worker.db"))
+    worker.start()
+    events = drain(worker.events)
+    worker.join()
+    assert events[-1] == ("done", False)
+    assert [e[1] for e in events if e[0] == "trial"] == [1, 2, 3, 4, 5]
+    streamed = [row for e in events if e[0] == "progress" for row in e[3]]
+    assert streamed == expected
+    assert worker.sim.conn.execute("SELECT * FROM temp_bankroll ORDER BY rowid").fetchall() == expected
+    worker.sim.close()
+
+
+def test_cancel_while_paused_stops_early(tmp_path):
+    worker = SimulationWorker(make_settings(tmp_path / "sim.db"))
+    worker.control.pause()
+    worker.start()
+    first = worker.events.get(timeout=10)
+    assert first[0] == "trial" and first[1] == 1
+    worker.control.cancel()
+    events = drain(worker.events)
+    worker.join()
+    assert events[-1] == ("done", True)
+    trials = worker.sim.conn.execute("SELECT COUNT(*) FROM temp_summary").fetchone()[0]
+    assert trials == 1
+    worker.sim.close()
+
+
+def test_pause_then_resume_completes(tmp_path):
+    events = queue.Queue()
+    worker = SimulationWorker(make_settings(tmp_path / "sim.db"), events)
+    worker.control.pause()
+    worker.start()
+    assert events.get(timeout=10)[0] == "trial"
+    assert worker.control.paused
+    worker.control.resume()
+    assert drain(events)[-1] == ("done", False)
+    worker.join()
+    assert worker.sim.conn.execute("SELECT COUNT(*) FROM temp_summary").fetchone()[0] == 5
+    worker.sim.close()
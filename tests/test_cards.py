@@ -0,0 +1,38 @@
+from blackjack.cards import Card, Shoe, RANKS
+
+
+def test_shoe_draws_every_card_once_per_shuffle():
+    shoe = Shoe(1, penetration=0.5)
+    drawn = [shoe.draw() for _ in range(26)]
+    assert shoe.penetration_reached
+    drawn += [shoe.draw() for _ in range(26)]
+    assert sorted((c.rank, c.suit) for c in drawn) == sorted(
+        (c.rank, c.suit) for c in {Card(r, s) for r in RANKS for s in ("hearts", "diamonds", "clubs", "spades")}
+    )
+    assert shoe.drawn_counts == {rank: 4 for rank in RANKS}
+
+    shoe.shuffle()
+    assert shoe.drawn_counts == {rank: 0 for rank in RANKS}
+    assert not shoe.penetration_reached
+
+
+def test_card_values():
+    assert Card("A", "spades").value == 11
+    assert Card("7", "hearts").value == 7
+    assert Card("K", "clubs").value == 10
+
+
+def test_remaining_counts_follow_draws_and_shuffles():
+    shoe = Shoe(2)
+    assert shoe.snapshot() == (8,) * 13 and shoe.value_snapshot() == (8,) * 9 + (32,)
+    drawn = [shoe.draw() for _ in range(60)]
+    snapshot = shoe.snapshot()
+    for i, rank in enumerate(RANKS):
+        left = 8 - sum(card.rank == rank for card in drawn)
+        assert snapshot[i] == shoe.remaining(rank) == left
+    assert sum(snapshot) == shoe.cards_remaining == 104 - 60
+    assert sum(shoe.value_snapshot()) == 44
+    shoe.draw()
+    assert shoe.snapshot() != snapshot  # snapshots are copies
+    shoe.shuffle()
+    assert shoe.snapshot() == (8,) * 13
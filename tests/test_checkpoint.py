@@ -0,0 +1,78 @@
+import json
+import pickle
+
+import pytest
+
+from blackjack import simulator
+from blackjack.engine import TrialRunner
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+TABLES = [
+    "temp_results", "temp_bankroll", "temp_summary", "temp_card_distribution", "temp_trial_stats",
+    "temp_bankroll_lod",
+]
+
+
+def make_settings(path, **kw):
+    return SimulationSettings(
+        trials=4,
+        hands_per_game=60,
+        bankroll=200,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=str(path),
+        seed=3,
+        count_system="hi-lo",
+        bet_spread=4,
+        **kw,
+    )
+
+
+def dump(sim):
+    return {t: sim.conn.execute(f"SELECT * FROM {t} ORDER BY rowid").fetchall() for t in TABLES}
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(simulator, "CHECKPOINT_ROUNDS", 7)
+    play = TrialRunner.play
+    calls = 0
+
+    def crashing_play(self, max_rounds=None):
+        nonlocal calls
+        calls += 1
+        if calls == 12:
+            raise KeyboardInterrupt
+        return play(self, max_rounds)
+
+    monkeypatch.setattr(TrialRunner, "play", crashing_play)
+    sim = Simulator(make_settings(tmp_path / "run.db", checkpoint_interval=1e-9))
+    with pytest.raises(KeyboardInterrupt):
+        sim.run()
+    sim.close()
+    monkeypatch.setattr(TrialRunner, "play", play)
+
+    resumed = Simulator(make_settings(tmp_path / "run.db"))
+    next_trial, state = resumed.conn.execute("SELECT next_trial, state FROM checkpoints").fetchone()
+    assert 1 < next_trial < 4
+    # Mid-trial: the checkpoint holds the rounds to replay, not the runner.
+    assert json.loads(state)["rounds"] > 0
+    assert resumed.resume()
+    assert resumed.conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 0
+    assert not resumed.resume()
+
+    reference = Simulator(make_settings(tmp_path / "ref.db"))
+    reference.run()
+    assert dump(resumed) == dump(reference)
+    assert resumed.stats.summary() == reference.stats.summary()
+    resumed.close()
+    reference.close()
+
+
+def test_pickled_checkpoints_are_not_loaded(tmp_path):
+    sim = Simulator(make_settings(tmp_path / "run.db"))
+    sim.conn.execute(
+        "INSERT INTO checkpoints VALUES (?, ?, ?)", (1, 2, pickle.dumps({"settings": sim.settings}))
+    )
+    with pytest.raises(ValueError, match="older version"):
+        sim.resume()
+    sim.close()
@@ -0,0 +1,82 @@
+import random
+
+from blackjack.cards import Card, RANKS, Shoe
+from blackjack.counting import HI_LO, INDEX_PLAYS, BetRamp, Counter, CountingStrategy, initial_count
+from blackjack.engine import TrialRunner, play_trial
+from blackjack.hand import Hand
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+from blackjack.strategy import BasicStrategy
+
+
+def test_counter_tracks_draws_and_resets_on_shuffle():
+    shoe = Shoe(2, rng=random.Random(1))
+    counter = Counter(HI_LO).attach(shoe)
+    for _ in range(40):
+        shoe.draw()
+    drawn = shoe.drawn_counts
+    assert counter.running == sum(tag * drawn[rank] for tag, rank in zip(HI_LO, RANKS))
+    assert counter.true_count == counter.running / (64 / 52)
+    shoe.shuffle()
+    assert counter.running == 0
+
+
+def test_linear_bet_ramp():
+    ramp = BetRamp.linear(4)
+    assert [ramp.units(tc) for tc in (-3, 0.5, 1.9, 2.0, 3.7, 10)] == [1, 1, 1, 2, 3, 4]
+    assert BetRamp.linear(1).units(10) == 1
+
+
+def test_index_plays_follow_true_count():
+    base = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    counter = Counter()
+    strategy = CountingStrategy(base, counter)
+    hand = Hand(cards=[Card("10", "hearts"), Card("3", "clubs"), Card("3", "spades")])
+    options = {"can_double": False, "can_split": False, "can_surrender": False}
+    counter.running = -1
+    assert strategy.decide(hand, "K", options) == "hit"
+    counter.running = 1
+    assert strategy.decide(hand, "K", options) == "stand"
+    eights = Hand(cards=[Card("8", "hearts"), Card("8", "clubs")])
+    assert strategy.decide(eights, "10", {"can_split": True}) == "split"
+
+
+def test_index_plays_keep_basic_strategy_surrender():
+    base = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE), allow_surrender=True)
+    counter = Counter()
+    strategy = CountingStrategy(base, counter)
+    sixteen = Hand(cards=[Card("10", "hearts"), Card("6", "clubs")])
+    options = {"can_double": True, "can_split": False, "can_surrender": True}
+    assert base.decide(sixteen, "10", options) == "surrender"
+    for running in (0, 3, 20):
+        counter.running = running
+        assert strategy.decide(sixteen, "10", options) == "surrender"
+    # Without surrender the stand index play still applies.
+    assert strategy.decide(sixteen, "10", {"can_double": True}) == "stand"
+    # Fab 4: 15 v 10 surrenders from a true count of 0.
+    fifteen = Hand(cards=[Card("10", "hearts"), Card("5", "clubs")])
+    counter.running = 1
+    assert strategy.decide(fifteen, "10", options) == "surrender"
+
+
+def test_counting_trial_spreads_bets():
+    settings = SimulationSettings(
+        hands_per_game=2000, bankroll=10**6, seed=1, count_system="hi-lo", bet_spread=8
+    )
+    strategy = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    result = play_trial(settings, strategy, 1, 1, random.Random(2))
+    wagers = {row[10] for row in result.result_rows}
+    assert min(wagers) == 1 and max(wagers) == 8
+    again = play_trial(settings, strategy, 1, 1, random.Random(2))
+    assert again.result_rows == result.result_rows
+
+
+def test_system_specific_start_and_index_plays():
+    assert initial_count("hi-lo", 6) == 0 and initial_count("ko", 6) == -20 and initial_count("ko", 1) == 0
+    strategy = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    ko = TrialRunner(SimulationSettings(num_decks=6, count_system="ko"), strategy, 1, 1, random.Random(1))
+    assert ko.counter.running == -20
+    ko.shoe.shuffle()
+    assert ko.counter.running == -20
+    assert isinstance(ko.player.strategy, BasicStrategy)
+    hi_lo = TrialRunner(SimulationSettings(count_system="hi-lo"), strategy, 1, 1, random.Random(1))
+    assert hi_lo.player.strategy.deviations == INDEX_PLAYS["hi-lo"]
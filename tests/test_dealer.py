@@ -0,0 +1,31 @@
+import itertools
+
+from blackjack.cards import CARDS
+from blackjack.dealer import Dealer
+from blackjack.hand import Hand
+
+
+class ScriptedShoe:
+    def __init__(self, cards):
+        self.draw = iter(cards).__next__
+
+
+def reference_play(hand, cards, hit_soft_17):
+    """Dealer rule applied card by card from the hand's value."""
+    cards = iter(cards)
+    while hand.best_value < 17 or (hand.best_value == 17 and hit_soft_17 and hand.is_soft):
+        hand.add_card(next(cards))
+    return hand
+
+
+def test_table_walk_matches_the_dealer_rule():
+    ranks = [CARDS[i * 4] for i in range(13)]
+    for hit_soft_17 in (False, True):
+        for first, second, *draws in itertools.product(ranks, ranks, ranks[:6], ranks[8:]):
+            script = draws * 4
+            played = Dealer(hit_soft_17).play(Hand([first, second]), ScriptedShoe(script))
+            expected = reference_play(Hand([first, second]), script, hit_soft_17)
+            assert played.cards == expected.cards
+            assert (played.values, played.is_soft, played.is_bust) == (
+                expected.values, expected.is_soft, expected.is_bust
+            )
@@ -0,0 +1,65 @@
+import random
+
+from blackjack.downsample import LodBuilder, choose_level, curve, percentile_bands
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+
+def walk(n, seed=1):
+    rng = random.Random(seed)
+    rows, hand, bankroll = [], 0, 100.0
+    for _ in range(n):
+        hand += rng.choice([1, 1, 2])
+        bankroll += rng.uniform(-1, 1)
+        rows.append((1, hand, bankroll))
+    return rows
+
+
+def test_buckets_match_brute_force_across_batches():
+    rows = walk(5000)
+    builder = LodBuilder(1, factor=4, levels=3)
+    out = []
+    for i in range(0, len(rows), 333):
+        out += builder.add(rows[i:i + 333])
+    out += builder.close()
+    for level in (1, 2, 3):
+        width = 4 ** level
+        groups = {}
+        for _, hand, bankroll in rows:
+            groups.setdefault(hand // width, []).append((hand, bankroll))
+        got = {r[2]: r[3:] for r in out if r[1] == level}
+        assert sorted(got) == sorted(groups)
+        for bucket, members in groups.items():
+            low = min(members, key=lambda m: m[1])
+            high = max(members, key=lambda m: m[1])
+            assert got[bucket] == (*low, *high, *members[-1])
+
+
+def test_choose_level():
+    assert choose_level(0, 500, 2000) == 0
+    assert choose_level(0, 10**6, 2000) == 2
+    assert choose_level(0, 10**12, 2000) == 6
+
+
+def test_curve_and_bands_from_a_run():
+    settings = SimulationSettings(
+        trials=4, hands_per_game=3000, bankroll=500, seed=5,
+        strategy_file=str(DEFAULT_STRATEGY_FILE), database=":memory:",
+    )
+    sim = Simulator(settings)
+    sim.run()
+    raw = sim.conn.execute("SELECT hand, bankroll FROM temp_bankroll WHERE trial = 2 ORDER BY hand").fetchall()
+    assert curve(sim.conn, 2, points=10**6) == raw
+    coarse = curve(sim.conn, 2, points=100)
+    assert 50 <= len(coarse) < len(raw)
+    values = [b for _, b in raw]
+    assert min(values) == min(b for _, b in coarse) and max(values) == max(b for _, b in coarse)
+    zoomed = curve(sim.conn, 2, 1000, 1100, points=100)
+    assert zoomed == [r for r in raw if 1000 <= r[0] <= 1100]
+
+    hands, bands = percentile_bands(sim.conn, (0, 50, 100), points=50)
+    assert hands and all(len(b) == len(hands) for b in bands.values())
+    assert all(lo <= mid <= hi for lo, mid, hi in zip(bands[0], bands[50], bands[100]))
+    finals = [r[0] for r in sim.conn.execute("SELECT bankroll FROM temp_summary")]
+    assert bands[0][-1] == min(finals) and bands[100][-1] == max(finals)
+    sim.close()
@@ -0,0 +1,49 @@
+import random
+import sqlite3
+
+from blackjack import engine
+from blackjack.layout import decode_round, encode_round, migrate_layouts, parse_layout
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+from blackjack.strategy import BasicStrategy
+
+
+def recorded_rounds(monkeypatch):
+    pairs = []
+
+    def encode(initial_cards, player_hands, dealer_hand, bet_amount):
+        blob = encode_round(initial_cards, player_hands, dealer_hand, bet_amount)
+        text = engine.format_round(initial_cards, player_hands, dealer_hand, bet_amount)
+        pairs.append((blob, text))
+        return blob
+
+    monkeypatch.setattr(engine, "encode_round", encode)
+    settings = SimulationSettings(
+        hands_per_game=3000, bankroll=10**6, double_after_split=True, resplit_aces=True
+    )
+    strategy = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    engine.play_trial(settings, strategy, 1, 1, random.Random(4))
+    return pairs
+
+
+def test_decoded_rounds_match_text_layout(monkeypatch):
+    pairs = recorded_rounds(monkeypatch)
+    texts = [text for _, text in pairs]
+    # The sample covers splits, doubles, surrenders and busts.
+    assert any("v" in t for t in texts) and any("d" in t for t in texts)
+    assert any("|x" in t for t in texts) and any("_," in t for t in texts)
+    for blob, text in pairs:
+        assert decode_round(blob) == text
+        assert decode_round(parse_layout(text)) == text
+        assert len(blob) < len(text) // 2
+
+
+def test_migrate_layouts_rewrites_text_rows(monkeypatch):
+    pairs = recorded_rounds(monkeypatch)[:50]
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE results (cards TEXT)")
+    conn.executemany("INSERT INTO results VALUES (?)", [(text,) for _, text in pairs])
+    conn.execute("INSERT INTO results VALUES (NULL)")
+    assert migrate_layouts(conn, ["results"]) == 50
+    assert migrate_layouts(conn, ["results"]) == 0
+    stored = [row[0] for row in conn.execute("SELECT cards FROM results ORDER BY rowid")]
+    assert [decode_round(b) for b in stored] == [text for _, text in pairs] + [None]
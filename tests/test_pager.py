@@ -0,0 +1,70 @@
+import sqlite3
+
+from blackjack.pager import KeysetPager, estimate_widths, is_numeric
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+
+def make_table(n):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE temp_results (trial INTEGER, das INTEGER, wager REAL, cards TEXT)")
+    conn.executemany(
+        "INSERT INTO temp_results VALUES (?, ?, ?, ?)",
+        [(i // 10 + 1, i % 2, 1.0, "10,7 | 9,8" * (1 + i % 3)) for i in range(n)],
+    )
+    return conn
+
+
+def test_pages_walk_the_table_both_ways():
+    conn = make_table(25)
+    pager = KeysetPager(conn, page_size=10)
+    assert pager.columns == ["trial", "das", "wager", "cards"]
+    assert pager.count() == 25
+    pages = [pager.first()]
+    while True:
+        page = pager.after(pages[-1][-1][0])
+        if not page:
+            break
+        pages.append(page)
+    assert [len(p) for p in pages] == [10, 10, 5]
+    rows = [r for p in pages for r in p]
+    assert rows == conn.execute("SELECT rowid, * FROM temp_results ORDER BY trial, rowid").fetchall()
+    assert pager.before(pages[2][0][0]) == pages[1]
+    assert pager.before(pages[0][0][0]) == []
+
+
+def test_sample_and_display():
+    conn = make_table(1000)
+    pager = KeysetPager(conn)
+    sample = pager.sample(50)
+    assert len(sample) == 50
+    assert sample[0][0] == 1 and sample[-1][0] > 900
+    shown = pager.display(sample[1])
+    assert shown[1] in ("Y", "N")
+    assert shown[3].startswith("10,7 | 9,8")
+    rows = [pager.display(r) for r in sample]
+    widths = estimate_widths(pager.columns, rows, len, padding=0)
+    assert widths["trial"] == len("trial") and widths["cards"] == max(len(r[3]) for r in rows)
+    assert is_numeric("wager", rows, 2) and not is_numeric("das", rows, 1)
+    assert KeysetPager(make_table(0)).sample() == []
+
+
+def test_pages_of_one_run_behind_a_view():
+    settings = SimulationSettings(
+        trials=3, hands_per_game=40, strategy_file=str(DEFAULT_STRATEGY_FILE), database=":memory:", seed=4,
+    )
+    saved = Simulator(settings)
+    saved.run()
+    saved.save_results()
+    current = Simulator(settings, conn=saved.conn)
+    current.run()
+    pager = KeysetPager(current.conn, "temp_results", page_size=25, sim=current.sim_number)
+    rows, page = [], pager.first()
+    while page:
+        rows += page
+        page = pager.after(page[-1][0])
+    assert [r[1:] for r in rows] == current.conn.execute("SELECT * FROM temp_results").fetchall()
+    assert pager.count() == len(rows)
+    assert pager.before(rows[0][0]) == []
+    assert KeysetPager(current.conn, "temp_results", sim=99).first() == []
+    current.close()
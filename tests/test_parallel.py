@@ -0,0 +1,34 @@
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings
+from blackjack.settings import DEFAULT_STRATEGY_FILE
+
+
+def run_sim(workers):
+    settings = SimulationSettings(
+        trials=6,
+        hands_per_game=20,
+        bankroll=100,
+        num_decks=2,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:",
+        seed=7,
+        workers=workers,
+    )
+    sim = Simulator(settings)
+    sim.run()
+    cur = sim.conn.cursor()
+    cur.execute("SELECT * FROM temp_results ORDER BY rowid")
+    results = cur.fetchall()
+    cur.execute("SELECT * FROM temp_summary ORDER BY rowid")
+    summary = cur.fetchall()
+    cur.execute("SELECT * FROM temp_card_distribution ORDER BY rowid")
+    dist = cur.fetchall()
+    sim.close()
+    return results, summary, dist
+
+
+def test_parallel_run_matches_serial_run():
+    serial = run_sim(workers=1)
+    assert serial[1]
+    assert run_sim(workers=2) == serial
+    assert run_sim(workers=3) == serial
@@ -0,0 +1,43 @@
+from blackjack.perf import PhaseTimer
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+
+def run_sim(profile):
+    settings = SimulationSettings(
+        trials=3,
+        hands_per_game=50,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:",
+        seed=4,
+        profile=profile,
+    )
+    sim = Simulator(settings)
+    sim.run()
+    rows = sim.conn.execute("SELECT * FROM temp_results ORDER BY rowid").fetchall()
+    perf = sim.conn.execute("SELECT phase, calls, seconds FROM perf").fetchall()
+    sim.close()
+    return rows, perf, sim.hands_played
+
+
+def test_profiling_records_phases_without_changing_results():
+    rows, perf, hands = run_sim(profile=True)
+    plain, no_perf, _ = run_sim(profile=False)
+    assert rows == plain
+    assert no_perf == []
+    phases = {phase: (calls, seconds) for phase, calls, seconds in perf}
+    assert {"shuffle", "deal", "player", "dealer", "resolve", "write", "commit"} <= set(phases)
+    assert phases["total"][0] == hands == 150
+    assert phases["resolve"][0] >= len(rows)
+    assert all(seconds >= 0 for _, seconds in phases.values())
+
+
+def test_phase_timer_merge_and_wrap():
+    a, b = PhaseTimer(), PhaseTimer()
+    double = a.wrap("double", lambda x: 2 * x)
+    assert double(3) == 6 and double(4) == 8
+    b.add("double", 1.0, calls=5)
+    b.merge(a)
+    assert b.calls["double"] == 7
+    assert b.seconds["double"] >= 1.0
+    assert "hands/s" in b.report(2.0, 100)
@@ -1,10 +1,8 @@
 from blackjack.simulator import Simulator
-from blackjack.settings import SimulationSettings
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
 
 
 def run_sim(tmp_path):
-    strategy = tmp_path / "strategy.json"
-    strategy.write_text("{}")
     settings = SimulationSettings(
         trials=1,
         hands_per_game=2,
@@ -16,7 +14,7 @@ def run_sim(tmp_path):
         num_decks=1,
         hit_soft_17=False,
         penetration=0.75,
-        strategy_file=str(strategy),
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
         database=":memory:",
         seed=1,
     )
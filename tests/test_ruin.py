@@ -0,0 +1,50 @@
+import math
+import random
+
+import pytest
+
+from blackjack.ruin import OutcomeDistribution, analytic_risk, survival
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+from blackjack.simulator import Simulator
+from blackjack.strategy import BasicStrategy
+
+pytest.importorskip("numpy")
+
+
+def test_coin_flip_survival():
+    coin = OutcomeDistribution.from_counts({-1.0: 1, 1.0: 1})
+    assert coin.mean == 0 and coin.variance == 1 and coin.n0 == math.inf
+    one, two = survival(coin, bankrolls=[1, 2], rounds=4, paths=40_000, seed=1)
+    assert one.rounds == [1, 2, 3, 4]
+    # One bet left: play stops once the walk drops below where it started.
+    assert one.survival == pytest.approx([0.5, 0.5, 0.375, 0.375], abs=0.01)
+    assert two.survival[:2] == pytest.approx([1.0, 0.75], abs=0.01)
+    assert survival(coin, [1, 2], rounds=4, paths=40_000, seed=1)[0].survival == one.survival
+
+
+def test_bets_scale_with_the_bankroll():
+    edge = OutcomeDistribution.from_moments(0.01, 1.3)
+    assert edge.mean == pytest.approx(0.01) and edge.variance == pytest.approx(1.3)
+    assert edge.n0 == pytest.approx(13_000)
+    small, large = survival(edge, bankrolls=[100], bets=[1, 5], rounds=5000, paths=2000, seed=2)
+    assert large.risk_of_ruin > small.risk_of_ruin
+    assert small.rounds_to_double == pytest.approx(10_000)
+    assert analytic_risk(edge, 100) == pytest.approx(math.exp(-2 * 0.01 * 100 / 1.3))
+    assert all(a >= b for a, b in zip(small.survival, small.survival[1:]))
+
+
+def test_distribution_from_the_engine_and_database():
+    settings = SimulationSettings(
+        trials=2, hands_per_game=300, bankroll=1000, strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:", seed=5,
+    )
+    measured = OutcomeDistribution.from_engine(
+        settings, BasicStrategy.from_json(settings.strategy_file), rounds=2000, rng=random.Random(5)
+    )
+    assert sum(measured.probabilities) == pytest.approx(1.0)
+    assert {-1.0, 0.0, 1.0, 1.5} <= set(measured.values)
+    sim = Simulator(settings)
+    sim.run()
+    stored = OutcomeDistribution.from_results(sim.conn, sim.sim_number, "temp_results")
+    assert stored.mean == pytest.approx(sim.stats.outcomes.mean)
+    sim.close()
@@ -0,0 +1,90 @@
+import sqlite3
+
+from blackjack import queries
+from blackjack.schema import SCHEMA_VERSION, migrate, schema_version, table_columns
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+
+def make_settings(path, **kw):
+    kw.setdefault("seed", 2)
+    return SimulationSettings(
+        trials=3, hands_per_game=50, bankroll=100,
+        strategy_file=str(DEFAULT_STRATEGY_FILE), database=str(path), **kw,
+    )
+
+
+def test_unversioned_database_is_migrated_in_place(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE bankroll (trial INTEGER, hand INTEGER, bankroll REAL)")
+    conn.execute("CREATE TABLE summary (trial INTEGER, hands_played INTEGER, bankroll REAL)")
+    conn.executemany("INSERT INTO bankroll VALUES (1, ?, 100)", [(h,) for h in range(1, 4)])
+    conn.execute("INSERT INTO summary VALUES (1, 3, 100)")
+    conn.commit()
+    assert schema_version(conn) == 0
+    assert migrate(conn) == SCHEMA_VERSION
+    assert table_columns(conn, "bankroll") == ["trial", "hand", "bankroll", "sim"]
+    assert conn.execute("SELECT COUNT(*) FROM bankroll WHERE sim IS NULL").fetchone()[0] == 3
+    assert migrate(conn) == 0
+    conn.close()
+
+    sim = Simulator(make_settings(path))
+    sim.run()
+    sim.save_results()
+    assert queries.runs(sim.conn) == [sim.sim_number]
+    plan = sim.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT hand FROM bankroll WHERE sim = 1 AND trial = 2 ORDER BY hand"
+    ).fetchall()
+    assert "bankroll_data_key" in str(plan)
+    sim.close()
+
+
+def test_reports_match_the_run(tmp_path):
+    first = Simulator(make_settings(tmp_path / "sim.db"))
+    first.run()
+    first.save_results()
+    second = Simulator(make_settings(tmp_path / "sim.db", num_decks=2, seed=3))
+    second.run()
+    second.save_results()
+    conn = second.conn
+
+    report = queries.run_report(conn, second.sim_number)
+    summary = second.stats.summary()
+    assert report.trials == 3 and report.rounds == summary["rounds"]
+    assert abs(report.mean_per_round - summary["mean_per_round"]) < 1e-12
+    assert abs(report.stddev_per_round - summary["stddev_per_round"]) < 1e-12
+    assert report.rules["decks"] == 2
+    assert queries.run_report(conn, 99) is None
+    assert [r.sim for r in queries.compare_runs(conn)] == sorted(
+        [1, 2], key=lambda s: -queries.run_report(conn, s).mean_per_round
+    )
+    assert abs(sum(queries.card_frequencies(conn, 1).values()) - 1) < 1e-9
+    curve = queries.bankroll_curve(conn, 1, 2)
+    assert curve and [hand for hand, _ in curve] == sorted(hand for hand, _ in curve)
+    assert "EV/round" in queries.format_reports(queries.compare_runs(conn))
+    first.close()
+    second.close()
+
+
+def test_save_and_discard_only_change_run_status(tmp_path):
+    saved = Simulator(make_settings(tmp_path / "sim.db"))
+    saved.run()
+    conn = saved.conn
+    rows = conn.execute("SELECT COUNT(*) FROM bankroll_data").fetchone()[0]
+    temp = conn.execute("SELECT * FROM temp_bankroll").fetchall()
+    assert len(temp) == rows and conn.execute("SELECT COUNT(*) FROM bankroll").fetchone()[0] == 0
+    saved.save_results()
+    assert conn.execute("SELECT COUNT(*) FROM bankroll_data").fetchone()[0] == rows
+    assert conn.execute("SELECT trial, hand, bankroll FROM bankroll").fetchall() == temp
+    assert conn.execute("SELECT COUNT(*) FROM temp_bankroll").fetchone()[0] == 0
+
+    discarded = Simulator(make_settings(tmp_path / "sim.db", seed=9), conn=conn)
+    discarded.run()
+    assert discarded.sim_number == saved.sim_number + 1
+    discarded.discard_results()
+    assert conn.execute("SELECT COUNT(*) FROM temp_summary").fetchone()[0] == 0
+    assert conn.execute("SELECT DISTINCT sim FROM summary").fetchall() == [(saved.sim_number,)]
+    assert discarded.purge_discarded() == 1
+    assert conn.execute("SELECT COUNT(*) FROM bankroll_data").fetchone()[0] == rows
+    saved.close()
@@ -1,10 +1,8 @@
 from blackjack.simulator import Simulator
-from blackjack.settings import SimulationSettings
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
 
 
 def test_simulator_seed_reproducible(tmp_path):
-    strategy_file = tmp_path / "strategy.json"
-    strategy_file.write_text("{}")
     settings = SimulationSettings(
         trials=1,
         hands_per_game=5,
@@ -16,7 +14,7 @@ def test_simulator_seed_reproducible(tmp_path):
         num_decks=1,
         hit_soft_17=False,
         penetration=0.75,
-        strategy_file=str(strategy_file),
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
         database=":memory:",
         seed=42,
     )
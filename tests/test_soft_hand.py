@@ -14,3 +14,21 @@ def test_soft_hand_value_transitions():
     hand.add_card(Card('5', 'diamonds'))
     assert hand.values == [21, 31]
     assert hand.best_value == 21
+
+
+def test_totals_follow_added_and_removed_cards():
+    hand = Hand(cards=[Card('A', 'spades'), Card('A', 'hearts')])
+    assert hand.values == [2, 12, 22]
+    assert hand.best_value == 12
+    assert hand.is_soft
+
+    assert hand.pop_card() == Card('A', 'hearts')
+    assert hand.best_value == 11
+    hand.add_card(Card('K', 'clubs'))
+    assert hand.is_blackjack
+
+    hand.add_card(Card('5', 'diamonds'))
+    assert hand.best_value == 16
+    assert not hand.is_soft
+    hand.add_card(Card('9', 'clubs'))
+    assert hand.is_bust
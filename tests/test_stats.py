@@ -0,0 +1,64 @@
+import random
+import statistics
+
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+from blackjack.stats import P2Quantile, RunningStats
+
+
+def test_running_stats_match_statistics_module():
+    rng = random.Random(3)
+    values = [rng.gauss(0, 1) for _ in range(1000)]
+    whole = RunningStats()
+    left, right = RunningStats(), RunningStats()
+    for i, x in enumerate(values):
+        whole.add(x)
+        (left if i < 400 else right).add(x)
+    left.merge(right)
+    for stats in (whole, left):
+        assert stats.count == 1000
+        assert abs(stats.mean - statistics.fmean(values)) < 1e-12
+        assert abs(stats.variance - statistics.variance(values)) < 1e-9
+        assert stats.minimum == min(values) and stats.maximum == max(values)
+
+
+def test_p2_quantile_tracks_median():
+    rng = random.Random(5)
+    q = P2Quantile(0.5)
+    for _ in range(20000):
+        q.add(rng.random())
+    assert abs(q.value - 0.5) < 0.02
+
+
+def run_sim(record_every):
+    settings = SimulationSettings(
+        trials=4,
+        hands_per_game=30,
+        bankroll=100,
+        num_decks=2,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:",
+        seed=11,
+        record_every=record_every,
+    )
+    sim = Simulator(settings)
+    sim.run()
+    cur = sim.conn.cursor()
+    cur.execute("SELECT * FROM temp_trial_stats ORDER BY trial")
+    trial_stats = cur.fetchall()
+    cur.execute("SELECT COUNT(*) FROM temp_results")
+    results = cur.fetchone()[0]
+    summary = sim.stats.summary()
+    sim.close()
+    return trial_stats, results, summary
+
+
+def test_statistics_do_not_depend_on_recorded_rounds():
+    every, all_rows, summary = run_sim(record_every=1)
+    none, no_rows, _ = run_sim(record_every=0)
+    _, some_rows, _ = run_sim(record_every=3)
+    assert len(every) == 4
+    assert every == none
+    assert no_rows == 0
+    assert 0 < some_rows < all_rows
+    assert summary["rounds"] == all_rows
@@ -0,0 +1,19 @@
+import sqlite3
+
+from blackjack.storage import BufferedWriter
+
+
+def test_buffered_writer_flushes_in_chunks():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+    writer = BufferedWriter(conn, chunk_size=3)
+    writer.add("t", (1, "x"))
+    writer.add("t", (2, "y"))
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    writer.add("t", (3, "z"))
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
+    writer.extend("t", [(4, "a"), (5, "b")])
+    writer.flush()
+    assert conn.execute("SELECT a FROM t ORDER BY a").fetchall() == [(i,) for i in range(1, 6)]
+    assert writer.rows_written == 5
+    conn.close()
@@ -0,0 +1,120 @@
+from itertools import product
+import json
+
+import pytest
+
+from blackjack.cards import Card, RANKS
+from blackjack.hand import Hand
+from blackjack.settings import DEFAULT_STRATEGY_FILE
+from blackjack.strategy import DEALER_UP_CARDS, REQUIRED_PAIR, BasicStrategy, clear_strategy_cache
+
+
+def test_compiled_table_matches_dict_lookup():
+    compiled = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    plain = BasicStrategy(hard=compiled.hard, soft=compiled.soft, pair=compiled.pair)
+    hands = [Hand(cards=[Card(a, 'hearts'), Card(b, 'clubs')]) for a, b in product(RANKS, repeat=2)]
+    hands += [
+        Hand(cards=[Card(a, 'hearts'), Card(b, 'clubs'), Card(c, 'spades')])
+        for a, b, c in product(RANKS, repeat=3)
+    ]
+    for hand, up in product(hands, RANKS):
+        for can_double, can_split, can_surrender in product((False, True), repeat=3):
+            options = {
+                "can_double": can_double,
+                "can_split": can_split,
+                "can_surrender": can_surrender,
+            }
+            assert compiled.decide(hand, up, options) == plain.decide(hand, up, options)
+
+
+def test_face_card_up_uses_ten_column():
+    strat = BasicStrategy(hard={16: {"10": "hit"}}).compile()
+    hand = Hand(cards=[Card('9', 'hearts'), Card('7', 'clubs')])
+    assert strat.decide(hand, 'K', {}) == "hit"
+    assert strat.decide(hand, '9', {}) == "stand"
+
+
+@pytest.mark.parametrize("face", ["J", "Q", "K"])
+def test_face_cards_play_like_a_ten(face):
+    # Regression: face cards were looked up by rank, found no column or row
+    # and stood.  Both the compiled and the dict path must use the "10" ones.
+    compiled = BasicStrategy.from_json(str(DEFAULT_STRATEGY_FILE))
+    plain = BasicStrategy(hard=compiled.hard, soft=compiled.soft, pair=compiled.pair)
+    options = {"can_double": True, "can_split": True, "can_surrender": True}
+    sixteen = Hand(cards=[Card("10", "hearts"), Card("6", "clubs")])
+    for strat in (compiled, plain):
+        assert strat.decide(sixteen, face, options) == strat.decide(sixteen, "10", options) == "surrender"
+        for rank in RANKS:
+            hand = Hand(cards=[Card(rank, "hearts"), Card("5", "clubs")])
+            assert strat.decide(hand, face, options) == strat.decide(hand, "10", options)
+        pair = Hand(cards=[Card(face, "hearts"), Card(face, "clubs")])
+        ten_pair = Hand(cards=[Card("10", "hearts"), Card("10", "clubs")])
+        for up in DEALER_UP_CARDS:
+            assert strat.decide(pair, up, options) == strat.decide(ten_pair, up, options)
+
+
+def _full_tables():
+    row = {up: "hit" for up in DEALER_UP_CARDS}
+    return {
+        "hard": {str(t): dict(row) for t in range(4, 17)},
+        "soft": {str(t): dict(row) for t in range(13, 22)},
+        "pair": {rank: dict(row, **({"10": "split"} if rank == "8" else {})) for rank in REQUIRED_PAIR},
+    }
+
+
+@pytest.mark.parametrize(
+    "edit, message",
+    [
+        (lambda d: d["hard"]["16"].pop("A"), "missing dealer up-cards A"),
+        (lambda d: d["hard"].pop("12"), "hard row 12"),
+        (lambda d: d["soft"]["18"].update({"7": "stnad"}), "unknown action"),
+        (lambda d: d["pair"].update({"11": {"2": "split"}}), "unknown pair row"),
+        (lambda d: d.update({"Hard": {}}), "unknown sections Hard"),
+        (lambda d: d["hard"]["9"].update({"1": "hit"}), "unknown dealer up-card"),
+        (lambda d: d.pop("soft"), "soft table is missing"),
+        (lambda d: d["hard"].clear(), "hard table is missing"),
+        (lambda d: d["pair"]["9"].pop("7"), "pair row '9' is missing dealer up-cards 7"),
+        (lambda d: d["pair"].pop("A"), "pair row 'A'"),
+    ],
+)
+def test_malformed_strategy_fails_fast(tmp_path, edit, message):
+    data = _full_tables()
+    edit(data)
+    path = tmp_path / "strategy.json"
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=message):
+        BasicStrategy.from_json(str(path))
+
+
+def test_compiled_strategy_is_cached_on_disk(tmp_path, monkeypatch, strategy_cache_dir):
+    data = _full_tables()
+    data["hard"]["16"]["10"] = "surrender"
+    path = tmp_path / "strategy.json"
+    path.write_text(json.dumps(data))
+    first = BasicStrategy.from_json(str(path), allow_surrender=False)
+    assert first.hard[16]["10"] == "hit"
+    assert [p.name for p in tmp_path.iterdir()] == ["strategy.json"]
+    (cache_file,) = strategy_cache_dir.iterdir()
+    assert cache_file.read_bytes().startswith(b"BJSC")
+
+    clear_strategy_cache()
+    parse = BasicStrategy._parse_json
+    monkeypatch.setattr(BasicStrategy, "_parse_json", classmethod(lambda cls, *a: pytest.fail("reparsed")))
+    cached = BasicStrategy.from_json(str(path), allow_surrender=False)
+    assert cached == first and cached.lookup_tables() == first.lookup_tables()
+    assert cached is BasicStrategy.from_json(str(path), allow_surrender=False)
+
+    # A different option or an edited file is compiled again.
+    monkeypatch.setattr(BasicStrategy, "_parse_json", parse)
+    assert BasicStrategy.from_json(str(path)).hard[16]["10"] == "surrender"
+    data["hard"]["16"]["10"] = "stand"
+    path.write_text(json.dumps(data, indent=1))
+    assert BasicStrategy.from_json(str(path), allow_surrender=False).hard[16]["10"] == "stand"
+    assert len(list(strategy_cache_dir.iterdir())) == 1  # the older versions' files are dropped
+
+    # A damaged cache file is ignored and rewritten.
+    clear_strategy_cache()
+    (cache_file,) = strategy_cache_dir.iterdir()
+    cache_file.write_bytes(b"BJSC\x02garbage")
+    assert BasicStrategy.from_json(str(path), allow_surrender=False).hard[16]["10"] == "stand"
+    assert cache_file.read_bytes() != b"BJSC\x02garbage"
@@ -0,0 +1,80 @@
+from blackjack.schema import DATA_TABLES, data_table
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+from blackjack.sweep import Sweep
+
+GRID = {"num_decks": [1, 6], "hit_soft_17": [False, True]}
+
+
+def base_settings(tmp_path, workers=1):
+    return SimulationSettings(
+        trials=3,
+        hands_per_game=15,
+        bankroll=100,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=str(tmp_path / "sweep.db"),
+        seed=9,
+        workers=workers,
+    )
+
+
+def results_by_sim(conn):
+    rows = conn.execute("SELECT * FROM results ORDER BY rowid").fetchall()
+    by_sim = {}
+    for row in rows:
+        by_sim.setdefault(row[0], []).append(row[1:])
+    return by_sim
+
+
+def test_sweep_writes_each_cell_under_its_own_sim(tmp_path):
+    sweep = Sweep(base_settings(tmp_path, workers=2), GRID)
+    sims = sweep.run()
+    assert sorted(sims.values()) == [1, 2, 3, 4]
+    by_sim = results_by_sim(sweep.conn)
+    sweep.close()
+
+    # A cell matches a standalone run of the same settings.
+    settings = sweep.cells[3]
+    settings.database = str(tmp_path / "single.db")
+    sim = Simulator(settings)
+    sim.run()
+    sim.save_results()
+    assert results_by_sim(sim.conn)[1] == by_sim[sims[3]]
+    sim.close()
+
+
+def test_sweep_resumes_after_last_completed_cell(tmp_path):
+    sweep = Sweep(base_settings(tmp_path), GRID)
+    sims = sweep.run()
+    expected = results_by_sim(sweep.conn)
+    # Forget the last two cells, as if the sweep had been interrupted.
+    for cell in (2, 3):
+        sweep.conn.execute("DELETE FROM sweep_cells WHERE cell = ?", (cell,))
+        for table in DATA_TABLES:
+            sweep.conn.execute(f"DELETE FROM {data_table(table)} WHERE sim = ?", (sims[cell],))
+        sweep.conn.execute("DELETE FROM runs WHERE sim = ?", (sims[cell],))
+    sweep.conn.commit()
+    sweep.close()
+
+    resumed = Sweep(base_settings(tmp_path), GRID)
+    assert sorted(resumed.completed()) == [0, 1]
+    assert resumed.run() == sims
+    assert results_by_sim(resumed.conn) == expected
+    resumed.close()
+
+
+def test_unseeded_sweep_keeps_one_seed_and_leaves_other_runs_unsaved(tmp_path):
+    settings = base_settings(tmp_path)
+    settings.seed = None
+    unsaved = Simulator(settings)
+    unsaved.run()
+    sweep = Sweep(settings, GRID)
+    seed = sweep.base.seed
+    assert seed is not None and {cell.seed for cell in sweep.cells} == {seed}
+    sweep.run()
+    statuses = dict(sweep.conn.execute("SELECT sim, status FROM runs").fetchall())
+    assert statuses.pop(unsaved.sim_number) == "temp"
+    assert set(statuses.values()) == {"saved"}
+    sweep.close()
+    unsaved.close()
+    assert Sweep(settings, GRID).base.seed == seed
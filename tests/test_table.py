@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from blackjack.engine import play_trial
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+from blackjack.simulator import Simulator
+from blackjack.strategy import BasicStrategy
+from blackjack.table import TableRunner, play_table, seats_from_settings
+
+
+def make_settings(**kw):
+    return SimulationSettings(
+        trials=3, hands_per_game=200, bankroll=50, strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:", seed=6, **kw,
+    )
+
+
+def test_single_seat_matches_the_trial_runner():
+    settings = make_settings()
+    strategy = BasicStrategy.from_json(settings.strategy_file)
+    single = play_trial(settings, strategy, 1, 1, random.Random(11))
+    table = play_table(settings, seats_from_settings(settings, strategy, 1), 1, 1, random.Random(11))
+    (seat,) = table.seats
+    assert (seat.hands_played, seat.bankroll) == (single.hands_played, single.bankroll)
+    assert seat.stats.outcomes.count == single.stats.outcomes.count
+    assert seat.stats.max_drawdown == single.stats.max_drawdown
+    assert not seat.result_rows and not seat.bankroll_rows
+    assert table.card_counts == single.card_counts
+
+
+def test_seats_share_the_shoe_and_leave_on_their_own():
+    settings = make_settings()
+    strategy = BasicStrategy.from_json(settings.strategy_file)
+    seats = seats_from_settings(settings, strategy, 5)
+    seats[0].settings.bet_amount = 10
+    runner = TableRunner(settings, seats, 1, 1, random.Random(3))
+    assert not runner.play(20)
+    assert runner.rounds == 20
+    runner.play()
+    result = runner.finish()
+    assert seats[0].settings.bankroll == 50  # seats keep their starting bankroll
+    for seat, player_settings in zip(result.seats, runner.seat_settings):
+        assert seat.hands_played >= 200 or seat.bankroll < player_settings.bet_amount
+        assert seat.stats.ruined == (seat.hands_played < 200)
+    # The table plays on until the last seat leaves.
+    assert max(seat.stats.outcomes.count for seat in result.seats) == result.rounds
+    assert result.seats[0].stats.outcomes.count < result.rounds
+    with pytest.raises(ValueError):
+        TableRunner(settings, seats_from_settings(settings, strategy, 8), 1, 1)
+
+
+def test_run_table_writes_a_row_per_seat():
+    settings = make_settings()
+    sim = Simulator(settings)
+    sim.run_table(seats_from_settings(settings, BasicStrategy.from_json(settings.strategy_file), 3))
+    rows = sim.conn.execute("SELECT trial, seat, hands_played FROM temp_seats ORDER BY trial, seat").fetchall()
+    assert [r[:2] for r in rows] == [(t, s) for t in (1, 2, 3) for s in (1, 2, 3)]
+    assert sim.hands_played == sum(r[2] for r in rows)
+    assert sim.stats.trials == 9
+    sim.save_results()
+    assert sim.conn.execute("SELECT COUNT(*) FROM seats").fetchone()[0] == 9
+    sim.close()
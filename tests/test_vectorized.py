@@ -0,0 +1,45 @@
+import math
+import statistics
+
+import pytest
+
+from blackjack.simulator import Simulator
+from blackjack.settings import SimulationSettings, DEFAULT_STRATEGY_FILE
+
+pytest.importorskip("numpy")
+
+
+def round_outcomes(engine, seed):
+    settings = SimulationSettings(
+        trials=400,
+        hands_per_game=60,
+        bankroll=10_000,
+        strategy_file=str(DEFAULT_STRATEGY_FILE),
+        database=":memory:",
+        seed=seed,
+        engine=engine,
+    )
+    sim = Simulator(settings)
+    sim.run()
+    cur = sim.conn.cursor()
+    cur.execute("SELECT close_bankroll - open_bankroll FROM temp_results")
+    outcomes = [row[0] for row in cur.fetchall()]
+    cur.execute("SELECT COUNT(*) FROM temp_summary")
+    assert cur.fetchone()[0] == settings.trials
+    sim.close()
+    return outcomes
+
+
+def moments(xs):
+    n = len(xs)
+    mean = statistics.fmean(xs)
+    var = statistics.pvariance(xs, mean)
+    m4 = sum((x - mean) ** 4 for x in xs) / n
+    return n, mean, var, math.sqrt(var / n), math.sqrt((m4 - var ** 2) / n)
+
+
+def test_vectorized_engine_matches_reference_ev_and_variance():
+    n1, mean1, var1, se_mean1, se_var1 = moments(round_outcomes("reference", 11))
+    n2, mean2, var2, se_mean2, se_var2 = moments(round_outcomes("vectorized", 11))
+    assert abs(mean1 - mean2) < 4.5 * math.hypot(se_mean1, se_mean2)
+    assert abs(var1 - var2) < 4.5 * math.hypot(se_var1, se_var2)